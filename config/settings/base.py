@@ -192,6 +192,12 @@ CELERY_TASK_SERIALIZER = 'json'
 CELERY_RESULT_SERIALIZER = 'json'
 # http://docs.celeryproject.org/en/latest/userguide/configuration.html#std:setting-task_ignore_result
 CELERY_TASK_IGNORE_RESULT = True
+# Queued Safe txs are sent by workers consuming `CELERY_RELAY_QUEUE`
+CELERY_RELAY_QUEUE = env('CELERY_RELAY_QUEUE', default='relay')
+# http://docs.celeryproject.org/en/latest/userguide/configuration.html#std:setting-task_routes
+CELERY_ROUTES = {
+    'safe_relay_service.relay.tasks.send_queued_multisig_txs_task': {'queue': CELERY_RELAY_QUEUE},
+}
 
 # Django REST Framework
 # ------------------------------------------------------------------------------
@@ -287,6 +293,15 @@ ETH_HASH_PREFIX = env('ETH_HASH_PREFIX', default='GNO')
 ETHEREUM_NODE_URL = env('ETHEREUM_NODE_URL', default=None)
 
 GAS_STATION_NUMBER_BLOCKS = env('GAS_STATION_NUMBER_BLOCKS', default=300)
+# Extra number of blocks to calculate gas prices for, besides `GAS_STATION_NUMBER_BLOCKS`
+GAS_STATION_HORIZONS = env.list('GAS_STATION_HORIZONS', cast=int, default=[])  # e.g. 1000,5000
+# Seconds gas prices are kept in process memory. Invalidated by `calculate_gas_prices` task, `0` to disable it
+GAS_STATION_SNAPSHOT_TTL_SECONDS = env.int('GAS_STATION_SNAPSHOT_TTL_SECONDS', default=15)
+# Use node mempool (`txpool_content`/`eth_pendingTransactions`) to predict blocks to inclusion for every gas price
+GAS_STATION_MEMPOOL_PREDICTOR = env.bool('GAS_STATION_MEMPOOL_PREDICTOR', default=False)
+# Max number of blocks requested on the same JSON-RPC batch, and max number of batches in flight at the same time
+GAS_STATION_RPC_BATCH_SIZE = env.int('GAS_STATION_RPC_BATCH_SIZE', default=25)
+GAS_STATION_RPC_MAX_WORKERS = env.int('GAS_STATION_RPC_MAX_WORKERS', default=4)
 
 # Safe
 # ------------------------------------------------------------------------------
@@ -315,18 +330,45 @@ SAFE_DEFAULT_CALLBACK_HANDLER = env('SAFE_DEFAULT_CALLBACK_HANDLER',
 # If FIXED_GAS_PRICE is None, GasStation will be used
 FIXED_GAS_PRICE = env.int('FIXED_GAS_PRICE', default=None)
 SAFE_TX_SENDER_PRIVATE_KEY = env('SAFE_TX_SENDER_PRIVATE_KEY', default=None)
+# Pool of accounts for sending txs in parallel. If not set, only `SAFE_TX_SENDER_PRIVATE_KEY` is used
+SAFE_TX_SENDER_PRIVATE_KEYS = env.list('SAFE_TX_SENDER_PRIVATE_KEYS', default=[])
+SAFE_TX_SENDER_ASSIGNMENT = env('SAFE_TX_SENDER_ASSIGNMENT', default='deterministic')  # Or `least-pending`
+SAFE_TX_BULK_MAX_SIZE = env.int('SAFE_TX_BULK_MAX_SIZE', default=50)  # Max txs relayed on the same request
+SAFE_INFO_BULK_MAX_SIZE = env.int('SAFE_INFO_BULK_MAX_SIZE', default=5000)  # Max Safes requested at once
+SAFE_INFO_BULK_CHUNK_SIZE = env.int('SAFE_INFO_BULK_CHUNK_SIZE', default=100)  # Safes read on every batch
 
 SAFE_CHECK_DEPLOYER_FUNDED_DELAY = env.int('SAFE_CHECK_DEPLOYER_FUNDED_DELAY', default=1 * 30)
 SAFE_CHECK_DEPLOYER_FUNDED_RETRIES = env.int('SAFE_CHECK_DEPLOYER_FUNDED_RETRIES', default=10)
 SAFE_FIXED_CREATION_COST = env.int('SAFE_FIXED_CREATION_COST', default=None)
 SAFE_ACCOUNTS_BALANCE_WARNING = env.int('SAFE_ACCOUNTS_BALANCE_WARNING', default=200000000000000000)  # 0.2 Eth
 SAFE_TX_NOT_MINED_ALERT_MINUTES = env('SAFE_TX_NOT_MINED_ALERT_MINUTES', default=15)
+# Txs not mined after `SAFE_TX_GAS_BUMP_STUCK_SECONDS` are replaced increasing gas price (capped at `fastest`)
+SAFE_TX_GAS_BUMP_STUCK_SECONDS = env.int('SAFE_TX_GAS_BUMP_STUCK_SECONDS', default=3 * 60)
+SAFE_TX_GAS_BUMP_PERCENTAGE = env.float('SAFE_TX_GAS_BUMP_PERCENTAGE', default=12.5)  # Must be >= 10
+SAFE_STATE_RPC_BATCH_SIZE = env.int('SAFE_STATE_RPC_BATCH_SIZE', default=50)
+SAFE_METADATA_CACHE_SIZE = env.int('SAFE_METADATA_CACHE_SIZE', default=4096)  # Safes kept in process memory
+SAFE_METADATA_LOCAL_CACHE_TTL = env.int('SAFE_METADATA_LOCAL_CACHE_TTL', default=60)  # Seconds
+SAFE_METADATA_MAX_AGE_BLOCKS = env.int('SAFE_METADATA_MAX_AGE_BLOCKS', default=5760)  # ~1 day
+SAFE_SIGNERS_CACHE_SIZE = env.int('SAFE_SIGNERS_CACHE_SIZE', default=4096)  # Recovered signatures kept in memory
+SAFE_OWNERS_CACHE_TIMEOUT = env.int('SAFE_OWNERS_CACHE_TIMEOUT', default=60 * 5)  # Seconds
+# Safe info and balances are cached for the latest block, stored by `update_safe_response_cache_task`
+SAFE_RESPONSE_CACHE_TIMEOUT = env.int('SAFE_RESPONSE_CACHE_TIMEOUT', default=60)  # Seconds
+# If block watcher stops, responses stop being cached after `SAFE_RESPONSE_CACHE_BLOCK_NUMBER_TIMEOUT` seconds
+SAFE_RESPONSE_CACHE_BLOCK_NUMBER_TIMEOUT = env.int('SAFE_RESPONSE_CACHE_BLOCK_NUMBER_TIMEOUT', default=30)
+# Safes requested in the last `SAFE_RESPONSE_CACHE_WARM_MAX_AGE` seconds are cached again on every new block
+SAFE_RESPONSE_CACHE_WARM_MAX_AGE = env.int('SAFE_RESPONSE_CACHE_WARM_MAX_AGE', default=60 * 5)
+SAFE_RESPONSE_CACHE_WARM_MAX_SAFES = env.int('SAFE_RESPONSE_CACHE_WARM_MAX_SAFES', default=100)
+SAFE_TX_ESTIMATION_CACHE_TIMEOUT = env.int('SAFE_TX_ESTIMATION_CACHE_TIMEOUT', default=60)  # Seconds
+SAFE_TX_ESTIMATION_TICKET_MAX_AGE = env.int('SAFE_TX_ESTIMATION_TICKET_MAX_AGE', default=120)  # Seconds
+SAFE_TX_ESTIMATION_TICKET_MAX_BLOCKS = env.int('SAFE_TX_ESTIMATION_TICKET_MAX_BLOCKS', default=10)
 
 NOTIFICATION_SERVICE_URI = env('NOTIFICATION_SERVICE_URI', default=None)
 NOTIFICATION_SERVICE_PASS = env('NOTIFICATION_SERVICE_PASS', default=None)
 
 TOKEN_LOGO_BASE_URI = env('TOKEN_LOGO_BASE_URI', default='https://gnosis-safe-token-logos.s3.amazonaws.com/')
 TOKEN_LOGO_EXTENSION = env('TOKEN_LOGO_EXTENSION', default='.png')
+GAS_TOKEN_PRICE_TIMEOUT = env.float('GAS_TOKEN_PRICE_TIMEOUT', default=2.)  # Seconds to resolve all the prices
+GAS_TOKEN_PRICE_MAX_WORKERS = env.int('GAS_TOKEN_PRICE_MAX_WORKERS', default=10)
 
 # Notifications
 SLACK_API_WEBHOOK = env('SLACK_API_WEBHOOK', default=None)
@@ -0,0 +1,12 @@
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def reset_gas_token_registry():
+    """
+    Gas tokens created on a test are rolled back, so process gas token registry must not be kept between tests
+    """
+    yield
+    from safe_relay_service.tokens.gas_token_registry import \
+        GasTokenRegistryProvider
+    GasTokenRegistryProvider.del_singleton()
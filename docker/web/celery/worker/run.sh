@@ -13,4 +13,5 @@ echo "==> $(date +%H:%M:%S) ==> Migrating Django models... "
 python manage.py migrate --noinput
 
 echo "==> $(date +%H:%M:%S) ==> Running Celery worker <=="
-exec celery -A safe_relay_service.taskapp worker --loglevel $log_level -c 4
+# Queued Safe txs are sent using the `relay` queue. It can be consumed by a dedicated worker setting `CELERY_QUEUES`
+exec celery -A safe_relay_service.taskapp worker --loglevel $log_level -c 4 -Q ${CELERY_QUEUES:-celery,relay}
@@ -1,6 +1,6 @@
 from django.contrib import admin
 
-from .models import GasPrice
+from .models import GasPrice, GasPriceRollup
 
 
 @admin.register(GasPrice)
@@ -8,3 +8,11 @@ class GasPriceAdmin(admin.ModelAdmin):
     date_hierarchy = 'created'
     list_display = ('created', 'lowest', 'safe_low', 'standard', 'fast', 'fastest')
     ordering = ['-created']
+
+
+@admin.register(GasPriceRollup)
+class GasPriceRollupAdmin(admin.ModelAdmin):
+    date_hierarchy = 'start'
+    list_display = ('start', 'resolution', 'count', 'lowest_min', 'standard_avg', 'fastest_max')
+    list_filter = ('resolution',)
+    ordering = ['-start']
@@ -0,0 +1,217 @@
+import json
+import pickle
+import random
+import threading
+import time
+import tracemalloc
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from logging import getLogger
+from typing import Any, Callable, Dict, List, NamedTuple, Optional
+
+from django.core.cache import cache
+from django.db import transaction
+from django.test import override_settings
+
+from web3 import Web3
+
+from .gas_station import GasStation
+
+logger = getLogger(__name__)
+
+# Benchmark runs on an isolated cache, so gas prices and blocks of the relay cache are never modified
+BENCHMARK_CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'gas-station-benchmark',
+    }
+}
+
+
+class SyntheticBlockGenerator:
+    """
+    Generate deterministic blocks (same `seed` and block number always return the same block) with random
+    txs, so gas station can be benchmarked without a real node
+    """
+    def __init__(self, current_block_number: int, txs_per_block: int = 150, seed: int = 0,
+                 median_gas_price: int = Web3.toWei(20, 'gwei')):
+        """
+        :param current_block_number: Number of the last block of the chain
+        :param txs_per_block: Average number of txs of every block
+        :param seed: Seed for the random generator
+        :param median_gas_price: Gas prices are generated using a log-normal distribution around this value
+        """
+        self.current_block_number = current_block_number
+        self.txs_per_block = txs_per_block
+        self.seed = seed
+        self.median_gas_price = median_gas_price
+
+    def get_block_hash(self, block_number: int) -> str:
+        return Web3.keccak(text=f'{self.seed}:{block_number}').hex()
+
+    def get_block(self, block_number: int) -> Optional[Dict[str, Any]]:
+        """
+        :param block_number:
+        :return: Block as returned by `eth_getBlockByNumber` with full transactions, `None` if block is not mined
+        """
+        if block_number > self.current_block_number:
+            return None
+        block_random = random.Random(self.seed * 1000003 + block_number)
+        number_of_txs = block_random.randint(self.txs_per_block // 2, self.txs_per_block * 3 // 2)
+        block_hash = self.get_block_hash(block_number)
+        transactions = [{
+            'blockHash': block_hash,
+            'blockNumber': hex(block_number),
+            'from': '0x' + '%040x' % block_random.getrandbits(160),
+            'gas': hex(21000),
+            'gasPrice': hex(int(self.median_gas_price * block_random.lognormvariate(0, 0.5))),
+            'hash': '0x' + '%064x' % block_random.getrandbits(256),
+            'input': '0x',
+            'nonce': hex(block_random.randint(0, 1000)),
+            'to': '0x' + '%040x' % block_random.getrandbits(160),
+            'transactionIndex': hex(index),
+            'value': hex(block_random.getrandbits(64)),
+        } for index in range(number_of_txs)]
+        if transactions:
+            transactions[0]['gasPrice'] = '0x0'  # Miner tx
+        return {
+            'number': hex(block_number),
+            'hash': block_hash,
+            'parentHash': self.get_block_hash(block_number - 1),
+            'gasLimit': hex(12500000),
+            'gasUsed': hex(21000 * number_of_txs),
+            'timestamp': hex(1500000000 + block_number * 13),
+            'transactions': transactions,
+        }
+
+
+class FakeEthereumNode:
+    """
+    In-process JSON-RPC endpoint (single and batch requests) serving the blocks of a `SyntheticBlockGenerator`.
+    Extra methods can be served using `methods`
+    """
+    def __init__(self, block_generator: SyntheticBlockGenerator,
+                 methods: Optional[Dict[str, Callable[[List[Any]], Any]]] = None):
+        self.block_generator = block_generator
+        self.methods = {
+            'eth_blockNumber': lambda params: hex(self.block_generator.current_block_number),
+            'eth_chainId': lambda params: '0x1',
+            'net_version': lambda params: '1',
+            'eth_getBlockByNumber': lambda params: self.block_generator.get_block(int(params[0], 16)),
+        }
+        self.methods.update(methods or {})
+        self.number_of_requests = 0
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), self._build_handler())
+        self.server.daemon_threads = True
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        return 'http://%s:%d' % self.server.server_address
+
+    def process_request(self, rpc_request: Dict[str, Any]) -> Dict[str, Any]:
+        method = self.methods.get(rpc_request.get('method'))
+        if not method:
+            return {'jsonrpc': '2.0', 'id': rpc_request.get('id'),
+                    'error': {'code': -32601, 'message': 'Method not found'}}
+        return {'jsonrpc': '2.0', 'id': rpc_request.get('id'), 'result': method(rpc_request.get('params', []))}
+
+    def _build_handler(self):
+        node = self
+
+        class JsonRpcHandler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                node.number_of_requests += 1
+                body = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+                if isinstance(body, list):
+                    response = [node.process_request(rpc_request) for rpc_request in body]
+                else:
+                    response = node.process_request(body)
+                data = json.dumps(response).encode()
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):
+                pass
+
+        return JsonRpcHandler
+
+    def __enter__(self) -> 'FakeEthereumNode':
+        self.thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class BenchmarkResult(NamedTuple):
+    number_of_blocks: int
+    run: str  # `cold`: empty cache, `warm-cache`: blocks on cache, `warm-window`: blocks already on the window
+    wall_time: float  # Seconds
+    peak_memory: int  # Bytes
+    cache_bytes: int  # Bytes used by the blocks stored on cache
+    number_of_requests: int  # Http requests sent to the node
+
+    def __str__(self):
+        return (f'blocks={self.number_of_blocks} run={self.run} wall-time={self.wall_time:.3f}s '
+                f'peak-memory={self.peak_memory / 1024 ** 2:.2f}MiB cache={self.cache_bytes / 1024 ** 2:.2f}MiB '
+                f'requests={self.number_of_requests}')
+
+
+class GasStationBenchmark:
+    """
+    Measure `GasStation.calculate_gas_prices` against a `FakeEthereumNode`. Gas prices stored on database are
+    rolled back and cache used is an isolated in-memory one, so it's safe to run on a live deployment. Node runs
+    on the same process, so time and memory spent serving the requests are included
+    """
+    def __init__(self, txs_per_block: int = 150, seed: int = 0, rpc_batch_size: int = 25,
+                 rpc_max_workers: int = 4):
+        self.txs_per_block = txs_per_block
+        self.seed = seed
+        self.rpc_batch_size = rpc_batch_size
+        self.rpc_max_workers = rpc_max_workers
+
+    def get_cache_bytes(self, gas_station: GasStation, block_numbers: range) -> int:
+        cached_blocks = cache.get_many([gas_station._get_block_cache_key(block_number)
+                                        for block_number in block_numbers])
+        return sum(len(pickle.dumps(cached_block)) for cached_block in cached_blocks.values())
+
+    def measure(self, run: str, gas_station: GasStation, node: FakeEthereumNode,
+                number_of_blocks: int) -> BenchmarkResult:
+        number_of_requests = node.number_of_requests
+        tracemalloc.start()
+        start = time.perf_counter()
+        gas_station.calculate_gas_prices()
+        wall_time = time.perf_counter() - start
+        _, peak_memory = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        current_block_number = node.block_generator.current_block_number
+        cache_bytes = self.get_cache_bytes(gas_station, range(current_block_number - number_of_blocks,
+                                                              current_block_number))
+        return BenchmarkResult(number_of_blocks, run, wall_time, peak_memory, cache_bytes,
+                               node.number_of_requests - number_of_requests)
+
+    def run(self, number_of_blocks: int) -> List[BenchmarkResult]:
+        """
+        :param number_of_blocks: Number of blocks used by the gas station
+        :return: Results for `cold`, `warm-cache` and `warm-window` runs
+        """
+        block_generator = SyntheticBlockGenerator(number_of_blocks * 2, txs_per_block=self.txs_per_block,
+                                                  seed=self.seed)
+        with FakeEthereumNode(block_generator) as node, transaction.atomic(), \
+                override_settings(CACHES=BENCHMARK_CACHES):
+            def build_gas_station() -> GasStation:
+                return GasStation(node.url, number_of_blocks=number_of_blocks,
+                                  rpc_batch_size=self.rpc_batch_size, rpc_max_workers=self.rpc_max_workers)
+
+            gas_station = build_gas_station()
+            cache.delete_many([gas_station._get_block_cache_key(block_number)
+                               for block_number in range(block_generator.current_block_number + 1)])
+            results = [self.measure('cold', gas_station, node, number_of_blocks),
+                       self.measure('warm-cache', build_gas_station(), node, number_of_blocks),
+                       self.measure('warm-window', gas_station, node, number_of_blocks)]
+            transaction.set_rollback(True)
+        return results
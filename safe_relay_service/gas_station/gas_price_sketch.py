@@ -0,0 +1,76 @@
+import math
+from typing import Iterable, Optional
+
+import numpy as np
+
+# Quantiles returned by the sketch will have a relative error lower than `RELATIVE_ACCURACY`
+RELATIVE_ACCURACY = 0.01
+GAMMA = (1 + RELATIVE_ACCURACY) / (1 - RELATIVE_ACCURACY)
+LOG_GAMMA = math.log(GAMMA)
+NUMBER_OF_BUCKETS = math.ceil(math.log(2**64) / LOG_GAMMA) + 1  # Enough buckets for every `uint64` gas price
+
+
+class GasPriceSketch:
+    """
+    Mergeable quantile sketch for gas prices (DDSketch like). Gas prices are stored as counts on logarithmic
+    buckets, so memory used is bounded by the number of buckets (not by the number of gas prices) and quantiles
+    have a relative error lower than `RELATIVE_ACCURACY`. Sketches are merged just adding the counts of the buckets.
+    `min` and `max` values are kept exact
+    """
+    def __init__(self, indexes: np.ndarray, counts: np.ndarray, min_value: Optional[int],
+                 max_value: Optional[int]):
+        """
+        :param indexes: Indexes of the non empty buckets (sorted)
+        :param counts: Number of gas prices on every bucket of `indexes`
+        :param min_value: Min gas price, `None` if sketch is empty
+        :param max_value: Max gas price, `None` if sketch is empty
+        """
+        self.indexes = indexes
+        self.counts = counts
+        self.min = min_value
+        self.max = max_value
+
+    def __len__(self) -> int:
+        return int(self.counts.sum())
+
+    @classmethod
+    def from_gas_prices(cls, gas_prices: Iterable[int]) -> 'GasPriceSketch':
+        gas_prices = np.asarray(gas_prices, dtype=np.uint64)
+        gas_prices = gas_prices[gas_prices > 0]  # Log of `0` is not defined
+        if not len(gas_prices):
+            return cls(np.empty(0, dtype=np.uint16), np.empty(0, dtype=np.uint32), None, None)
+
+        bucket_indexes = np.ceil(np.log(gas_prices.astype(np.float64)) / LOG_GAMMA).astype(np.uint16)
+        indexes, counts = np.unique(bucket_indexes, return_counts=True)
+        return cls(indexes, counts.astype(np.uint32), int(gas_prices.min()), int(gas_prices.max()))
+
+    @classmethod
+    def merge(cls, sketches: Iterable['GasPriceSketch']) -> 'GasPriceSketch':
+        sketches = [sketch for sketch in sketches if len(sketch.counts)]
+        if not sketches:
+            return cls.from_gas_prices([])
+
+        dense_counts = np.bincount(np.concatenate([sketch.indexes for sketch in sketches]),
+                                   weights=np.concatenate([sketch.counts for sketch in sketches]),
+                                   minlength=NUMBER_OF_BUCKETS)
+        indexes = np.flatnonzero(dense_counts).astype(np.uint16)
+        return cls(indexes, dense_counts[indexes].astype(np.uint64),
+                   min(sketch.min for sketch in sketches), max(sketch.max for sketch in sketches))
+
+    def percentile(self, q: float) -> int:
+        """
+        :param q: Percentile to compute, between 0 and 100
+        :return: Approximated percentile of the gas prices (relative error lower than `RELATIVE_ACCURACY`).
+        Percentile 0 and 100 are exact (`min` and `max`)
+        """
+        assert len(self.counts), 'Sketch is empty'
+        if q <= 0:
+            return self.min
+        elif q >= 100:
+            return self.max
+
+        rank = (len(self) - 1) * q / 100
+        position = int(np.searchsorted(np.cumsum(self.counts), rank, side='right'))
+        bucket_index = int(self.indexes[position])
+        value = 2 * GAMMA ** bucket_index / (GAMMA + 1)
+        return min(max(math.ceil(value), self.min), self.max)
@@ -0,0 +1,73 @@
+from typing import Dict, Iterable, Optional, Tuple
+
+from .gas_price_sketch import GasPriceSketch
+
+
+class GasPriceWindow:
+    """
+    Rolling window with the tx gas prices of the last blocks. Gas prices of every block are stored as a
+    `GasPriceSketch`, so memory is bounded even for windows of thousands of blocks and sketches for any range
+    of blocks in the window can be built merging the sketches of the blocks
+    """
+    def __init__(self):
+        self.blocks: Dict[int, GasPriceSketch] = {}
+        self.block_hashes: Dict[int, Tuple[Optional[str], Optional[str]]] = {}  # (block_hash, parent_hash)
+
+    def __contains__(self, block_number: int) -> bool:
+        return block_number in self.blocks
+
+    def __len__(self) -> int:
+        return len(self.blocks)
+
+    def add_block(self, block_number: int, gas_prices: Iterable[int], block_hash: Optional[str] = None,
+                  parent_hash: Optional[str] = None):
+        """
+        :param block_number:
+        :param gas_prices: Gas prices of the txs of the block. If block was already in the window it's replaced
+        :param block_hash:
+        :param parent_hash:
+        """
+        self.blocks[block_number] = GasPriceSketch.from_gas_prices(gas_prices)
+        self.block_hashes[block_number] = (block_hash, parent_hash)
+
+    def get_block_hashes(self, block_number: int) -> Optional[Tuple[Optional[str], Optional[str]]]:
+        """
+        :param block_number:
+        :return: `block_hash` and `parent_hash` of the block, `None` if block is not in the window
+        """
+        return self.block_hashes.get(block_number)
+
+    def remove_blocks(self, block_numbers: Iterable[int]) -> int:
+        """
+        :param block_numbers:
+        :return: Number of blocks removed from the window
+        """
+        removed_block_numbers = {block_number for block_number in block_numbers if block_number in self.blocks}
+        for block_number in removed_block_numbers:
+            del self.blocks[block_number]
+            del self.block_hashes[block_number]
+        return len(removed_block_numbers)
+
+    def evict_older_than(self, block_number: int) -> int:
+        """
+        Remove blocks with number lower than `block_number`
+        :param block_number:
+        :return: Number of blocks evicted
+        """
+        return self.remove_blocks([number for number in self.blocks if number < block_number])
+
+    def count_blocks(self, from_block_number: Optional[int] = None) -> int:
+        """
+        :param from_block_number: If provided, only blocks with number greater or equal are counted
+        :return: Number of blocks in the window
+        """
+        return len([block_number for block_number in self.blocks
+                    if from_block_number is None or block_number >= from_block_number])
+
+    def get_sketch(self, from_block_number: Optional[int] = None) -> GasPriceSketch:
+        """
+        :param from_block_number: If provided, only blocks with number greater or equal are used
+        :return: Sketch merging the sketches of the blocks in the window
+        """
+        return GasPriceSketch.merge(sketch for block_number, sketch in self.blocks.items()
+                                    if from_block_number is None or block_number >= from_block_number)
@@ -1,35 +1,80 @@
-import math
+import time
 from logging import getLogger
-from typing import Any, Dict, Iterable, List, Optional
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
 
 from django.conf import settings
 from django.core.cache import cache
 
 import numpy as np
-import requests
+from redis import Redis
+from redis.exceptions import RedisError
+from requests.exceptions import RequestException
 from web3 import HTTPProvider, Web3
 from web3.middleware import geth_poa_middleware
 
-from .models import GasPrice
+from safe_relay_service.utils.json_rpc import (JsonRpcBatchClient,
+                                               JsonRpcBatchException)
+
+from .gas_price_sketch import GasPriceSketch
+from .gas_price_window import GasPriceWindow
+from .mempool_predictor import MempoolNotAvailable, MempoolPredictor
+from .models import GasPrice, GasPriceRollup
 
 logger = getLogger(__name__)
 
+UINT64_MAX = 2**64 - 1
+GAS_PRICE_UPDATED_CHANNEL = 'gas-station:gas-price-updated'
+
 
 class NoBlocksFound(Exception):
     pass
 
 
+class CachedBlockGasPrices(NamedTuple):
+    """
+    Compact representation of a block stored on cache. Just the non zero gas prices of the txs are stored,
+    packed as `uint64`, instead of the full block with every tx. Block hash and parent hash are kept to
+    detect reorgs
+    """
+    number: int
+    block_hash: str
+    parent_hash: str
+    gas_prices: bytes  # `np.uint64` packed array
+
+    @classmethod
+    def from_block(cls, block: Dict[str, Any]) -> 'CachedBlockGasPrices':
+        """
+        :param block: Block as returned by `eth_getBlockByNumber` with full transactions
+        :return: CachedBlockGasPrices
+        """
+        gas_prices = [int(transaction['gasPrice'], 16) for transaction in block['transactions']]
+        # Don't include miner transactions (0 gasPrice). Gas prices bigger than `uint64` are not realistic
+        gas_prices = np.array([min(gas_price, UINT64_MAX) for gas_price in gas_prices if gas_price],
+                              dtype=np.uint64)
+        return cls(int(block['number'], 16), block['hash'], block['parentHash'], gas_prices.tobytes())
+
+    def get_gas_prices(self) -> np.ndarray:
+        return np.frombuffer(self.gas_prices, dtype=np.uint64)
+
+
 class GasStationProvider:
     def __new__(cls):
         if not hasattr(cls, 'instance'):
             if settings.FIXED_GAS_PRICE is not None:
                 cls.instance = GasStationMock(gas_price=settings.FIXED_GAS_PRICE)
             else:
-                cls.instance = GasStation(settings.ETHEREUM_NODE_URL, settings.GAS_STATION_NUMBER_BLOCKS)
+                cls.instance = GasStation(settings.ETHEREUM_NODE_URL, settings.GAS_STATION_NUMBER_BLOCKS,
+                                          horizons=settings.GAS_STATION_HORIZONS,
+                                          rpc_batch_size=settings.GAS_STATION_RPC_BATCH_SIZE,
+                                          rpc_max_workers=settings.GAS_STATION_RPC_MAX_WORKERS,
+                                          snapshot_ttl_seconds=settings.GAS_STATION_SNAPSHOT_TTL_SECONDS,
+                                          mempool_predictor=settings.GAS_STATION_MEMPOOL_PREDICTOR)
                 w3 = cls.instance.w3
                 if w3.isConnected() and int(w3.net.version) > 314158:  # Ganache
                     logger.warning('Using mock Gas Station because no `w3.net.version` was detected')
                     cls.instance = GasStationMock()
+                elif settings.GAS_STATION_SNAPSHOT_TTL_SECONDS:
+                    cls.instance.start_snapshot_invalidation_listener(Redis.from_url(settings.REDIS_URL))
         return cls.instance
 
     @classmethod
@@ -43,13 +88,39 @@ class GasStation:
                  http_provider_uri='http://localhost:8545',
                  number_of_blocks: int = 200,
                  cache_timeout_seconds: int = 10 * 60,
-                 constant_gas_increment: int = 1):  # Increase a little for fastest mining for API Calls
+                 constant_gas_increment: int = 1,  # Increase a little for fastest mining for API Calls
+                 horizons: Sequence[int] = (),
+                 rpc_batch_size: int = 25,
+                 rpc_max_workers: int = 4,
+                 snapshot_ttl_seconds: int = 0,
+                 mempool_predictor: bool = False):
+        """
+        :param http_provider_uri: Ethereum node url
+        :param number_of_blocks: Number of blocks used for calculating the stored `GasPrice`
+        :param cache_timeout_seconds: Timeout for the blocks stored on cache
+        :param constant_gas_increment: Increment added to every calculated gas price
+        :param horizons: Extra number of blocks to calculate gas prices for (e.g. `[1000, 5000]`), available
+        using `get_gas_prices(number_of_blocks)`
+        :param rpc_batch_size: Max number of blocks requested in the same JSON-RPC batch
+        :param rpc_max_workers: Max number of JSON-RPC batches in flight at the same time
+        :param snapshot_ttl_seconds: Seconds last `GasPrice` is kept in process memory, so `get_gas_prices` doesn't
+        hit the cache. `0` to disable it
+        :param mempool_predictor: If `True`, use the pending txs of the node to estimate the blocks a tx will take
+        to be mined for every gas price tier
+        """
 
         self.http_provider_uri = http_provider_uri
-        self.http_session = requests.session()
+        self.json_rpc_client = JsonRpcBatchClient(http_provider_uri, batch_size=rpc_batch_size,
+                                                  max_workers=rpc_max_workers)
         self.number_of_blocks = number_of_blocks
+        self.horizons = sorted(set(horizons) - {number_of_blocks})
         self.cache_timeout = cache_timeout_seconds
         self.constant_gas_increment = constant_gas_increment
+        self.window = GasPriceWindow()  # Kept between runs, so only new blocks are requested
+        self.snapshot_ttl = snapshot_ttl_seconds
+        self.snapshot: Optional[Tuple[float, GasPrice]] = None  # (expiration, gas_price)
+        self.snapshot_listener = None
+        self.mempool_predictor = MempoolPredictor(self.json_rpc_client) if mempool_predictor else None
         self.w3 = Web3(HTTPProvider(http_provider_uri))
         try:
             if self.w3.net.version != 1:
@@ -58,23 +129,68 @@ class GasStation:
         except (ConnectionError, FileNotFoundError):
             self.w3.middleware_onion.inject(geth_poa_middleware, layer=0)
 
-    def _get_block_cache_key(self, block_number):
-        return 'block:%d' % block_number
+    def _get_block_cache_key(self, block_number: int) -> str:
+        return 'block-gas-prices-with-hash:%d' % block_number
+
+    def _get_blocks_from_cache(self, block_numbers: Iterable[int]) -> Dict[int, CachedBlockGasPrices]:
+        cache_keys = {self._get_block_cache_key(block_number): block_number for block_number in block_numbers}
+        return {cache_keys[cache_key]: cached_block
+                for cache_key, cached_block in cache.get_many(cache_keys.keys()).items()}
+
+    def _store_blocks_in_cache(self, cached_blocks: Iterable[CachedBlockGasPrices]):
+        return cache.set_many({self._get_block_cache_key(cached_block.number): cached_block
+                               for cached_block in cached_blocks}, self.cache_timeout)
+
+    def _delete_blocks_from_cache(self, block_numbers: Iterable[int]):
+        return cache.delete_many([self._get_block_cache_key(block_number) for block_number in block_numbers])
 
-    def _get_block_from_cache(self, block_number):
-        return cache.get(self._get_block_cache_key(block_number))
+    def _get_gas_price_cache_key(self, number_of_blocks: Optional[int] = None):
+        if number_of_blocks is None:
+            return 'gas_price'
+        return 'gas_price:%d' % number_of_blocks
 
-    def _store_block_in_cache(self, block_number, block):
-        return cache.set(self._get_block_cache_key(block_number), block, self.cache_timeout)
+    def _get_gas_price_from_cache(self, number_of_blocks: Optional[int] = None):
+        return cache.get(self._get_gas_price_cache_key(number_of_blocks))
 
-    def _get_gas_price_cache_key(self):
-        return 'gas_price'
+    def _store_gas_price_in_cache(self, gas_price, number_of_blocks: Optional[int] = None):
+        return cache.set(self._get_gas_price_cache_key(number_of_blocks), gas_price)
 
-    def _get_gas_price_from_cache(self):
-        return cache.get(self._get_gas_price_cache_key())
+    def _get_gas_price_from_snapshot(self) -> Optional[GasPrice]:
+        snapshot = self.snapshot  # Can be replaced by the listener thread
+        if snapshot and snapshot[0] > time.monotonic():
+            return snapshot[1]
 
-    def _store_gas_price_in_cache(self, gas_price):
-        return cache.set(self._get_gas_price_cache_key(), gas_price)
+    def _store_gas_price_in_snapshot(self, gas_price: GasPrice):
+        if self.snapshot_ttl:
+            self.snapshot = (time.monotonic() + self.snapshot_ttl, gas_price)
+
+    def invalidate_snapshot(self, *args):
+        """
+        Remove `GasPrice` kept in process memory, next `get_gas_prices` call will retrieve it from the cache
+        """
+        self.snapshot = None
+
+    def start_snapshot_invalidation_listener(self, redis: Redis):
+        """
+        Subscribe to `GAS_PRICE_UPDATED_CHANNEL` on a daemon thread, so snapshot is invalidated as soon as new
+        gas prices are calculated
+        :param redis:
+        """
+        try:
+            pubsub = redis.pubsub(ignore_subscribe_messages=True)
+            pubsub.subscribe(**{GAS_PRICE_UPDATED_CHANNEL: self.invalidate_snapshot})
+            self.snapshot_listener = pubsub.run_in_thread(sleep_time=1, daemon=True)
+        except RedisError:
+            logger.warning('Cannot subscribe to gas price updates, snapshot will only expire by ttl', exc_info=True)
+
+    @staticmethod
+    def publish_gas_price_updated(redis: Redis) -> int:
+        """
+        Notify every process that new gas prices were calculated
+        :param redis:
+        :return: Number of processes notified
+        """
+        return redis.publish(GAS_PRICE_UPDATED_CHANNEL, 'updated')
 
     def _build_block_request(self, block_number: int, full_transactions: bool=False) -> Dict[str, Any]:
         block_number_hex = '0x{:x}'.format(block_number)
@@ -83,75 +199,178 @@ class GasStation:
                 "params": [block_number_hex, full_transactions],
                 "id": block_number}
 
-    def _do_request(self, rpc_request):
-        return self.http_session.post(self.http_provider_uri, json=rpc_request).json()
+    def _do_request(self, rpc_request: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        return self.json_rpc_client.request(rpc_request)
 
-    def get_tx_gas_prices(self, block_numbers: Iterable[int]) -> List[int]:
+    def get_blocks(self, block_numbers: Iterable[int], use_cache: bool = True) -> Dict[int, CachedBlockGasPrices]:
         """
         :param block_numbers: Block numbers to retrieve
-        :return: Return a list with `gas_price` for every block provided
+        :param use_cache: If `False`, blocks are always requested to the node (and cache is updated)
+        :return: Dictionary with `block_number` as key and `CachedBlockGasPrices` as value. Blocks not found
+        are not returned
         """
-        cached_blocks = []
-        not_cached_block_numbers = []
-
-        for block_number in block_numbers:
-            block = self._get_block_from_cache(block_number)
-            if block:
-                cached_blocks.append(block)
-            else:
-                not_cached_block_numbers.append(block_number)
+        block_numbers = list(block_numbers)
+        cached_blocks = self._get_blocks_from_cache(block_numbers) if use_cache else {}
+        not_cached_block_numbers = [block_number for block_number in block_numbers
+                                    if block_number not in cached_blocks]
 
         rpc_request = [self._build_block_request(block_number, full_transactions=True)
                        for block_number in not_cached_block_numbers]
 
         requested_blocks = []
-        for rpc_response in self._do_request(rpc_request):
-            block = rpc_response['result']
+        for rpc_response in self._do_request(rpc_request) if rpc_request else []:
+            block = rpc_response.get('result')
             if block:
-                requested_blocks.append(block)
-                block_number = int(block['number'], 16)
-                self._store_block_in_cache(block_number, block)
+                requested_blocks.append(CachedBlockGasPrices.from_block(block))
             else:
                 block_number = rpc_response['id']
                 logger.warning('Cannot find block-number=%d, a reorg happened', block_number)
+        self._store_blocks_in_cache(requested_blocks)
 
-        gas_prices = []
-        for block in requested_blocks + cached_blocks:
-            for transaction in block['transactions']:
-                gas_price = int(transaction['gasPrice'], 16)
-                # Don't include miner transactions (0 gasPrice)
-                if gas_price:
-                    gas_prices.append(gas_price)
+        return {cached_block.number: cached_block for cached_block in requested_blocks + list(cached_blocks.values())}
 
-        return gas_prices
+    def get_block_gas_prices(self, block_numbers: Iterable[int]) -> Dict[int, np.ndarray]:
+        """
+        :param block_numbers: Block numbers to retrieve
+        :return: Dictionary with `block_number` as key and a `np.uint64` array with the `gas_price` of its txs
+        as value. Blocks not found are not returned
+        """
+        return {block_number: cached_block.get_gas_prices()
+                for block_number, cached_block in self.get_blocks(block_numbers).items()}
+
+    def get_tx_gas_prices(self, block_numbers: Iterable[int]) -> List[int]:
+        """
+        :param block_numbers: Block numbers to retrieve
+        :return: Return a list with `gas_price` for every block provided
+        """
+        block_gas_prices = list(self.get_block_gas_prices(block_numbers).values())
+        return np.concatenate(block_gas_prices).tolist() if block_gas_prices else []
+
+    def _get_block_hashes(self, block_number: int,
+                          new_blocks: Dict[int, CachedBlockGasPrices]) -> Optional[Tuple[str, str]]:
+        """
+        :return: `block_hash` and `parent_hash` for `block_number` from `new_blocks` or the window
+        """
+        if block_number in new_blocks:
+            return new_blocks[block_number].block_hash, new_blocks[block_number].parent_hash
+        return self.window.get_block_hashes(block_number)
+
+    def _fix_reorgs(self, new_blocks: Dict[int, CachedBlockGasPrices], from_block_number: int,
+                    to_block_number: int) -> int:
+        """
+        Check `parent_hash` of every block matches the `block_hash` of the previous one, from the newest block
+        to the oldest. If not, previous block is orphaned: it's evicted from the window and cache and requested
+        again to the node. Check stops when blocks already verified on the window are reached
+        :param new_blocks: Blocks not in the window yet. Updated with the refetched blocks
+        :param from_block_number: First block of the window
+        :param to_block_number: Last block of the window
+        :return: Number of orphaned blocks
+        """
+        orphaned_blocks = 0
+        for block_number in range(to_block_number, from_block_number, -1):
+            parent_block_number = block_number - 1
+            if block_number not in new_blocks and parent_block_number not in new_blocks:
+                break  # Window is already consistent
+            block_hashes = self._get_block_hashes(block_number, new_blocks)
+            parent_block_hashes = self._get_block_hashes(parent_block_number, new_blocks)
+            if (not block_hashes or not parent_block_hashes or None in (block_hashes[1], parent_block_hashes[0])
+                    or block_hashes[1] == parent_block_hashes[0]):
+                continue
+
+            logger.warning('Reorg detected, block-number=%d with hash=%s is orphaned', parent_block_number,
+                           parent_block_hashes[0])
+            orphaned_blocks += 1
+            self.window.remove_blocks([parent_block_number])
+            self._delete_blocks_from_cache([parent_block_number])
+            new_blocks.pop(parent_block_number, None)
+            new_blocks.update(self.get_blocks([parent_block_number], use_cache=False))
+        return orphaned_blocks
+
+    def update_window(self, current_block_number: int) -> GasPriceWindow:
+        """
+        Evict blocks out of the window (the biggest of `number_of_blocks` and `horizons`) and retrieve only
+        the blocks not processed yet. Chain continuity is checked, so blocks orphaned by a reorg are replaced
+        :param current_block_number:
+        :return: Updated window
+        """
+        from_block_number = max(current_block_number - max([self.number_of_blocks] + self.horizons), 0)
+        self.window.evict_older_than(from_block_number)
+        self.window.remove_blocks([block_number for block_number in list(self.window.blocks)
+                                   if block_number >= current_block_number])
+        new_block_numbers = [block_number for block_number in range(from_block_number, current_block_number)
+                             if block_number not in self.window]
+        new_blocks = self.get_blocks(new_block_numbers)
+        self._fix_reorgs(new_blocks, from_block_number, current_block_number - 1)
+        for block_number, cached_block in new_blocks.items():
+            self.window.add_block(block_number, cached_block.get_gas_prices(), block_hash=cached_block.block_hash,
+                                  parent_hash=cached_block.parent_hash)
+        logger.debug('Gas price window updated with %d new blocks', len(new_blocks))
+        return self.window
+
+    def _build_gas_price(self, sketch: GasPriceSketch) -> GasPrice:
+        """
+        :param sketch: Sketch with the gas prices of the blocks
+        :return: `GasPrice` (not stored in database)
+        """
+        return GasPrice(lowest=sketch.min + self.constant_gas_increment,
+                        safe_low=sketch.percentile(30) + self.constant_gas_increment,
+                        standard=sketch.percentile(50) + self.constant_gas_increment,
+                        fast=sketch.percentile(75) + self.constant_gas_increment,
+                        fastest=sketch.max + self.constant_gas_increment)
+
+    def _set_expected_blocks(self, gas_price: GasPrice, sketch: GasPriceSketch, number_of_blocks: int):
+        """
+        Set `<band>_expected_blocks` fields of `gas_price` using the mempool predictor. If mempool cannot be
+        retrieved fields are left empty
+        :param gas_price:
+        :param sketch: Sketch with the gas prices of the last blocks
+        :param number_of_blocks: Number of blocks of `sketch`
+        """
+        try:
+            expected_blocks = self.mempool_predictor.predict(gas_price, len(sketch) / max(number_of_blocks, 1))
+            for field, value in expected_blocks.items():
+                setattr(gas_price, field, value)
+        except (MempoolNotAvailable, RequestException, JsonRpcBatchException):
+            logger.warning('Cannot retrieve mempool, expected blocks are not calculated', exc_info=True)
 
     def calculate_gas_prices(self) -> GasPrice:
         current_block_number = self.w3.eth.blockNumber
-        block_numbers = range(current_block_number - self.number_of_blocks, current_block_number)
-        gas_prices = self.get_tx_gas_prices(block_numbers)
+        window = self.update_window(current_block_number)
 
-        if not gas_prices:
+        from_block_number = current_block_number - self.number_of_blocks
+        sketch = window.get_sketch(from_block_number=from_block_number)
+        if not len(sketch):
             raise NoBlocksFound
         else:
-            np_gas_prices = np.array(gas_prices)
-            lowest = np_gas_prices.min() + self.constant_gas_increment
-            safe_low = math.ceil(np.percentile(np_gas_prices, 30)) + self.constant_gas_increment
-            standard = math.ceil(np.percentile(np_gas_prices, 50)) + self.constant_gas_increment
-            fast = math.ceil(np.percentile(np_gas_prices, 75)) + self.constant_gas_increment
-            fastest = np_gas_prices.max() + self.constant_gas_increment
-
-            gas_price = GasPrice.objects.create(lowest=lowest,
-                                                safe_low=safe_low,
-                                                standard=standard,
-                                                fast=fast,
-                                                fastest=fastest)
-
+            gas_price = self._build_gas_price(sketch)
+            if self.mempool_predictor:
+                self._set_expected_blocks(gas_price, sketch, window.count_blocks(from_block_number))
+            gas_price.save()
+            GasPriceRollup.objects.add_gas_price(gas_price)
             self._store_gas_price_in_cache(gas_price)
-            logger.info(f'Calculated gas price lowest={lowest} safe_low={safe_low} standard={standard} '
-                        f'fast={fast} fastest={fastest}')
+            self._store_gas_price_in_snapshot(gas_price)
+            logger.info(f'Calculated gas price lowest={gas_price.lowest} safe_low={gas_price.safe_low} '
+                        f'standard={gas_price.standard} fast={gas_price.fast} fastest={gas_price.fastest}')
+
+            for horizon in self.horizons:
+                horizon_sketch = window.get_sketch(from_block_number=current_block_number - horizon)
+                if len(horizon_sketch):
+                    self._store_gas_price_in_cache(self._build_gas_price(horizon_sketch), horizon)
             return gas_price
 
-    def get_gas_prices(self) -> GasPrice:
+    def get_gas_prices(self, number_of_blocks: Optional[int] = None) -> Optional[GasPrice]:
+        """
+        :param number_of_blocks: If provided, return gas prices calculated using that number of blocks. It must be
+        one of the configured `horizons`
+        :return: Last calculated gas prices. `None` if gas prices for `number_of_blocks` are not available
+        """
+        if number_of_blocks is not None and number_of_blocks != self.number_of_blocks:
+            return self._get_gas_price_from_cache(number_of_blocks) if number_of_blocks in self.horizons else None
+
+        gas_price = self._get_gas_price_from_snapshot()
+        if gas_price:
+            return gas_price  # Snapshot is not stored again, so it expires even if invalidation is lost
+
         gas_price = self._get_gas_price_from_cache()
         if not gas_price:
             try:
@@ -160,6 +379,7 @@ class GasStation:
                 # This should never happen, just the first execution
                 # Celery worker should have GasPrice created
                 gas_price = self.calculate_gas_prices()
+        self._store_gas_price_in_snapshot(gas_price)
         return gas_price
 
 
@@ -185,5 +405,5 @@ class GasStationMock(GasStation):
                         fast=self.fast,
                         fastest=self.fastest)
 
-    def get_gas_prices(self) -> GasPrice:
+    def get_gas_prices(self, number_of_blocks: Optional[int] = None) -> Optional[GasPrice]:
         return self.calculate_gas_prices()
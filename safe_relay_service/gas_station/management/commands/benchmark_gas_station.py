@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+
+from ...benchmark import GasStationBenchmark
+
+
+class Command(BaseCommand):
+    help = 'Benchmark gas price calculation against a fake node with synthetic blocks'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--blocks', nargs='+', type=int, default=[200, 1000, 10000],
+                            help='Number of blocks used by the gas station')
+        parser.add_argument('--txs-per-block', type=int, default=150, help='Average number of txs per block')
+        parser.add_argument('--rpc-batch-size', type=int, default=25)
+        parser.add_argument('--rpc-max-workers', type=int, default=4)
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        benchmark = GasStationBenchmark(txs_per_block=options['txs_per_block'], seed=options['seed'],
+                                        rpc_batch_size=options['rpc_batch_size'],
+                                        rpc_max_workers=options['rpc_max_workers'])
+        for number_of_blocks in options['blocks']:
+            for result in benchmark.run(number_of_blocks):
+                self.stdout.write(str(result))
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+from django.utils.dateparse import parse_datetime
+
+from ...models import GasPriceRollup
+
+
+class Command(BaseCommand):
+    help = 'Rebuild hourly and daily gas price rollups from the stored gas prices'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--from-date', help='ISO 8601 date to rebuild rollups from. If not set, rebuild all')
+
+    def handle(self, *args, **options):
+        from_date = parse_datetime(options['from_date']) if options['from_date'] else None
+        number_rollups = GasPriceRollup.objects.rebuild(from_date=from_date)
+        self.stdout.write(self.style.SUCCESS(f'Created {number_rollups} gas price rollups'))
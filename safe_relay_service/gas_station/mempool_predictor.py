@@ -0,0 +1,77 @@
+import math
+from bisect import bisect_left
+from logging import getLogger
+from typing import Dict, List, Optional
+
+from safe_relay_service.utils.json_rpc import JsonRpcBatchClient
+
+from .models import GAS_PRICE_BANDS, GasPrice
+
+logger = getLogger(__name__)
+
+
+class MempoolNotAvailable(Exception):
+    pass
+
+
+class MempoolPredictor:
+    """
+    Estimate how many blocks a tx will take to be mined for every gas price tier, using the txs waiting on the
+    node mempool. Txs with a gas price higher or equal than the tier are expected to be mined first, and blocks
+    are expected to include as many txs as the recent blocks
+    """
+    def __init__(self, json_rpc_client: JsonRpcBatchClient, max_blocks: int = 100):
+        """
+        :param json_rpc_client:
+        :param max_blocks: Max number of blocks returned as a prediction
+        """
+        self.json_rpc_client = json_rpc_client
+        self.max_blocks = max_blocks
+
+    def _parse_pending_transactions(self, method: str, result) -> List[Dict[str, str]]:
+        if method == 'txpool_content':
+            return [tx for txs_by_nonce in result['pending'].values() for tx in txs_by_nonce.values()]
+        return result
+
+    def get_pending_gas_prices(self) -> List[int]:
+        """
+        Use `txpool_content` (geth/parity/erigon) or `eth_pendingTransactions` if not supported
+        :return: Sorted gas prices of the pending txs
+        :raises: MempoolNotAvailable
+        """
+        for method in ('txpool_content', 'eth_pendingTransactions'):
+            rpc_request = {'jsonrpc': '2.0', 'method': method, 'params': [], 'id': 1}
+            rpc_responses = self.json_rpc_client.request([rpc_request])
+            result = rpc_responses[0].get('result') if rpc_responses else None
+            if result is None:
+                logger.debug('Cannot retrieve mempool using %s', method)
+                continue
+            return sorted(int(tx['gasPrice'], 16) for tx in self._parse_pending_transactions(method, result))
+        raise MempoolNotAvailable('Node does not support `txpool_content` or `eth_pendingTransactions`')
+
+    def get_expected_blocks(self, pending_gas_prices: List[int], gas_price: int,
+                            txs_per_block: float) -> Optional[int]:
+        """
+        :param pending_gas_prices: Sorted gas prices of the pending txs
+        :param gas_price:
+        :param txs_per_block: Average number of txs included on the recent blocks
+        :return: Expected number of blocks for a tx with `gas_price` to be mined (capped to `max_blocks`).
+        `None` if it cannot be estimated
+        """
+        if txs_per_block <= 0:
+            return None
+        pending_txs_ahead = len(pending_gas_prices) - bisect_left(pending_gas_prices, gas_price)
+        return min(math.ceil((pending_txs_ahead + 1) / txs_per_block), self.max_blocks)
+
+    def predict(self, gas_price: GasPrice, txs_per_block: float) -> Dict[str, Optional[int]]:
+        """
+        :param gas_price: Calculated gas prices
+        :param txs_per_block: Average number of txs included on the recent blocks
+        :return: Dictionary with the `GasPrice` expected blocks field (e.g. `fast_expected_blocks`) as key and the
+        expected blocks for that tier as value
+        :raises: MempoolNotAvailable
+        """
+        pending_gas_prices = self.get_pending_gas_prices()
+        return {band + '_expected_blocks': self.get_expected_blocks(pending_gas_prices, getattr(gas_price, band),
+                                                                    txs_per_block)
+                for band in GAS_PRICE_BANDS}
@@ -0,0 +1,40 @@
+# Generated by Django 3.0.6 on 2026-10-18 10:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gas_station', '0002_auto_20180604_1627'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GasPriceRollup',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('resolution', models.PositiveSmallIntegerField(choices=[(0, 'HOUR'), (1, 'DAY')])),
+                ('start', models.DateTimeField()),
+                ('count', models.PositiveIntegerField()),
+                ('lowest_min', models.BigIntegerField()),
+                ('lowest_max', models.BigIntegerField()),
+                ('lowest_sum', models.DecimalField(decimal_places=0, max_digits=40)),
+                ('safe_low_min', models.BigIntegerField()),
+                ('safe_low_max', models.BigIntegerField()),
+                ('safe_low_sum', models.DecimalField(decimal_places=0, max_digits=40)),
+                ('standard_min', models.BigIntegerField()),
+                ('standard_max', models.BigIntegerField()),
+                ('standard_sum', models.DecimalField(decimal_places=0, max_digits=40)),
+                ('fast_min', models.BigIntegerField()),
+                ('fast_max', models.BigIntegerField()),
+                ('fast_sum', models.DecimalField(decimal_places=0, max_digits=40)),
+                ('fastest_min', models.BigIntegerField()),
+                ('fastest_max', models.BigIntegerField()),
+                ('fastest_sum', models.DecimalField(decimal_places=0, max_digits=40)),
+            ],
+            options={
+                'unique_together': {('resolution', 'start')},
+            },
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 3.0.6 on 2026-10-18 11:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gas_station', '0003_gaspricerollup'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='gasprice',
+            name='lowest_expected_blocks',
+            field=models.PositiveIntegerField(default=None, null=True),
+        ),
+        migrations.AddField(
+            model_name='gasprice',
+            name='safe_low_expected_blocks',
+            field=models.PositiveIntegerField(default=None, null=True),
+        ),
+        migrations.AddField(
+            model_name='gasprice',
+            name='standard_expected_blocks',
+            field=models.PositiveIntegerField(default=None, null=True),
+        ),
+        migrations.AddField(
+            model_name='gasprice',
+            name='fast_expected_blocks',
+            field=models.PositiveIntegerField(default=None, null=True),
+        ),
+        migrations.AddField(
+            model_name='gasprice',
+            name='fastest_expected_blocks',
+            field=models.PositiveIntegerField(default=None, null=True),
+        ),
+    ]
@@ -1,7 +1,15 @@
-from django.db import models
+import datetime
+from enum import Enum
+from typing import Optional
+
+from django.db import IntegrityError, models, transaction
+from django.db.models import Count, F, Max, Min, Sum, Value
+from django.db.models.functions import Greatest, Least, TruncDay, TruncHour
 
 from model_utils.models import TimeStampedModel
 
+GAS_PRICE_BANDS = ('lowest', 'safe_low', 'standard', 'fast', 'fastest')
+
 
 class GasPrice(TimeStampedModel):
     lowest = models.BigIntegerField()
@@ -9,6 +17,12 @@ class GasPrice(TimeStampedModel):
     standard = models.BigIntegerField()
     fast = models.BigIntegerField()
     fastest = models.BigIntegerField()
+    # Expected blocks for a tx to be mined, only calculated if mempool predictor is enabled
+    lowest_expected_blocks = models.PositiveIntegerField(null=True, default=None)
+    safe_low_expected_blocks = models.PositiveIntegerField(null=True, default=None)
+    standard_expected_blocks = models.PositiveIntegerField(null=True, default=None)
+    fast_expected_blocks = models.PositiveIntegerField(null=True, default=None)
+    fastest_expected_blocks = models.PositiveIntegerField(null=True, default=None)
 
     class Meta:
         get_latest_by = 'created'
@@ -20,3 +34,134 @@ class GasPrice(TimeStampedModel):
                                                                             self.standard,
                                                                             self.fast,
                                                                             self.fastest)
+
+
+class GasPriceResolution(Enum):
+    HOUR = 0
+    DAY = 1
+
+    @staticmethod
+    def parse(resolution: str) -> 'GasPriceResolution':
+        try:
+            return GasPriceResolution[resolution.upper()]
+        except KeyError:
+            raise ValueError('%s is not a valid GasPriceResolution' % resolution)
+
+    def truncate(self, date: datetime.datetime) -> datetime.datetime:
+        """
+        :param date:
+        :return: Start of the band `date` belongs to
+        """
+        date = date.replace(minute=0, second=0, microsecond=0)
+        return date.replace(hour=0) if self == GasPriceResolution.DAY else date
+
+    def get_trunc_function(self):
+        return TruncDay if self == GasPriceResolution.DAY else TruncHour
+
+
+class GasPriceRollupManager(models.Manager):
+    def add_gas_price(self, gas_price: GasPrice):
+        """
+        Update the rollups (every resolution) `gas_price` belongs to, creating them if they don't exist
+        :param gas_price: Stored `GasPrice`
+        """
+        for resolution in GasPriceResolution:
+            start = resolution.truncate(gas_price.created)
+            updates = {'count': F('count') + 1}
+            for band in GAS_PRICE_BANDS:
+                value = getattr(gas_price, band)
+                updates[band + '_min'] = Least(F(band + '_min'), Value(value))
+                updates[band + '_max'] = Greatest(F(band + '_max'), Value(value))
+                updates[band + '_sum'] = F(band + '_sum') + value
+
+            if not self.filter(resolution=resolution.value, start=start).update(**updates):
+                values = {}
+                for band in GAS_PRICE_BANDS:
+                    value = getattr(gas_price, band)
+                    values.update({band + '_min': value, band + '_max': value, band + '_sum': value})
+                try:
+                    with transaction.atomic():
+                        self.create(resolution=resolution.value, start=start, count=1, **values)
+                except IntegrityError:  # Created by other process in the meantime
+                    self.filter(resolution=resolution.value, start=start).update(**updates)
+
+    def rebuild(self, from_date: Optional[datetime.datetime] = None) -> int:
+        """
+        Recalculate rollups from the stored `GasPrice`
+        :param from_date: If provided, only rollups from that date are rebuilt
+        :return: Number of rollups created
+        """
+        number_rollups = 0
+        with transaction.atomic():
+            for resolution in GasPriceResolution:
+                gas_prices = GasPrice.objects.all()
+                rollups = self.filter(resolution=resolution.value)
+                if from_date:
+                    resolution_from_date = resolution.truncate(from_date)
+                    gas_prices = gas_prices.filter(created__gte=resolution_from_date)
+                    rollups = rollups.filter(start__gte=resolution_from_date)
+                rollups.delete()
+
+                aggregates = {'count': Count('id')}
+                for band in GAS_PRICE_BANDS:
+                    aggregates.update({band + '_min': Min(band), band + '_max': Max(band), band + '_sum': Sum(band)})
+                bands = gas_prices.annotate(
+                    start=resolution.get_trunc_function()('created')
+                ).values('start').annotate(**aggregates).order_by('start')
+                created = self.bulk_create([self.model(resolution=resolution.value, **band) for band in bands])
+                number_rollups += len(created)
+        return number_rollups
+
+
+class GasPriceRollup(models.Model):
+    """
+    Min, avg and max of every gas price band for the `GasPrice` calculated on an hour or a day
+    """
+    objects = GasPriceRollupManager()
+    resolution = models.PositiveSmallIntegerField(choices=[(tag.value, tag.name) for tag in GasPriceResolution])
+    start = models.DateTimeField()
+    count = models.PositiveIntegerField()
+    lowest_min = models.BigIntegerField()
+    lowest_max = models.BigIntegerField()
+    lowest_sum = models.DecimalField(max_digits=40, decimal_places=0)
+    safe_low_min = models.BigIntegerField()
+    safe_low_max = models.BigIntegerField()
+    safe_low_sum = models.DecimalField(max_digits=40, decimal_places=0)
+    standard_min = models.BigIntegerField()
+    standard_max = models.BigIntegerField()
+    standard_sum = models.DecimalField(max_digits=40, decimal_places=0)
+    fast_min = models.BigIntegerField()
+    fast_max = models.BigIntegerField()
+    fast_sum = models.DecimalField(max_digits=40, decimal_places=0)
+    fastest_min = models.BigIntegerField()
+    fastest_max = models.BigIntegerField()
+    fastest_sum = models.DecimalField(max_digits=40, decimal_places=0)
+
+    class Meta:
+        unique_together = (('resolution', 'start'),)
+
+    def __str__(self):
+        return '%s %s count=%d' % (GasPriceResolution(self.resolution).name, self.start, self.count)
+
+    def get_avg(self, band: str) -> int:
+        return int(getattr(self, band + '_sum')) // self.count
+
+    @property
+    def lowest_avg(self) -> int:
+        return self.get_avg('lowest')
+
+    @property
+    def safe_low_avg(self) -> int:
+        return self.get_avg('safe_low')
+
+    @property
+    def standard_avg(self) -> int:
+        return self.get_avg('standard')
+
+    @property
+    def fast_avg(self) -> int:
+        return self.get_avg('fast')
+
+    @property
+    def fastest_avg(self) -> int:
+        return self.get_avg('fastest')
@@ -8,3 +8,28 @@ class GasPriceSerializer(serializers.Serializer):
     standard = serializers.CharField(max_length=20)
     fast = serializers.CharField(max_length=20)
     fastest = serializers.CharField(max_length=20)
+    lowest_expected_blocks = serializers.IntegerField(allow_null=True)
+    safe_low_expected_blocks = serializers.IntegerField(allow_null=True)
+    standard_expected_blocks = serializers.IntegerField(allow_null=True)
+    fast_expected_blocks = serializers.IntegerField(allow_null=True)
+    fastest_expected_blocks = serializers.IntegerField(allow_null=True)
+
+
+class GasPriceRollupSerializer(serializers.Serializer):
+    start = serializers.DateTimeField()
+    count = serializers.IntegerField()
+    lowest_min = serializers.CharField(max_length=20)
+    lowest_avg = serializers.CharField(max_length=20)
+    lowest_max = serializers.CharField(max_length=20)
+    safe_low_min = serializers.CharField(max_length=20)
+    safe_low_avg = serializers.CharField(max_length=20)
+    safe_low_max = serializers.CharField(max_length=20)
+    standard_min = serializers.CharField(max_length=20)
+    standard_avg = serializers.CharField(max_length=20)
+    standard_max = serializers.CharField(max_length=20)
+    fast_min = serializers.CharField(max_length=20)
+    fast_avg = serializers.CharField(max_length=20)
+    fast_max = serializers.CharField(max_length=20)
+    fastest_min = serializers.CharField(max_length=20)
+    fastest_avg = serializers.CharField(max_length=20)
+    fastest_max = serializers.CharField(max_length=20)
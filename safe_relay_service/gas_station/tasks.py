@@ -1,6 +1,12 @@
+from django.conf import settings
+
 from celery import app
 from celery.utils.log import get_task_logger
-from requests.exceptions import ConnectionError as RequestsConnectionError
+from redis import Redis
+from redis.exceptions import RedisError
+from requests.exceptions import RequestException
+
+from safe_relay_service.utils.json_rpc import JsonRpcBatchException
 
 from .gas_station import GasStationProvider
 from .models import GasPrice
@@ -12,7 +18,11 @@ logger = get_task_logger(__name__)
 def calculate_gas_prices() -> GasPrice:
     logger.info('Starting Gas Price Calculation')
     try:
-        gas_price = GasStationProvider().calculate_gas_prices()
+        gas_station = GasStationProvider()
+        gas_price = gas_station.calculate_gas_prices()
         logger.info(gas_price)
-    except RequestsConnectionError:
+        gas_station.publish_gas_price_updated(Redis.from_url(settings.REDIS_URL))
+    except (RequestException, JsonRpcBatchException):
         logger.warning('Problem connecting to node, cannot calculate gas price', exc_info=True)
+    except RedisError:
+        logger.warning('Cannot notify gas price update, snapshots will expire by ttl', exc_info=True)
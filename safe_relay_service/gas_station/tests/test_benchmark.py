@@ -0,0 +1,36 @@
+from django.core.cache import cache
+from django.test import TestCase
+
+from ..benchmark import (FakeEthereumNode, GasStationBenchmark,
+                         SyntheticBlockGenerator)
+from ..models import GasPrice
+
+
+class TestBenchmark(TestCase):
+    def test_synthetic_block_generator(self):
+        block_generator = SyntheticBlockGenerator(10, txs_per_block=10, seed=1)
+        block = block_generator.get_block(5)
+        self.assertEqual(block, block_generator.get_block(5))  # Deterministic
+        self.assertEqual(block['parentHash'], block_generator.get_block(4)['hash'])
+        self.assertTrue(5 <= len(block['transactions']) <= 15)
+        self.assertIsNone(block_generator.get_block(11))
+
+    def test_fake_ethereum_node(self):
+        block_generator = SyntheticBlockGenerator(10, txs_per_block=10)
+        with FakeEthereumNode(block_generator) as node:
+            self.assertEqual(node.process_request({'method': 'eth_blockNumber', 'id': 1})['result'], '0xa')
+            self.assertIn('error', node.process_request({'method': 'eth_getCode', 'id': 1}))
+
+    def test_gas_station_benchmark(self):
+        cache.set('gas_price', 'relay-gas-price')
+        cache.set('block-gas-prices-with-hash:5', 'relay-block')
+        results = GasStationBenchmark(txs_per_block=10).run(20)
+        self.assertEqual([result.run for result in results], ['cold', 'warm-cache', 'warm-window'])
+        cold, warm_cache, warm_window = results
+        self.assertGreater(cold.number_of_requests, warm_cache.number_of_requests)
+        self.assertEqual(warm_window.number_of_requests, 1)  # Just `eth_blockNumber`
+        self.assertGreater(cold.cache_bytes, 0)
+        self.assertEqual(GasPrice.objects.count(), 0)  # Rolled back
+        # Cache of the relay is not used
+        self.assertEqual(cache.get('gas_price'), 'relay-gas-price')
+        self.assertEqual(cache.get('block-gas-prices-with-hash:5'), 'relay-block')
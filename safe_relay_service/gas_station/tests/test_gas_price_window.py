@@ -0,0 +1,77 @@
+import random
+
+from django.test import TestCase
+
+import numpy as np
+
+from ..gas_price_sketch import RELATIVE_ACCURACY, GasPriceSketch
+from ..gas_price_window import GasPriceWindow
+
+
+class TestGasPriceWindow(TestCase):
+    def assertPercentile(self, sketch: GasPriceSketch, gas_prices, q: float):
+        exact_percentile = np.percentile(gas_prices, q, interpolation='lower')
+        self.assertAlmostEqual(sketch.percentile(q), exact_percentile,
+                               delta=exact_percentile * RELATIVE_ACCURACY + 1)
+
+    def test_gas_price_sketch(self):
+        empty_sketch = GasPriceSketch.from_gas_prices([])
+        self.assertEqual(len(empty_sketch), 0)
+        self.assertEqual(len(GasPriceSketch.merge([empty_sketch, empty_sketch])), 0)
+
+        gas_prices = [random.randint(1, 10**12) for _ in range(5000)] + [0]
+        sketch = GasPriceSketch.from_gas_prices(gas_prices)
+        self.assertEqual(len(sketch), 5000)  # `0` is ignored
+        self.assertEqual(sketch.min, min(gas_prices[:-1]))
+        self.assertEqual(sketch.max, max(gas_prices))
+        self.assertLess(len(sketch.indexes), 5000)
+        for q in (0, 30, 50, 75, 100):
+            self.assertPercentile(sketch, gas_prices[:-1], q)
+
+        sketches = [GasPriceSketch.from_gas_prices(gas_prices[i:i + 100]) for i in range(0, 5000, 100)]
+        merged_sketch = GasPriceSketch.merge(sketches + [empty_sketch])
+        self.assertEqual(len(merged_sketch), len(sketch))
+        self.assertEqual(merged_sketch.indexes.tolist(), sketch.indexes.tolist())
+        self.assertEqual(merged_sketch.counts.tolist(), sketch.counts.tolist())
+        self.assertEqual(merged_sketch.min, sketch.min)
+        self.assertEqual(merged_sketch.max, sketch.max)
+
+    def test_gas_price_window(self):
+        window = GasPriceWindow()
+        self.assertEqual(len(window), 0)
+        self.assertEqual(len(window.get_sketch()), 0)
+
+        blocks = {block_number: [random.randint(1, 100) * 10**9 for _ in range(random.randint(1, 20))]
+                  for block_number in range(50)}
+        for block_number, gas_prices in blocks.items():
+            window.add_block(block_number, gas_prices)
+        self.assertIn(10, window)
+        self.assertEqual(len(window), 50)
+
+        all_gas_prices = [gas_price for gas_prices in blocks.values() for gas_price in gas_prices]
+        sketch = window.get_sketch()
+        self.assertEqual(len(sketch), len(all_gas_prices))
+        self.assertEqual(sketch.min, min(all_gas_prices))
+        self.assertEqual(sketch.max, max(all_gas_prices))
+        for q in (30, 50, 75):
+            self.assertPercentile(sketch, all_gas_prices, q)
+
+        last_gas_prices = [gas_price for block_number, gas_prices in blocks.items()
+                           for gas_price in gas_prices if block_number >= 40]
+        last_blocks_sketch = window.get_sketch(from_block_number=40)
+        self.assertEqual(len(last_blocks_sketch), len(last_gas_prices))
+        for q in (30, 50, 75):
+            self.assertPercentile(last_blocks_sketch, last_gas_prices, q)
+
+        self.assertEqual(window.evict_older_than(25), 25)
+        self.assertNotIn(10, window)
+        remaining_gas_prices = [gas_price for block_number, gas_prices in blocks.items()
+                                for gas_price in gas_prices if block_number >= 25]
+        self.assertEqual(len(window.get_sketch()), len(remaining_gas_prices))
+
+        # Replacing a block must not duplicate gas prices
+        window.add_block(30, [1000 * 10**9])
+        self.assertEqual(window.get_sketch().max, 1000 * 10**9)
+        self.assertEqual(len(window.get_sketch()), len(remaining_gas_prices) - len(blocks[30]) + 1)
+        self.assertEqual(window.remove_blocks([30, 500]), 1)
+        self.assertLess(window.get_sketch().max, 1000 * 10**9)
@@ -1,7 +1,14 @@
+import time
+from typing import Optional
+from unittest import mock
+
 from django.conf import settings
+from django.core.cache import cache
 from django.test import TestCase
 
-from ..gas_station import GasStation, NoBlocksFound
+from web3.eth import Eth
+
+from ..gas_station import CachedBlockGasPrices, GasStation, NoBlocksFound
 from .factories import GasPriceFactory
 
 
@@ -43,8 +50,121 @@ class TestGasStation(TestCase):
         self.assertGreaterEqual(gas_prices.fast, 1)
         self.assertGreaterEqual(gas_prices.fastest, 1)
 
+        # Blocks already in the window are not requested again
+        current_block_number = w3.eth.blockNumber
+        gas_station.update_window(current_block_number)
+        with mock.patch.object(GasStation, '_do_request', side_effect=AssertionError) as do_request_mock:
+            gas_station.update_window(current_block_number)
+            do_request_mock.assert_not_called()
+        self.assertNotIn(current_block_number - number_of_blocks - 1, gas_station.window)
+
     def test_gas_station(self):
         gas_price_oldest = GasPriceFactory()
         gas_price_newest = GasPriceFactory()
         gas_station = GasStation(settings.ETHEREUM_NODE_URL, settings.GAS_STATION_NUMBER_BLOCKS)
         self.assertEqual(gas_station.get_gas_prices(), gas_price_newest)
+        self.assertEqual(gas_station.get_gas_prices(settings.GAS_STATION_NUMBER_BLOCKS), gas_price_newest)
+        self.assertIsNone(gas_station.get_gas_prices(1000))  # Not a configured horizon
+
+    def test_gas_station_snapshot(self):
+        gas_price = GasPriceFactory()
+        gas_station = GasStation(settings.ETHEREUM_NODE_URL, settings.GAS_STATION_NUMBER_BLOCKS,
+                                 snapshot_ttl_seconds=60)
+        self.assertEqual(gas_station.get_gas_prices(), gas_price)
+        with mock.patch.object(GasStation, '_get_gas_price_from_cache', side_effect=AssertionError):
+            self.assertEqual(gas_station.get_gas_prices(), gas_price)  # Snapshot is used
+
+        new_gas_price = GasPriceFactory()
+        self.assertEqual(gas_station.get_gas_prices(), gas_price)
+        gas_station.invalidate_snapshot({'type': 'message', 'data': b'updated'})
+        self.assertEqual(gas_station.get_gas_prices(), new_gas_price)
+
+        with mock.patch.object(time, 'monotonic', return_value=time.monotonic() + 61):
+            self.assertIsNone(gas_station._get_gas_price_from_snapshot())  # Snapshot expired
+
+        # Snapshot hits don't extend the snapshot expiration
+        snapshot_expiration = gas_station.snapshot[0]
+        with mock.patch.object(time, 'monotonic', return_value=time.monotonic() + 30):
+            self.assertEqual(gas_station.get_gas_prices(), new_gas_price)
+        self.assertEqual(gas_station.snapshot[0], snapshot_expiration)
+
+    def build_block(self, block_number: int, gas_price: int, fork_block_number: Optional[int] = None):
+        """
+        :return: Block with one tx. Blocks from `fork_block_number` belong to a different chain
+        """
+        def get_block_hash(number: int) -> str:
+            fork = 'b' if fork_block_number is not None and number >= fork_block_number else 'a'
+            return '0x' + fork + '%063x' % number
+
+        return {'number': hex(block_number), 'hash': get_block_hash(block_number),
+                'parentHash': get_block_hash(block_number - 1), 'transactions': [{'gasPrice': hex(gas_price)}]}
+
+    def test_update_window_reorg(self):
+        cache.clear()
+        gas_station = GasStation(settings.ETHEREUM_NODE_URL, number_of_blocks=10)
+        chain = {'fork_block_number': None}
+
+        def do_request(rpc_requests):
+            responses = []
+            for rpc_request in rpc_requests:
+                block_number = int(rpc_request['params'][0], 16)
+                fork_block_number = chain['fork_block_number']
+                gas_price = 2 if fork_block_number is not None and block_number >= fork_block_number else 1
+                responses.append({'jsonrpc': '2.0', 'id': rpc_request['id'],
+                                  'result': self.build_block(block_number, gas_price, fork_block_number)})
+            return responses
+
+        with mock.patch.object(GasStation, '_do_request', side_effect=do_request) as do_request_mock:
+            window = gas_station.update_window(10)
+            self.assertEqual(len(window.get_sketch()), 10)
+            self.assertEqual(window.get_sketch().max, 1)
+
+            # Reorg, blocks from 7 were replaced
+            chain['fork_block_number'] = 7
+            do_request_mock.reset_mock()
+            window = gas_station.update_window(11)
+            self.assertEqual(do_request_mock.call_count, 4)  # New block 10 and orphaned blocks 9, 8 and 7
+            self.assertEqual(len(window), 10)
+            self.assertEqual(len(window.get_sketch()), 10)  # Orphaned txs are not counted
+            self.assertEqual(window.get_sketch(from_block_number=7).min, 2)
+            self.assertEqual(window.get_sketch(from_block_number=7).max, 2)
+            self.assertEqual(window.get_sketch().min, 1)
+            self.assertEqual(window.get_block_hashes(8)[0], '0xb' + '%063x' % 8)
+            self.assertEqual(gas_station.get_blocks([8])[8].block_hash, '0xb' + '%063x' % 8)  # Cache updated
+
+            # No reorg, just the new block is requested
+            do_request_mock.reset_mock()
+            gas_station.update_window(12)
+            self.assertEqual(do_request_mock.call_count, 1)
+
+    def test_gas_station_horizons(self):
+        gas_station = GasStation(settings.ETHEREUM_NODE_URL, number_of_blocks=2, horizons=[4, 2])
+        self.assertEqual(gas_station.horizons, [4])
+        blocks = {block_number: CachedBlockGasPrices.from_block(self.build_block(block_number,
+                                                                                 (block_number + 1) * 10**9))
+                  for block_number in range(6)}
+        with mock.patch.object(GasStation, 'get_blocks', return_value=blocks) as get_mock:
+            with mock.patch.object(Eth, 'blockNumber', new_callable=mock.PropertyMock, return_value=6):
+                gas_price = gas_station.calculate_gas_prices()
+            get_mock.assert_called_once_with([2, 3, 4, 5])  # Blocks for the biggest horizon are requested
+
+        self.assertEqual(gas_price.lowest, 5 * 10**9 + 1)
+        self.assertEqual(gas_price.fastest, 6 * 10**9 + 1)
+        horizon_gas_price = gas_station.get_gas_prices(4)
+        self.assertEqual(horizon_gas_price.lowest, 3 * 10**9 + 1)
+        self.assertEqual(horizon_gas_price.fastest, 6 * 10**9 + 1)
+
+    def test_cached_block_gas_prices(self):
+        block = {
+            'number': '0x10',
+            'hash': '0x' + 'a' * 64,
+            'parentHash': '0x' + 'b' * 64,
+            'transactions': [{'gasPrice': '0x0'}, {'gasPrice': '0x3b9aca00'}, {'gasPrice': '0x1'},
+                             {'gasPrice': hex(2**70)}],
+        }
+        cached_block = CachedBlockGasPrices.from_block(block)
+        self.assertEqual(cached_block.number, 16)
+        self.assertEqual(cached_block.block_hash, block['hash'])
+        self.assertEqual(cached_block.parent_hash, block['parentHash'])
+        self.assertEqual(len(cached_block.gas_prices), 3 * 8)  # 3 `uint64`, miner tx is ignored
+        self.assertEqual(cached_block.get_gas_prices().tolist(), [1000000000, 1, 2**64 - 1])
@@ -0,0 +1,51 @@
+import json
+import os
+from unittest import mock
+
+from django.test import TestCase
+
+from web3 import Web3
+
+from safe_relay_service.utils.json_rpc import JsonRpcBatchClient
+
+from ..mempool_predictor import MempoolNotAvailable, MempoolPredictor
+from ..models import GasPrice
+
+
+def load_fixture(file_name: str):
+    with open(os.path.join(os.path.dirname(__file__), 'fixtures', file_name)) as f:
+        return json.load(f)
+
+
+class TestMempoolPredictor(TestCase):
+    def test_predict(self):
+        txpool_content = load_fixture('txpool_content.json')
+        mempool_predictor = MempoolPredictor(JsonRpcBatchClient('http://localhost:8545'), max_blocks=5)
+        gas_price = GasPrice(lowest=Web3.toWei(1, 'gwei'), safe_low=Web3.toWei(5, 'gwei'),
+                             standard=Web3.toWei(10, 'gwei'), fast=Web3.toWei(20, 'gwei'),
+                             fastest=Web3.toWei(100, 'gwei'))
+
+        with mock.patch.object(JsonRpcBatchClient, 'request', return_value=[txpool_content]):
+            self.assertEqual(len(mempool_predictor.get_pending_gas_prices()), 10)  # Queued txs are ignored
+            expected_blocks = mempool_predictor.predict(gas_price, txs_per_block=2)
+        self.assertEqual(expected_blocks, {
+            'lowest_expected_blocks': 5,  # 6 blocks, capped to `max_blocks`
+            'safe_low_expected_blocks': 4,
+            'standard_expected_blocks': 3,
+            'fast_expected_blocks': 2,
+            'fastest_expected_blocks': 1,
+        })
+        self.assertIsNone(mempool_predictor.get_expected_blocks([], 1, txs_per_block=0))
+
+        # Fallback to `eth_pendingTransactions`
+        pending_transactions = [tx for txs_by_nonce in txpool_content['result']['pending'].values()
+                                for tx in txs_by_nonce.values()]
+        not_supported = {'jsonrpc': '2.0', 'id': 1, 'error': {'code': -32601, 'message': 'Method not found'}}
+        with mock.patch.object(JsonRpcBatchClient, 'request',
+                               side_effect=[[not_supported], [{'jsonrpc': '2.0', 'id': 1,
+                                                               'result': pending_transactions}]]):
+            self.assertEqual(mempool_predictor.predict(gas_price, txs_per_block=2), expected_blocks)
+
+        with mock.patch.object(JsonRpcBatchClient, 'request', return_value=[not_supported]):
+            with self.assertRaises(MempoolNotAvailable):
+                mempool_predictor.predict(gas_price, txs_per_block=2)
@@ -1,6 +1,9 @@
+import datetime
+
 from django.test import TestCase
+from django.utils import timezone
 
-from ..models import GasPrice
+from ..models import GasPrice, GasPriceResolution, GasPriceRollup
 from .factories import GasPriceFactory
 
 
@@ -11,3 +14,29 @@ class TestModels(TestCase):
 
         self.assertEqual(gas_price_oldest, GasPrice.objects.earliest())
         self.assertEqual(gas_price_newest, GasPrice.objects.last())
+
+    def test_gas_price_rollup(self):
+        now = timezone.now().replace(hour=12, minute=30)
+        gas_prices = [GasPriceFactory(created=now - datetime.timedelta(minutes=minutes)) for minutes in (0, 10, 20)]
+        gas_prices.append(GasPriceFactory(created=now - datetime.timedelta(hours=1)))
+        for gas_price in gas_prices:
+            GasPriceRollup.objects.add_gas_price(gas_price)
+
+        self.assertEqual(GasPriceRollup.objects.filter(resolution=GasPriceResolution.HOUR.value).count(), 2)
+        hour_rollup = GasPriceRollup.objects.get(resolution=GasPriceResolution.HOUR.value,
+                                                 start=GasPriceResolution.HOUR.truncate(now))
+        self.assertEqual(hour_rollup.count, 3)
+        self.assertEqual(hour_rollup.lowest_min, min(gas_price.lowest for gas_price in gas_prices[:3]))
+        self.assertEqual(hour_rollup.fastest_max, max(gas_price.fastest for gas_price in gas_prices[:3]))
+        self.assertEqual(hour_rollup.standard_avg, sum(gas_price.standard for gas_price in gas_prices[:3]) // 3)
+
+        day_rollup = GasPriceRollup.objects.get(resolution=GasPriceResolution.DAY.value)
+        self.assertEqual(day_rollup.count, 4)
+        self.assertEqual(day_rollup.start, GasPriceResolution.DAY.truncate(now))
+        self.assertEqual(day_rollup.fast_avg, sum(gas_price.fast for gas_price in gas_prices) // 4)
+
+        # Rebuilding from `GasPrice` must get the same rollups
+        self.assertEqual(GasPriceRollup.objects.rebuild(), 3)
+        rebuilt_day_rollup = GasPriceRollup.objects.get(resolution=GasPriceResolution.DAY.value)
+        for field in ('count', 'lowest_min', 'lowest_max', 'fast_sum', 'fastest_max'):
+            self.assertEqual(getattr(rebuilt_day_rollup, field), getattr(day_rollup, field))
@@ -1,18 +1,21 @@
 import datetime
+from typing import Optional
 
 from django.utils import timezone
 from django.utils.dateparse import parse_datetime
 
 from drf_yasg import openapi
 from drf_yasg.utils import swagger_auto_schema
+from rest_framework import status
+from rest_framework.exceptions import ValidationError
 from rest_framework.generics import ListAPIView
 from rest_framework.pagination import LimitOffsetPagination
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
 from .gas_station import GasStationProvider
-from .models import GasPrice
-from .serializers import GasPriceSerializer
+from .models import GasPrice, GasPriceResolution, GasPriceRollup
+from .serializers import GasPriceRollupSerializer, GasPriceSerializer
 
 
 class DefaultPagination(LimitOffsetPagination):
@@ -21,7 +24,12 @@ class DefaultPagination(LimitOffsetPagination):
 
 
 class GasStationView(APIView):
-    @swagger_auto_schema(responses={200: GasPriceSerializer()})
+    @swagger_auto_schema(responses={200: GasPriceSerializer(), 404: 'Gas prices for numberOfBlocks not available'},
+                         manual_parameters=[
+                             openapi.Parameter('numberOfBlocks', openapi.IN_QUERY, type=openapi.TYPE_INTEGER,
+                                               description="Number of blocks used for calculating gas prices. "
+                                                           "Only configured horizons are available"),
+                         ])
     def get(self, request, format=None):
         """
         Gets current gas prices for the ethereum network (using last 200 blocks)
@@ -29,8 +37,14 @@ class GasStationView(APIView):
         The rest are percentiles on all the gas prices in the last blocks.
         `safe_low=percentile 30`, `standard=percentile 50` and `fast=percentile 75`
         """
+        number_of_blocks = request.query_params.get('numberOfBlocks')
+        if number_of_blocks is not None and not number_of_blocks.isdigit():
+            return Response(status=status.HTTP_400_BAD_REQUEST, data='numberOfBlocks must be a positive integer')
+
         gas_station = GasStationProvider()
-        gas_prices = gas_station.get_gas_prices()
+        gas_prices = gas_station.get_gas_prices(int(number_of_blocks) if number_of_blocks else None)
+        if not gas_prices:
+            return Response(status=status.HTTP_404_NOT_FOUND)
         serializer = GasPriceSerializer(gas_prices)
         return Response(serializer.data, headers={'Cache-Control': f'max-age={60 * 4}'})
 
@@ -39,11 +53,27 @@ class GasStationHistoryView(ListAPIView):
     serializer_class = GasPriceSerializer
     pagination_class = DefaultPagination
 
+    def get_resolution(self) -> Optional[GasPriceResolution]:
+        resolution = self.request.query_params.get('resolution')
+        try:
+            return GasPriceResolution.parse(resolution) if resolution else None
+        except ValueError as exc:
+            raise ValidationError({'resolution': str(exc)})
+
+    def get_serializer_class(self):
+        return GasPriceRollupSerializer if self.get_resolution() else GasPriceSerializer
+
     def get_queryset(self):
         from_date = self.request.query_params.get('fromDate')
         to_date = self.request.query_params.get('toDate')
         from_date = parse_datetime(from_date) if from_date else timezone.now() - datetime.timedelta(days=30)
         to_date = parse_datetime(to_date) if to_date else timezone.now()
+        resolution = self.get_resolution()
+        if resolution:
+            return GasPriceRollup.objects.filter(
+                resolution=resolution.value,
+                start__range=[resolution.truncate(from_date), to_date]
+            ).order_by('start')
         return GasPrice.objects.filter(created__range=[from_date, to_date]).order_by('created')
 
     @swagger_auto_schema(manual_parameters=[
@@ -51,6 +81,9 @@ class GasStationHistoryView(ListAPIView):
                           description="ISO 8601 date to filter stats from. If not set, 1 month before now"),
         openapi.Parameter('toDate', openapi.IN_QUERY, type=openapi.TYPE_STRING, format='date-time',
                           description="ISO 8601 date to filter stats to. If not set, now"),
+        openapi.Parameter('resolution', openapi.IN_QUERY, type=openapi.TYPE_STRING, enum=['hour', 'day'],
+                          description="If set, return min/avg/max of every gas price for every hour or day "
+                                      "instead of every calculated gas price"),
     ])
     def get(self, request, *args, **kwargs):
         return super().get(request, *args, **kwargs)
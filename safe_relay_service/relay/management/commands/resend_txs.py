@@ -2,7 +2,7 @@ from django.core.management.base import BaseCommand
 
 from safe_relay_service.gas_station.gas_station import GasStationProvider
 
-from ...models import EthereumTx, SafeMultisigTx
+from ...models import SafeMultisigTx
 from ...services import TransactionServiceProvider
 
 
@@ -19,18 +19,17 @@ class Command(BaseCommand):
         self.tx_service = TransactionServiceProvider()
 
     def resend(self, gas_price: int, multisig_tx: SafeMultisigTx):
-        #TODO Refactor, do it on the service
-        if multisig_tx.ethereum_tx.gas_price < gas_price:
+        if multisig_tx.ethereum_tx is None:
+            self.stdout.write(self.style.NOTICE(
+                f"Tx with safe-tx-hash={multisig_tx.safe_tx_hash} is queued, it was not sent yet. Nothing to do here"
+            ))
+        elif multisig_tx.ethereum_tx.gas_price < gas_price:
             assert multisig_tx.ethereum_tx.block_id is None, 'Block is present!'
             self.stdout.write(self.style.NOTICE(
                 f"{multisig_tx.ethereum_tx_id} tx gas price is {multisig_tx.ethereum_tx.gas_price} < {gas_price}. "
                 f"Resending with new gas price {gas_price}"
             ))
-            safe_tx = multisig_tx.get_safe_tx(self.tx_service.ethereum_client)
-            tx_hash, tx = safe_tx.execute(tx_sender_private_key=self.tx_service.tx_sender_account.key,
-                                          tx_gas_price=gas_price, tx_nonce=multisig_tx.ethereum_tx.nonce)
-            multisig_tx.ethereum_tx = EthereumTx.objects.create_from_tx(tx, tx_hash)
-            multisig_tx.save(update_fields=['ethereum_tx'])
+            self.tx_service.replace_multisig_tx(multisig_tx, gas_price)
         else:
             self.stdout.write(self.style.NOTICE(
                 f"{multisig_tx.ethereum_tx_id} tx gas price is {multisig_tx.ethereum_tx.gas_price} > {gas_price}. "
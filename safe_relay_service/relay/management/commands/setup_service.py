@@ -38,6 +38,15 @@ class Command(BaseCommand):
                                      'Check transactions not mined after a while', 10, IntervalSchedule.MINUTES),
              CeleryTaskConfiguration('safe_relay_service.relay.tasks.check_and_update_pending_transactions',
                                      'Check and update transactions when mined', 1, IntervalSchedule.MINUTES),
+             CeleryTaskConfiguration('safe_relay_service.relay.tasks.check_queued_multisig_txs_task',
+                                     'Send queued transactions not sent after a while', 1, IntervalSchedule.MINUTES),
+             CeleryTaskConfiguration('safe_relay_service.relay.tasks.check_nonce_gaps_task',
+                                     'Sync nonces of relay accounts with the node', 1, IntervalSchedule.MINUTES),
+             CeleryTaskConfiguration('safe_relay_service.relay.tasks.bump_stuck_transactions_task',
+                                     'Replace stuck transactions with a higher gas price', 1,
+                                     IntervalSchedule.MINUTES),
+             CeleryTaskConfiguration('safe_relay_service.relay.tasks.update_safe_response_cache_task',
+                                     'Watch new blocks for Safe responses cache', 5, IntervalSchedule.SECONDS),
              ]
 
     tasks_to_delete = [
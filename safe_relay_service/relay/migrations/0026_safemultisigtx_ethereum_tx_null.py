@@ -0,0 +1,20 @@
+# Generated by Django 3.0.6 on 2026-10-18 13:05
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('relay', '0025_auto_20200429_1101'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='safemultisigtx',
+            name='ethereum_tx',
+            field=models.ForeignKey(default=None, null=True, on_delete=django.db.models.deletion.CASCADE,
+                                    related_name='multisig_txs', to='relay.EthereumTx'),
+        ),
+    ]
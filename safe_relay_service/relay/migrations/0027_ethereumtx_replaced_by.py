@@ -0,0 +1,20 @@
+# Generated by Django 3.0.6 on 2026-10-18 15:42
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('relay', '0026_safemultisigtx_ethereum_tx_null'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='ethereumtx',
+            name='replaced_by',
+            field=models.OneToOneField(default=None, null=True, on_delete=django.db.models.deletion.SET_NULL,
+                                       related_name='replaces', to='relay.EthereumTx'),
+        ),
+    ]
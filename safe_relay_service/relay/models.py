@@ -255,8 +255,11 @@ class SafeFunding(TimeStampedModel):
 
 
 class EthereumBlockManager(models.Manager):
-    def create_from_block(self, block: Dict[str, Any]) -> 'EthereumBlock':
-        return super().create(
+    def build_from_block(self, block: Dict[str, Any]) -> 'EthereumBlock':
+        """
+        :return: EthereumBlock not stored in database, useful for `bulk_create`
+        """
+        return self.model(
             number=block['number'],
             gas_limit=block['gasLimit'],
             gas_used=block['gasUsed'],
@@ -264,6 +267,11 @@ class EthereumBlockManager(models.Manager):
             block_hash=block['hash'],
         )
 
+    def create_from_block(self, block: Dict[str, Any]) -> 'EthereumBlock':
+        ethereum_block = self.build_from_block(block)
+        ethereum_block.save(force_insert=True, using=self.db)
+        return ethereum_block
+
 
 class EthereumBlock(models.Model):
     objects = EthereumBlockManager()
@@ -309,10 +317,24 @@ class EthereumTx(TimeStampedModel):
     nonce = Uint256Field()
     to = EthereumAddressField(null=True, db_index=True)
     value = Uint256Field()
+    # Tx sent with the same nonce and a higher gas price to replace this one, if it was stuck
+    replaced_by = models.OneToOneField('self', on_delete=models.SET_NULL, null=True, default=None,
+                                       related_name='replaces')
 
     def __str__(self):
         return '{} status={} from={} to={}'.format(self.tx_hash, self.status, self._from, self.to)
 
+    def get_replaced_txs(self) -> List['EthereumTx']:
+        """
+        :return: Txs replaced by this tx, newest first
+        """
+        replaced_txs = []
+        ethereum_tx = EthereumTx.objects.filter(replaced_by=self).first()
+        while ethereum_tx:
+            replaced_txs.append(ethereum_tx)
+            ethereum_tx = EthereumTx.objects.filter(replaced_by=ethereum_tx).first()
+        return replaced_txs
+
     @property
     def success(self) -> Optional[bool]:
         if self.status is not None:
@@ -391,13 +413,24 @@ class SafeMultisigTxManager(models.Manager):
 
 class SafeMultisigTxQuerySet(models.QuerySet):
     def pending(self):
-        return self.filter(ethereum_tx__block=None)
+        return self.filter(ethereum_tx__isnull=False, ethereum_tx__block=None)
+
+    def queued(self):
+        return self.filter(ethereum_tx=None)
+
+
+class SafeMultisigTxStatus(Enum):
+    QUEUED = 'queued'  # Stored, waiting to be sent by a worker
+    SENT = 'sent'  # Sent, not mined yet
+    MINED = 'mined'
+    FAILED = 'failed'  # Queued but could not be sent. Tx is removed from database
 
 
 class SafeMultisigTx(TimeStampedModel):
     objects = SafeMultisigTxManager.from_queryset(SafeMultisigTxQuerySet)()
     safe = models.ForeignKey(SafeContract, on_delete=models.CASCADE, related_name='multisig_txs')
-    ethereum_tx = models.ForeignKey(EthereumTx, on_delete=models.CASCADE, related_name='multisig_txs')
+    ethereum_tx = models.ForeignKey(EthereumTx, on_delete=models.CASCADE, null=True, default=None,
+                                    related_name='multisig_txs')  # `None` if queued
     to = EthereumAddressField(null=True, db_index=True)
     value = Uint256Field()
     data = models.BinaryField(null=True)
@@ -415,9 +448,18 @@ class SafeMultisigTx(TimeStampedModel):
         unique_together = (('safe', 'nonce'),)
 
     def __str__(self):
-        return '{} - {} - Safe {}'.format(self.ethereum_tx.tx_hash, SafeOperation(self.operation).name,
+        return '{} - {} - Safe {}'.format(self.ethereum_tx_id, SafeOperation(self.operation).name,
                                           self.safe.address)
 
+    @property
+    def status(self) -> SafeMultisigTxStatus:
+        if self.ethereum_tx_id is None:
+            return SafeMultisigTxStatus.QUEUED
+        elif self.ethereum_tx.block_id is None:
+            return SafeMultisigTxStatus.SENT
+        else:
+            return SafeMultisigTxStatus.MINED
+
     def get_safe_tx(self, ethereum_client: Optional[EthereumClient] = None) -> SafeTx:
         return SafeTx(ethereum_client, self.safe_id, self.to, self.value, self.data.tobytes() if self.data else b'',
                       self.operation, self.safe_tx_gas, self.data_gas, self.gas_price, self.gas_token,
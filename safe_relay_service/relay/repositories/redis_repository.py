@@ -1,10 +1,20 @@
-from typing import Optional
+import time
+from contextlib import contextmanager
+from logging import getLogger
+from typing import Iterator, List, NamedTuple, Optional
 
 from django.conf import settings
 
+from celery.exceptions import SoftTimeLimitExceeded
 from redis import Redis
 
-from gnosis.eth import EthereumClient
+from gnosis.eth import EthereumClient, TransactionAlreadyImported
+from gnosis.eth.ethereum_client import InvalidNonce
+
+logger = getLogger(__name__)
+
+# Tx could have reached the node when these exceptions are raised (`requests` exceptions are `OSError`)
+UNKNOWN_BROADCAST_EXCEPTIONS = (OSError, SoftTimeLimitExceeded)
 
 
 class RedisRepository:
@@ -16,34 +26,261 @@ class RedisRepository:
     def __init__(self):
         self.redis = Redis.from_url(settings.REDIS_URL)
 
-    def nonce_lock(self, ethereum_client: EthereumClient, address: str, timeout: Optional[int] = None):
-        return EthereumNonceLock(self.redis, ethereum_client, address, timeout=timeout)
+    def nonce_allocator(self, ethereum_client: EthereumClient, address: str) -> 'EthereumNonceAllocator':
+        return EthereumNonceAllocator(self.redis, ethereum_client, address)
+
+
+class EthereumNonceSyncResult(NamedTuple):
+    pending_nonce: int  # Nonce of the account on the node, including pending txs
+    next_nonce: int  # Next nonce that will be reserved (if there are no released nonces)
+    released_nonces: List[int]  # Nonces not used and not reserved. They are gaps until they are reserved again
+    recovered_nonces: List[int]  # Stale reservations returned to `released_nonces`
+
+
+class EthereumNonceAllocator:
+    """
+    Reserve nonces for an account atomically using Lua scripts, so no lock is needed. Redis keeps:
+      - Next nonce to reserve
+      - Released nonces (reserved but not used, e.g. tx failed before being sent). They are reserved again first
+      - Outstanding reservations, with the time they were reserved, so stale reservations can be recovered
+    Gaps against the node are fixed by `sync`, that must be called periodically.
+    Allocator is initialized from the pending nonce on the node, or from the last nonce stored by the old nonce
+    lock (`legacy_nonce_key`) if higher, so txs sent before upgrading are never replaced
+    """
 
+    # KEYS: next, released, reserved. ARGV: timestamp, pending nonce on the node (`''` if not known)
+    # Returns `-1` if allocator is not initialized and pending nonce was not provided
+    RESERVE_SCRIPT = """
+    local next_nonce = redis.call('GET', KEYS[1])
+    if not next_nonce then
+        if ARGV[2] == '' then
+            return -1
+        end
+        next_nonce = ARGV[2]
+        redis.call('DEL', KEYS[2])
+    end
+    local nonce
+    local released = redis.call('ZRANGE', KEYS[2], 0, 0)
+    if #released > 0 then
+        nonce = tonumber(released[1])
+        redis.call('ZREM', KEYS[2], released[1])
+        redis.call('SET', KEYS[1], next_nonce)
+    else
+        nonce = tonumber(next_nonce)
+        redis.call('SET', KEYS[1], nonce + 1)
+    end
+    redis.call('ZADD', KEYS[3], ARGV[1], nonce)
+    return nonce
+    """
 
-#TODO Test this using multiple threads
-class EthereumNonceLock:
-    def __init__(self, redis: Redis, ethereum_client: EthereumClient, address: str, timeout: Optional[int] = None):
+    # KEYS: next, released, reserved. ARGV: timestamp, number of nonces, pending nonce on the node (`''` if not
+    # known). Released nonces are reserved first (they are gaps), then a contiguous range from the counter
+    # Returns `{-1}` if allocator is not initialized and pending nonce was not provided
+    RESERVE_MANY_SCRIPT = """
+    local next_nonce = redis.call('GET', KEYS[1])
+    if not next_nonce then
+        if ARGV[3] == '' then
+            return {-1}
+        end
+        next_nonce = ARGV[3]
+        redis.call('DEL', KEYS[2])
+    end
+    next_nonce = tonumber(next_nonce)
+    local count = tonumber(ARGV[2])
+    local nonces = {}
+    for _, nonce in ipairs(redis.call('ZRANGE', KEYS[2], 0, count - 1)) do
+        redis.call('ZREM', KEYS[2], nonce)
+        table.insert(nonces, tonumber(nonce))
+    end
+    while #nonces < count do
+        table.insert(nonces, next_nonce)
+        next_nonce = next_nonce + 1
+    end
+    redis.call('SET', KEYS[1], next_nonce)
+    for _, nonce in ipairs(nonces) do
+        redis.call('ZADD', KEYS[3], ARGV[1], nonce)
+    end
+    return nonces
+    """
+
+    # KEYS: next, released, reserved. ARGV: nonce. Returns `1` if nonce was reserved, `0` otherwise
+    RELEASE_SCRIPT = """
+    if redis.call('ZREM', KEYS[3], ARGV[1]) == 0 then
+        return 0
+    end
+    local nonce = tonumber(ARGV[1])
+    local next_nonce = tonumber(redis.call('GET', KEYS[1]))
+    if next_nonce and nonce == next_nonce - 1 then
+        -- Released nonce is the last one, so counter can be rolled back with the released nonces below it
+        next_nonce = nonce
+        while redis.call('ZSCORE', KEYS[2], next_nonce - 1) do
+            redis.call('ZREM', KEYS[2], next_nonce - 1)
+            next_nonce = next_nonce - 1
+        end
+        redis.call('SET', KEYS[1], next_nonce)
+    else
+        redis.call('ZADD', KEYS[2], nonce, nonce)
+    end
+    return 1
+    """
+
+    # KEYS: next, released, reserved. ARGV: pending nonce on the node, reservations older than this are stale,
+    # nonce to initialize the allocator if not initialized
+    # Returns {next nonce, released nonces, recovered nonces}
+    SYNC_SCRIPT = """
+    local pending_nonce = tonumber(ARGV[1])
+    local next_nonce = tonumber(redis.call('GET', KEYS[1]))
+    if not next_nonce then
+        next_nonce = tonumber(ARGV[3])
+        redis.call('SET', KEYS[1], next_nonce)
+    end
+    if next_nonce < pending_nonce then
+        next_nonce = pending_nonce
+        redis.call('SET', KEYS[1], next_nonce)
+    end
+    -- Nonces below pending nonce were used on the node, they cannot be reused
+    redis.call('ZREMRANGEBYSCORE', KEYS[2], '-inf', '(' .. pending_nonce)
+    local recovered = {}
+    for _, nonce in ipairs(redis.call('ZRANGEBYSCORE', KEYS[3], '-inf', ARGV[2])) do
+        redis.call('ZREM', KEYS[3], nonce)
+        if tonumber(nonce) >= pending_nonce then
+            redis.call('ZADD', KEYS[2], nonce, nonce)
+            table.insert(recovered, nonce)
+        end
+    end
+    return {next_nonce, redis.call('ZRANGE', KEYS[2], 0, -1), recovered}
+    """
+
+    def __init__(self, redis: Redis, ethereum_client: EthereumClient, address: str,
+                 reservation_timeout: int = 60 * 5):
+        """
+        :param redis:
+        :param ethereum_client:
+        :param address: Account to reserve nonces for
+        :param reservation_timeout: Seconds after a reservation not used nor released is considered stale (e.g.
+        process was killed) and can be recovered by `sync`
+        """
         self.redis = redis
         self.ethereum_client = ethereum_client
         self.address = address
-        self.timeout = timeout
+        self.reservation_timeout = reservation_timeout
+        self.reserve_script = self.redis.register_script(self.RESERVE_SCRIPT)
+        self.reserve_many_script = self.redis.register_script(self.RESERVE_MANY_SCRIPT)
+        self.release_script = self.redis.register_script(self.RELEASE_SCRIPT)
+        self.sync_script = self.redis.register_script(self.SYNC_SCRIPT)
 
     @property
     def nonce_key(self):
+        return f'ethereum:nonce:next:{self.address}'
+
+    @property
+    def legacy_nonce_key(self):
+        """
+        Key used by the old nonce lock. It stores the last nonce used, not the next one
+        """
         return f'ethereum:nonce:{self.address}'
 
     @property
-    def redis_lock(self):
-        return f'ethereum:locks:{self.address}'
-
-    def __enter__(self):
-        with self.redis.lock(self.redis_lock, timeout=self.timeout):
-            tx_nonce = self.redis.incr(self.nonce_key)
-            if tx_nonce == 1:
-                tx_nonce = self.ethereum_client.get_nonce_for_account(self.address, block_identifier='pending')
-                self.redis.set(self.nonce_key, tx_nonce)
-            return tx_nonce
-
-    def __exit__(self, exc_type, exc_value, traceback):
-        if exc_type:
-            self.redis.delete(self.nonce_key)
+    def released_nonces_key(self):
+        return f'ethereum:nonce:released:{self.address}'
+
+    @property
+    def reserved_nonces_key(self):
+        return f'ethereum:nonce:reserved:{self.address}'
+
+    @property
+    def keys(self) -> List[str]:
+        return [self.nonce_key, self.released_nonces_key, self.reserved_nonces_key]
+
+    def _get_pending_nonce(self) -> int:
+        return self.ethereum_client.get_nonce_for_account(self.address, block_identifier='pending')
+
+    def _get_initial_nonce(self, pending_nonce: Optional[int] = None) -> int:
+        """
+        :param pending_nonce: Pending nonce on the node, retrieved if not provided
+        :return: Nonce to initialize the allocator: pending nonce on the node or the nonce after the last one
+        used by the old nonce lock, the highest of them (txs sent could be missing from the node mempool)
+        """
+        if pending_nonce is None:
+            pending_nonce = self._get_pending_nonce()
+        legacy_nonce = self.redis.get(self.legacy_nonce_key)
+        if legacy_nonce is not None:
+            return max(pending_nonce, int(legacy_nonce) + 1)
+        return pending_nonce
+
+    def reserve_nonce(self) -> int:
+        """
+        :return: Nonce reserved. It must be confirmed using `confirm_nonce` or returned using `release_nonce`
+        """
+        nonce = self.reserve_script(keys=self.keys, args=[time.time(), ''])
+        if nonce == -1:  # Not initialized
+            nonce = self.reserve_script(keys=self.keys, args=[time.time(), self._get_initial_nonce()])
+        return nonce
+
+    def reserve_nonces(self, count: int) -> List[int]:
+        """
+        Reserve `count` nonces in one allocation, so txs can be broadcast together
+        :param count: Number of nonces to reserve
+        :return: Sorted nonces reserved. They are contiguous, except when released nonces (gaps) are reused.
+        Every nonce must be confirmed using `confirm_nonce` or returned using `release_nonce`
+        """
+        assert count > 0, 'At least one nonce must be reserved'
+        nonces = self.reserve_many_script(keys=self.keys, args=[time.time(), count, ''])
+        if nonces == [-1]:  # Not initialized
+            nonces = self.reserve_many_script(keys=self.keys, args=[time.time(), count, self._get_initial_nonce()])
+        return nonces
+
+    def confirm_nonce(self, nonce: int):
+        """
+        Nonce was used by a tx sent to the node
+        """
+        self.redis.zrem(self.reserved_nonces_key, nonce)
+
+    def release_nonce(self, nonce: int) -> bool:
+        """
+        Nonce was not used, so it can be reserved again
+        :return: `True` if nonce was reserved, `False` otherwise
+        """
+        return bool(self.release_script(keys=self.keys, args=[nonce]))
+
+    def sync(self) -> EthereumNonceSyncResult:
+        """
+        Sync with the pending nonce on the node: used nonces are removed, counter is moved forward if it's behind
+        the node and stale reservations are released
+        :return: EthereumNonceSyncResult
+        """
+        pending_nonce = self._get_pending_nonce()
+        next_nonce, released_nonces, recovered_nonces = self.sync_script(
+            keys=self.keys, args=[pending_nonce, time.time() - self.reservation_timeout,
+                                  self._get_initial_nonce(pending_nonce)]
+        )
+        return EthereumNonceSyncResult(pending_nonce, int(next_nonce), [int(nonce) for nonce in released_nonces],
+                                       [int(nonce) for nonce in recovered_nonces])
+
+    @contextmanager
+    def reserve(self) -> Iterator[int]:
+        """
+        Reserve a nonce to send a tx. If node reports a nonce problem, allocator is synced with the node.
+        If an exception is raised before the tx reaches the node (validation, signing or node rejecting the tx)
+        nonce is released. If tx could have reached the node (timeouts, connection errors...) nonce is kept
+        reserved, `sync` will recover it if it was not used
+        """
+        nonce = self.reserve_nonce()
+        try:
+            yield nonce
+        except TransactionAlreadyImported:  # Nonce was used
+            self.confirm_nonce(nonce)
+            raise
+        except InvalidNonce:
+            self.release_nonce(nonce)
+            self.sync()
+            raise
+        except UNKNOWN_BROADCAST_EXCEPTIONS:
+            logger.warning('Unknown result for tx with nonce=%d for account=%s, keeping nonce reserved', nonce,
+                           self.address)
+            raise
+        except Exception:
+            self.release_nonce(nonce)
+            raise
+        else:
+            self.confirm_nonce(nonce)
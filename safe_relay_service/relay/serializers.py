@@ -1,5 +1,7 @@
 import logging
 
+from django.conf import settings
+
 from rest_framework import serializers
 from rest_framework.exceptions import ValidationError
 
@@ -57,6 +59,7 @@ class SafeCreationEstimateV2Serializer(serializers.Serializer):
 
 class SafeRelayMultisigTxSerializer(SafeMultisigTxSerializer):
     signatures = serializers.ListField(child=SafeSignatureSerializer())
+    estimation_ticket = serializers.CharField(default=None, allow_null=True)
 
     def validate_refund_receiver(self, refund_receiver):
         if refund_receiver and refund_receiver != NULL_ADDRESS:
@@ -64,6 +67,24 @@ class SafeRelayMultisigTxSerializer(SafeMultisigTxSerializer):
         return refund_receiver
 
 
+class SafeRelayMultisigTxBulkSerializer(serializers.Serializer):
+    transactions = SafeRelayMultisigTxSerializer(many=True, allow_empty=False)
+
+    def validate_transactions(self, transactions):
+        if len(transactions) > settings.SAFE_TX_BULK_MAX_SIZE:
+            raise ValidationError(f'No more than {settings.SAFE_TX_BULK_MAX_SIZE} txs can be sent at once')
+        return transactions
+
+
+class SafeInfoBulkSerializer(serializers.Serializer):
+    safes = serializers.ListField(child=EthereumAddressField(), allow_empty=False)
+
+    def validate_safes(self, safes):
+        if len(safes) > settings.SAFE_INFO_BULK_MAX_SIZE:
+            raise ValidationError(f'No more than {settings.SAFE_INFO_BULK_MAX_SIZE} safes can be requested at once')
+        return safes
+
+
 # ================================================ #
 #                Responses                         #
 # ================================================ #
@@ -105,6 +126,11 @@ class SafeResponseSerializer(serializers.Serializer):
     version = serializers.CharField()
 
 
+class SafeInfoBulkResponseSerializer(SafeResponseSerializer):
+    balances = SafeBalanceResponseSerializer(many=True)
+    error = serializers.CharField(allow_null=True)
+
+
 class SafeCreationEstimateResponseSerializer(serializers.Serializer):
     gas = serializers.CharField()
     gas_price = serializers.CharField()
@@ -230,12 +256,28 @@ class SafeMultisigTxResponseSerializer(serializers.Serializer):
         return SafeOperation(obj.operation).name
 
     def get_tx_hash(self, obj):
-        tx_hash = obj.ethereum_tx.tx_hash
+        tx_hash = obj.ethereum_tx_id  # `None` if tx is queued
         if tx_hash and isinstance(tx_hash, bytes):
             return tx_hash.hex()
         return tx_hash
 
 
+class SafeMultisigTxBulkResultResponseSerializer(serializers.Serializer):
+    safe = EthereumAddressField(source='safe_address')
+    nonce = serializers.IntegerField(min_value=0)
+    transaction = SafeMultisigTxResponseSerializer(source='safe_multisig_tx', allow_null=True)
+    status = serializers.CharField(allow_null=True)
+    error = serializers.CharField(allow_null=True)
+
+
+class SafeMultisigTxStatusResponseSerializer(serializers.Serializer):
+    safe_tx_hash = Sha3HashField()
+    status = serializers.CharField()
+    tx_hash = Sha3HashField(allow_null=True)
+    block_number = serializers.IntegerField(min_value=0, allow_null=True)
+    error = serializers.CharField(allow_null=True)
+
+
 class SafeMultisigEstimateTxResponseSerializer(serializers.Serializer):
     safe_tx_gas = serializers.IntegerField(min_value=0)
     base_gas = serializers.IntegerField(min_value=0)
@@ -244,6 +286,7 @@ class SafeMultisigEstimateTxResponseSerializer(serializers.Serializer):
     gas_price = serializers.IntegerField(min_value=0)
     last_used_nonce = serializers.IntegerField(min_value=0, allow_null=True)
     gas_token = EthereumAddressField(allow_null=True, allow_zero_address=True)
+    estimation_ticket = serializers.CharField(allow_null=True)
 
 
 class SafeMultisigEstimateTxResponseV2Serializer(serializers.Serializer):
@@ -257,12 +300,14 @@ class SafeMultisigEstimateTxResponseV2Serializer(serializers.Serializer):
     gas_price = serializers.CharField()
     last_used_nonce = serializers.IntegerField(min_value=0, allow_null=True)
     gas_token = EthereumAddressField(allow_null=True, allow_zero_address=True)
+    estimation_ticket = serializers.CharField(allow_null=True)
 
 
 class TransactionGasTokenEstimationResponseSerializer(serializers.Serializer):
     base_gas = serializers.CharField()
     gas_price = serializers.CharField()
     gas_token = EthereumAddressField(allow_null=True, allow_zero_address=True)
+    estimation_ticket = serializers.CharField(allow_null=True)
 
 
 class TransactionEstimationWithNonceAndGasTokensResponseSerializer(serializers.Serializer):
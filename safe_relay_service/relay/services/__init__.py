@@ -5,5 +5,11 @@ from .notification_service import (NotificationService,
                                    NotificationServiceProvider)
 from .safe_creation_service import (SafeCreationService,
                                     SafeCreationServiceProvider)
+from .safe_response_cache import SafeResponseCache, SafeResponseCacheProvider
+from .safe_signature_validator import (SafeSignatureValidator,
+                                       SafeSignatureValidatorProvider)
+from .safe_state_reader import SafeStateReader, SafeStateReaderProvider
 from .stats_service import StatsService, StatsServiceProvider
+from .transaction_estimation_cache import (TransactionEstimationCache,
+                                           TransactionEstimationCacheProvider)
 from .transaction_service import TransactionService, TransactionServiceProvider
@@ -4,6 +4,8 @@ from typing import List, Set
 from gnosis.eth import EthereumClient
 
 from ..models import EthereumEvent
+from .safe_metadata_cache import SafeMetadataCacheProvider
+from .safe_signature_validator import SafeSignatureValidatorProvider
 from .transaction_scan_service import TransactionScanService
 
 logger = getLogger(__name__)
@@ -70,5 +72,7 @@ class Erc20EventsService(TransactionScanService):
         """
         ethereum_tx = self.create_or_update_ethereum_tx(tx_hash)
         tx_receipt = self.ethereum_client.get_transaction_receipt(tx_hash)
+        SafeMetadataCacheProvider().invalidate_from_logs(tx_receipt.logs)  # Safe could be upgraded
+        SafeSignatureValidatorProvider().invalidate_owners_from_logs(tx_receipt.logs)  # Owners could change
         decoded_logs = self.ethereum_client.erc20.decode_logs(tx_receipt.logs)
         return [EthereumEvent.objects.get_or_create_erc20_or_721_event(event) for event in decoded_logs]
@@ -0,0 +1,97 @@
+from logging import getLogger
+from typing import NamedTuple, Optional, Union
+
+from django.core import signing
+
+from hexbytes import HexBytes
+from web3 import Web3
+
+from gnosis.eth.constants import NULL_ADDRESS
+
+logger = getLogger(__name__)
+
+ESTIMATION_TICKET_SALT = 'safe_relay_service.relay.estimation-ticket'
+
+
+class InvalidEstimationTicket(Exception):
+    pass
+
+
+class EstimationTicket(NamedTuple):
+    """
+    Estimation done by the relay for a Safe tx. It's signed and sent to the client, so gas does not need to be
+    estimated again when the tx is relayed
+    """
+    safe_address: str
+    to: str
+    value: int
+    data_hash: str
+    operation: int
+    gas_token: str
+    block_number: int  # Block the estimation was done at
+    safe_tx_gas: int
+    base_gas: int
+
+    @classmethod
+    def build(cls, safe_address: str, to: Optional[str], value: int, data: Optional[Union[bytes, str]],
+              operation: int, gas_token: Optional[str], block_number: int, safe_tx_gas: int,
+              base_gas: int) -> 'EstimationTicket':
+        return cls(safe_address, to or NULL_ADDRESS, value, Web3.keccak(HexBytes(data or b'')).hex(), operation,
+                   gas_token or NULL_ADDRESS, block_number, safe_tx_gas, base_gas)
+
+
+class EstimationTicketSigner:
+    """
+    Sign estimation tickets using Django `SECRET_KEY`. Tickets are only valid for `max_age` seconds and
+    `max_blocks` blocks after the estimation
+    """
+    def __init__(self, max_age: int = 120, max_blocks: int = 10):
+        """
+        :param max_age: Seconds a ticket is valid after being signed
+        :param max_blocks: Blocks a ticket is valid after the block the estimation was done at
+        """
+        self.max_age = max_age
+        self.max_blocks = max_blocks
+
+    def sign(self, estimation_ticket: EstimationTicket) -> str:
+        return signing.dumps(list(estimation_ticket), salt=ESTIMATION_TICKET_SALT, compress=True)
+
+    def load(self, ticket: str) -> EstimationTicket:
+        """
+        :param ticket: Ticket returned by `sign`
+        :return: EstimationTicket
+        :raises: InvalidEstimationTicket: If signature is not valid or ticket expired
+        """
+        try:
+            return EstimationTicket(*signing.loads(ticket, salt=ESTIMATION_TICKET_SALT, max_age=self.max_age))
+        except (signing.BadSignature, TypeError) as exc:  # `SignatureExpired` is a `BadSignature`
+            raise InvalidEstimationTicket(str(exc)) from exc
+
+    def is_valid(self, ticket: Optional[str], safe_address: str, to: Optional[str], value: int,
+                 data: Optional[Union[bytes, str]], operation: int, gas_token: Optional[str], block_number: int,
+                 safe_tx_gas: int, base_gas: int) -> bool:
+        """
+        :param ticket: Ticket provided by the client, can be `None`
+        :param block_number: Current block number
+        :param safe_tx_gas: `safe_tx_gas` provided by the client
+        :param base_gas: `base_gas` provided by the client
+        :return: `True` if ticket was signed by the relay for the same tx, it's not expired and gas provided by
+        the client is at least the estimated one, `False` otherwise
+        """
+        if not ticket:
+            return False
+
+        try:
+            estimation_ticket = self.load(ticket)
+        except InvalidEstimationTicket as exc:
+            logger.debug('Estimation ticket for safe=%s not valid: %s', safe_address, exc)
+            return False
+
+        expected_estimation_ticket = EstimationTicket.build(safe_address, to, value, data, operation, gas_token,
+                                                            estimation_ticket.block_number,
+                                                            estimation_ticket.safe_tx_gas,
+                                                            estimation_ticket.base_gas)
+        return (estimation_ticket == expected_estimation_ticket
+                and 0 <= block_number - estimation_ticket.block_number <= self.max_blocks
+                and safe_tx_gas >= estimation_ticket.safe_tx_gas
+                and base_gas >= estimation_ticket.base_gas)
@@ -11,7 +11,8 @@ from gnosis.eth import EthereumClient, EthereumClientProvider
 from safe_relay_service.gas_station.gas_station import (GasStation,
                                                         GasStationProvider)
 
-from ..repositories.redis_repository import EthereumNonceLock, RedisRepository
+from ..repositories.redis_repository import (EthereumNonceAllocator,
+                                             RedisRepository)
 
 logger = getLogger(__name__)
 
@@ -55,8 +56,8 @@ class FundingService:
         if self.max_eth_to_send and value > Web3.toWei(self.max_eth_to_send, 'ether'):
             raise EtherLimitExceeded('%d is bigger than %f' % (value, self.max_eth_to_send))
 
-        with EthereumNonceLock(self.redis, self.ethereum_client, self.funder_account.address,
-                               timeout=60 * 2) as tx_nonce:
+        with EthereumNonceAllocator(self.redis, self.ethereum_client,
+                                    self.funder_account.address).reserve() as tx_nonce:
             return self.ethereum_client.send_eth_to(self.funder_account.key, to, gas_price, value,
                                                     gas=gas,
                                                     retry=retry,
@@ -1,5 +1,5 @@
 from logging import getLogger
-from typing import Iterable, List, NamedTuple, Optional
+from typing import Iterable, List, Optional, Union
 
 from django.conf import settings
 
@@ -14,11 +14,14 @@ from gnosis.safe.safe import SafeCreationEstimate
 
 from safe_relay_service.gas_station.gas_station import (GasStation,
                                                         GasStationProvider)
-from safe_relay_service.tokens.models import Token
-from safe_relay_service.tokens.price_oracles import CannotGetTokenPriceFromApi
+from safe_relay_service.tokens.gas_token_registry import \
+    GasTokenRegistryProvider
 
 from ..models import EthereumTx, SafeContract, SafeCreation2, SafeTxStatus
-from ..repositories.redis_repository import EthereumNonceLock, RedisRepository
+from ..repositories.redis_repository import (EthereumNonceAllocator,
+                                             RedisRepository)
+from .safe_state_reader import (SafeInfo, SafeStateReader,
+                                SafeStateReaderProvider)
 
 logger = getLogger(__name__)
 
@@ -43,16 +46,6 @@ class SafeAlreadyExistsException(SafeCreationServiceException):
     pass
 
 
-class SafeInfo(NamedTuple):
-    address: str
-    nonce: int
-    threshold: int
-    owners: List[str]
-    master_copy: str
-    version: str
-    fallback_handler: str
-
-
 class SafeCreationServiceProvider:
     def __new__(cls):
         if not hasattr(cls, 'instance'):
@@ -94,7 +87,8 @@ class SafeCreationV1_0_0ServiceProvider:
 class SafeCreationService:
     def __init__(self, gas_station: GasStation, ethereum_client: EthereumClient, redis: Redis,
                  safe_contract_address: str, proxy_factory_address: str, default_callback_handler: str,
-                 safe_funder_private_key: str, safe_fixed_creation_cost: int):
+                 safe_funder_private_key: str, safe_fixed_creation_cost: int,
+                 safe_state_reader: Optional[SafeStateReader] = None):
         self.gas_station = gas_station
         self.ethereum_client = ethereum_client
         self.redis = redis
@@ -103,6 +97,7 @@ class SafeCreationService:
         self.default_callback_handler = default_callback_handler
         self.funder_account = Account.from_key(safe_funder_private_key)
         self.safe_fixed_creation_cost = safe_fixed_creation_cost
+        self.safe_state_reader = safe_state_reader or SafeStateReaderProvider()
 
     def _get_token_eth_value_or_raise(self, address: str) -> float:
         """
@@ -114,12 +109,11 @@ class SafeCreationService:
         if address == NULL_ADDRESS:
             return 1.0
 
-        try:
-            token = Token.objects.get(address=address, gas=True)
-            return token.get_eth_value()
-        except Token.DoesNotExist:
+        token = GasTokenRegistryProvider().get(address)
+        if not token:
             logger.warning('Cannot get value of token in eth: Gas token %s not valid', address)
             raise InvalidPaymentToken(address)
+        return token.get_eth_value()
 
     def _get_configured_gas_price(self) -> int:
         """
@@ -214,8 +208,8 @@ class SafeCreationService:
 
         setup_data = HexBytes(safe_creation2.setup_data.tobytes())
 
-        with EthereumNonceLock(self.redis, self.ethereum_client, self.funder_account.address,
-                               timeout=60 * 2) as tx_nonce:
+        with EthereumNonceAllocator(self.redis, self.ethereum_client,
+                                    self.funder_account.address).reserve() as tx_nonce:
             proxy_factory = ProxyFactory(safe_creation2.proxy_factory, self.ethereum_client)
             ethereum_tx_sent = proxy_factory.deploy_proxy_contract_with_nonce(self.funder_account,
                                                                               safe_creation2.master_copy,
@@ -253,28 +247,29 @@ class SafeCreationService:
         ether_creation_estimate = self.estimate_safe_creation2(number_owners, NULL_ADDRESS)
         safe_creation_estimates = [ether_creation_estimate]
         token_gas_difference = 50000  # 50K gas more expensive than ether
-        for token in Token.objects.gas_tokens():
-            try:
-                safe_creation_estimates.append(
-                    SafeCreationEstimate(
-                        gas=ether_creation_estimate.gas + token_gas_difference,
-                        gas_price=ether_creation_estimate.gas_price,
-                        payment=token.calculate_payment(ether_creation_estimate.payment),
-                        payment_token=token.address,
-                    )
+        # Prices are resolved concurrently, tokens without price (or too slow) are not returned
+        gas_token_registry = GasTokenRegistryProvider()
+        for token_address, eth_value in gas_token_registry.get_eth_values().items():
+            token = gas_token_registry.get(token_address)
+            safe_creation_estimates.append(
+                SafeCreationEstimate(
+                    gas=ether_creation_estimate.gas + token_gas_difference,
+                    gas_price=ether_creation_estimate.gas_price,
+                    payment=token.calculate_payment(ether_creation_estimate.payment, eth_value=eth_value),
+                    payment_token=token_address,
                 )
-            except CannotGetTokenPriceFromApi:
-                logger.error('Cannot get price for token=%s', token.address)
+            )
         return safe_creation_estimates
 
-    def retrieve_safe_info(self, address: str) -> SafeInfo:
-        safe = Safe(address, self.ethereum_client)
-        if not self.ethereum_client.is_contract(address):
+    def retrieve_safe_info(self, address: str, block_identifier: Union[int, str] = 'latest') -> SafeInfo:
+        """
+        :param address: Safe address
+        :param block_identifier: Block to read the info at
+        :return: SafeInfo, every field is read on the same request to the node
+        :raises: SafeNotDeployed
+        :raises: SafeStateReaderException: If node returned an error
+        """
+        safe_info = self.safe_state_reader.get_safe_infos([address], block_identifier=block_identifier)[0]
+        if not safe_info:
             raise SafeNotDeployed('Safe with address=%s not deployed' % address)
-        nonce = safe.retrieve_nonce()
-        threshold = safe.retrieve_threshold()
-        owners = safe.retrieve_owners()
-        master_copy = safe.retrieve_master_copy_address()
-        version = safe.retrieve_version()
-        fallback_handler = safe.retrieve_fallback_handler()
-        return SafeInfo(address, nonce, threshold, owners, master_copy, version, fallback_handler)
+        return safe_info
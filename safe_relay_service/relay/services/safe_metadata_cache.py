@@ -0,0 +1,121 @@
+import json
+from logging import getLogger
+from typing import Any, Dict, Iterable, NamedTuple, Optional
+
+from django.conf import settings
+
+from cachetools import TTLCache
+from hexbytes import HexBytes
+from redis import Redis
+from web3 import Web3
+
+from ..repositories.redis_repository import RedisRepository
+
+logger = getLogger(__name__)
+
+CHANGED_MASTER_COPY_TOPIC = Web3.keccak(text='ChangedMasterCopy(address)')
+CHANGE_MASTER_COPY_SELECTOR = Web3.keccak(text='changeMasterCopy(address)')[:4]
+
+
+class SafeMetadata(NamedTuple):
+    """
+    Safe data that only changes when the Safe is upgraded
+    """
+    address: str
+    master_copy: str
+    version: Optional[str]
+    block_number: int  # Block when data was retrieved
+
+
+class SafeMetadataCacheProvider:
+    def __new__(cls):
+        if not hasattr(cls, 'instance'):
+            cls.instance = SafeMetadataCache(RedisRepository().redis,
+                                             max_size=settings.SAFE_METADATA_CACHE_SIZE,
+                                             local_ttl=settings.SAFE_METADATA_LOCAL_CACHE_TTL,
+                                             max_age_blocks=settings.SAFE_METADATA_MAX_AGE_BLOCKS)
+        return cls.instance
+
+    @classmethod
+    def del_singleton(cls):
+        if hasattr(cls, "instance"):
+            del cls.instance
+
+
+class SafeMetadataCache:
+    """
+    Two tier cache for `SafeMetadata`: a process LRU (with a short ttl, so invalidations done by other processes
+    are seen soon) and Redis. Only metadata of valid Safes (valid proxy and master copy) must be stored.
+    Entries are invalidated when an upgrade is detected or when they are older than `max_age_blocks`
+    """
+    def __init__(self, redis: Redis, max_size: int = 4096, local_ttl: int = 60, max_age_blocks: int = 5760,
+                 redis_timeout: int = 24 * 60 * 60):
+        """
+        :param redis:
+        :param max_size: Max number of Safes in the process cache
+        :param local_ttl: Seconds an entry is kept in the process cache
+        :param max_age_blocks: Entries retrieved more than `max_age_blocks` ago are not valid
+        :param redis_timeout: Seconds an entry is kept in Redis
+        """
+        self.redis = redis
+        self.local_cache = TTLCache(maxsize=max_size, ttl=local_ttl)
+        self.max_age_blocks = max_age_blocks
+        self.redis_timeout = redis_timeout
+
+    @staticmethod
+    def _get_redis_key(safe_address: str) -> str:
+        return f'safe-metadata:{safe_address}'
+
+    def _is_expired(self, safe_metadata: SafeMetadata, current_block_number: Optional[int]) -> bool:
+        return (current_block_number is not None
+                and current_block_number - safe_metadata.block_number > self.max_age_blocks)
+
+    def get(self, safe_address: str, current_block_number: Optional[int] = None) -> Optional[SafeMetadata]:
+        """
+        :param safe_address:
+        :param current_block_number: If provided, entries older than `max_age_blocks` are invalidated
+        :return: SafeMetadata if found and not expired, `None` otherwise
+        """
+        safe_metadata = self.local_cache.get(safe_address)
+        if safe_metadata is None:
+            value = self.redis.get(self._get_redis_key(safe_address))
+            if value is None:
+                return None
+            safe_metadata = SafeMetadata(**json.loads(value))
+            self.local_cache[safe_address] = safe_metadata
+
+        if self._is_expired(safe_metadata, current_block_number):
+            self.invalidate(safe_address)
+            return None
+        return safe_metadata
+
+    def set(self, safe_metadata: SafeMetadata):
+        self.local_cache[safe_metadata.address] = safe_metadata
+        self.redis.set(self._get_redis_key(safe_metadata.address), json.dumps(safe_metadata._asdict()),
+                       ex=self.redis_timeout)
+
+    def invalidate(self, safe_address: str):
+        logger.debug('Invalidating metadata for safe=%s', safe_address)
+        self.local_cache.pop(safe_address, None)
+        self.redis.delete(self._get_redis_key(safe_address))
+
+    def invalidate_from_logs(self, logs: Iterable[Dict[str, Any]]) -> int:
+        """
+        Invalidate metadata for the Safes emitting a `ChangedMasterCopy` event
+        :param logs: Logs of a tx receipt
+        :return: Number of Safes invalidated
+        """
+        invalidated = 0
+        for log in logs:
+            if log['topics'] and HexBytes(log['topics'][0]) == CHANGED_MASTER_COPY_TOPIC:
+                self.invalidate(Web3.toChecksumAddress(log['address']))  # Not checksummed on raw receipts
+                invalidated += 1
+        return invalidated
+
+    @staticmethod
+    def is_master_copy_change(data: Optional[bytes]) -> bool:
+        """
+        :param data: Data of a Safe tx (sent to the Safe itself)
+        :return: `True` if tx is changing the master copy of the Safe
+        """
+        return bool(data) and HexBytes(data)[:4] == CHANGE_MASTER_COPY_SELECTOR
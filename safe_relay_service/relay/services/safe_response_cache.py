@@ -0,0 +1,198 @@
+import json
+import time
+from logging import getLogger
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Union
+
+from django.conf import settings
+from django.utils.http import quote_etag
+
+from redis import Redis
+from web3 import Web3
+
+from gnosis.eth import EthereumClient, EthereumClientProvider
+
+from ..repositories.redis_repository import RedisRepository
+from .safe_creation_service import SafeNotDeployed
+from .safe_state_reader import SafeStateReader, SafeStateReaderProvider
+from .stats_service import StatsService, StatsServiceProvider
+
+logger = getLogger(__name__)
+
+SAFE_INFO_ENDPOINT = 'safe-info'
+SAFE_BALANCES_ENDPOINT = 'safe-balances'
+LATEST_BLOCK_NUMBER_KEY = 'safe-response-cache:latest-block-number'
+
+
+class CachedResponse(NamedTuple):
+    etag: str  # Quoted, ready to be used as a header
+    data: Any
+
+
+class SafeResponseCacheProvider:
+    def __new__(cls):
+        if not hasattr(cls, 'instance'):
+            cls.instance = SafeResponseCache(RedisRepository().redis, EthereumClientProvider(),
+                                             SafeStateReaderProvider(), StatsServiceProvider(),
+                                             timeout=settings.SAFE_RESPONSE_CACHE_TIMEOUT,
+                                             block_number_timeout=settings.SAFE_RESPONSE_CACHE_BLOCK_NUMBER_TIMEOUT,
+                                             warm_max_safes=settings.SAFE_RESPONSE_CACHE_WARM_MAX_SAFES,
+                                             warm_max_age=settings.SAFE_RESPONSE_CACHE_WARM_MAX_AGE)
+        return cls.instance
+
+    @classmethod
+    def del_singleton(cls):
+        if hasattr(cls, "instance"):
+            del cls.instance
+
+
+class SafeResponseCache:
+    """
+    Cache Safe info and balances for the latest block, so clients polling a Safe don't hit the node more than
+    once per block. Latest block number is stored in Redis by a new head watcher (`update_latest_block_number`),
+    so cached responses are found without using the node. Block number is part of the key, so responses are not
+    used anymore when a new block is mined. If the watcher is not running, nothing is cached
+    """
+    def __init__(self, redis: Redis, ethereum_client: EthereumClient, safe_state_reader: SafeStateReader,
+                 stats_service: StatsService, timeout: int = 60, block_number_timeout: int = 30,
+                 warm_max_safes: int = 100, warm_max_age: int = 60 * 5):
+        """
+        :param redis:
+        :param ethereum_client:
+        :param safe_state_reader:
+        :param stats_service:
+        :param timeout: Seconds a response is kept in Redis. Keys are only valid for one block anyway
+        :param block_number_timeout: Seconds the latest block number is valid. If watcher stops, responses stop
+        being cached after this time
+        :param warm_max_safes: Max number of Safes recalculated by the watcher when a new block is mined
+        :param warm_max_age: Only Safes requested in the last `warm_max_age` seconds are recalculated
+        """
+        self.redis = redis
+        self.ethereum_client = ethereum_client
+        self.safe_state_reader = safe_state_reader
+        self.stats_service = stats_service
+        self.timeout = timeout
+        self.block_number_timeout = block_number_timeout
+        self.warm_max_safes = warm_max_safes
+        self.warm_max_age = warm_max_age
+
+    @staticmethod
+    def build_etag(data: Any) -> str:
+        return quote_etag(Web3.keccak(text=json.dumps(data, sort_keys=True)).hex())
+
+    @staticmethod
+    def _get_key(endpoint: str, address: str, block_number: int) -> str:
+        return f'safe-response-cache:{endpoint}:{address}:{block_number}'
+
+    @staticmethod
+    def _get_requested_key(endpoint: str) -> str:
+        return f'safe-response-cache:requested:{endpoint}'
+
+    def get_latest_block_number(self) -> Optional[int]:
+        """
+        :return: Latest block number stored by the watcher, `None` if watcher is not running
+        """
+        value = self.redis.get(LATEST_BLOCK_NUMBER_KEY)
+        return int(value) if value is not None else None
+
+    def set_latest_block_number(self, block_number: int) -> bool:
+        """
+        :return: `True` if block number changed, `False` otherwise
+        """
+        previous_block_number = self.redis.getset(LATEST_BLOCK_NUMBER_KEY, block_number)
+        self.redis.expire(LATEST_BLOCK_NUMBER_KEY, self.block_number_timeout)
+        return previous_block_number is None or int(previous_block_number) != block_number
+
+    def get(self, endpoint: str, address: str, block_number: int) -> Optional[CachedResponse]:
+        value = self.redis.get(self._get_key(endpoint, address, block_number))
+        if value is None:
+            return None
+        return CachedResponse(*json.loads(value))
+
+    def set(self, endpoint: str, address: str, block_number: int, data: Any) -> CachedResponse:
+        cached_response = CachedResponse(self.build_etag(data), data)
+        self.redis.set(self._get_key(endpoint, address, block_number), json.dumps(cached_response),
+                       ex=self.timeout)
+        return cached_response
+
+    def _mark_requested(self, endpoint: str, address: str):
+        self.redis.zadd(self._get_requested_key(endpoint), {address: time.time()})
+
+    def get_recently_requested(self, endpoint: str) -> List[str]:
+        """
+        :return: Addresses requested in the last `warm_max_age` seconds for `endpoint`, most recent first
+        """
+        key = self._get_requested_key(endpoint)
+        self.redis.zremrangebyscore(key, 0, time.time() - self.warm_max_age)
+        return [address.decode() for address in self.redis.zrevrange(key, 0, self.warm_max_safes - 1)]
+
+    def get_or_calculate(self, endpoint: str, address: str,
+                         calculate: Callable[[Union[int, str]], Any]) -> CachedResponse:
+        """
+        :param endpoint:
+        :param address:
+        :param calculate: Function receiving the block identifier and returning a JSON serializable response.
+        Exceptions raised are propagated and nothing is cached
+        :return: CachedResponse
+        """
+        block_number = self.get_latest_block_number()
+        if block_number is None:
+            data = calculate('latest')
+            return CachedResponse(self.build_etag(data), data)
+
+        self._mark_requested(endpoint, address)
+        return self.get(endpoint, address, block_number) or self.set(endpoint, address, block_number,
+                                                                     calculate(block_number))
+
+    def _calculate_safe_info(self, address: str, block_identifier: Union[int, str]) -> Dict[str, Any]:
+        safe_info = self.safe_state_reader.get_safe_infos([address], block_identifier=block_identifier)[0]
+        if not safe_info:
+            raise SafeNotDeployed('Safe with address=%s not deployed' % address)
+        return safe_info._asdict()
+
+    def get_safe_info(self, address: str) -> CachedResponse:
+        """
+        :return: CachedResponse with `SafeInfo` as a dictionary
+        :raises: SafeNotDeployed
+        """
+        return self.get_or_calculate(SAFE_INFO_ENDPOINT, address,
+                                     lambda block_identifier: self._calculate_safe_info(address, block_identifier))
+
+    def get_balances(self, address: str) -> CachedResponse:
+        """
+        :return: CachedResponse with the balances returned by `StatsService.get_balances`
+        """
+        return self.get_or_calculate(SAFE_BALANCES_ENDPOINT, address,
+                                     lambda block_identifier: self.stats_service.get_balances(address,
+                                                                                              block_identifier))
+
+    def warm(self, block_number: int) -> int:
+        """
+        Calculate responses for the Safes requested recently, so they are cached when clients poll again
+        :return: Number of responses cached
+        """
+        cached = 0
+        addresses = self.get_recently_requested(SAFE_INFO_ENDPOINT)
+        if addresses:
+            for address, safe_info in zip(addresses, self.safe_state_reader.get_safe_infos(addresses,
+                                                                                          block_number)):
+                if safe_info:
+                    self.set(SAFE_INFO_ENDPOINT, address, block_number, safe_info._asdict())
+                    cached += 1
+
+        for address in self.get_recently_requested(SAFE_BALANCES_ENDPOINT):
+            self.set(SAFE_BALANCES_ENDPOINT, address, block_number,
+                     self.stats_service.get_balances(address, block_number))
+            cached += 1
+        return cached
+
+    def update_latest_block_number(self) -> int:
+        """
+        Store the current block number of the node. When it changes, responses for the previous block are not
+        used anymore and responses for recently requested Safes are calculated again
+        :return: Number of responses cached
+        """
+        block_number = self.ethereum_client.current_block_number
+        if not self.set_latest_block_number(block_number):
+            return 0
+        logger.debug('New block=%d, warming responses cache', block_number)
+        return self.warm(block_number)
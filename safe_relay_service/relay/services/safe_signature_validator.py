@@ -0,0 +1,151 @@
+import json
+from logging import getLogger
+from threading import Lock
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from django.conf import settings
+
+from cachetools import LRUCache
+from hexbytes import HexBytes
+from redis import Redis
+from web3 import Web3
+
+from gnosis.safe.signatures import get_signing_address, signature_split
+
+from ..repositories.redis_repository import RedisRepository
+
+logger = getLogger(__name__)
+
+OWNER_MANAGEMENT_SELECTORS = {Web3.keccak(text=function_signature)[:4]
+                              for function_signature in ('addOwnerWithThreshold(address,uint256)',
+                                                         'removeOwner(address,address,uint256)',
+                                                         'swapOwner(address,address,address)',
+                                                         'changeThreshold(uint256)')}
+OWNERS_CHANGED_TOPICS = {Web3.keccak(text=event_signature)
+                         for event_signature in ('AddedOwner(address)',
+                                                 'RemovedOwner(address)',
+                                                 'ChangedThreshold(uint256)')}
+
+
+class InvalidSignature(Exception):
+    pass
+
+
+class SafeOwners(NamedTuple):
+    address: str
+    owners: List[str]
+    threshold: int
+    block_number: int  # Block when data was retrieved
+
+
+class SafeSignatureValidatorProvider:
+    def __new__(cls):
+        if not hasattr(cls, 'instance'):
+            cls.instance = SafeSignatureValidator(RedisRepository().redis,
+                                                  max_size=settings.SAFE_SIGNERS_CACHE_SIZE,
+                                                  owners_timeout=settings.SAFE_OWNERS_CACHE_TIMEOUT)
+        return cls.instance
+
+    @classmethod
+    def del_singleton(cls):
+        if hasattr(cls, "instance"):
+            del cls.instance
+
+
+class SafeSignatureValidator:
+    """
+    Recover the signers of a Safe tx without using the node (EIP-712, eth_sign, contract signatures and approved
+    hashes) and keep the owners of the Safes in Redis, so signatures can be validated before using the node.
+    Recovered signers are kept in a process LRU cache, as wallets send the same signatures to estimate and relay
+    """
+    def __init__(self, redis: Redis, max_size: int = 4096, owners_timeout: int = 60 * 5):
+        """
+        :param redis:
+        :param max_size: Max number of signatures kept in the process cache
+        :param owners_timeout: Seconds owners of a Safe are kept in Redis. Owners can be changed without the relay,
+        so it should be short
+        """
+        self.redis = redis
+        self.signers_cache = LRUCache(maxsize=max_size)
+        self.signers_cache_lock = Lock()
+        self.owners_timeout = owners_timeout
+
+    @staticmethod
+    def _recover_signer(safe_tx_hash: bytes, v: int, r: int, s: int) -> str:
+        """
+        :return: Signer of one signature. For contract signatures and approved hashes signer is not validated
+        (it's stored on `r`), so the Safe must still be simulated
+        :raises: InvalidSignature
+        """
+        if v in (0, 1):  # Contract signature or approved hash
+            return Web3.toChecksumAddress(r.to_bytes(32, 'big')[-20:])
+        elif v in (27, 28):  # EIP-712
+            signed_hash = safe_tx_hash
+        elif v in (31, 32):  # eth_sign, `v` is increased by 4
+            signed_hash = Web3.keccak(b'\x19Ethereum Signed Message:\n32' + safe_tx_hash)
+            v -= 4
+        else:
+            raise InvalidSignature(f'Signature with v={v} not supported')
+
+        try:
+            return get_signing_address(signed_hash, v, r, s)
+        except (ValueError, TypeError) as exc:
+            raise InvalidSignature(f'Cannot recover signer for v={v} r={r} s={s}') from exc
+
+    def recover_signers(self, safe_tx_hash: bytes, signatures: bytes) -> Tuple[str, ...]:
+        """
+        :param safe_tx_hash:
+        :param signatures: Packed signatures, 65 bytes each
+        :return: Signers in the same order of the signatures
+        :raises: InvalidSignature
+        """
+        safe_tx_hash = bytes(HexBytes(safe_tx_hash))
+        signatures = bytes(signatures)
+        key = (safe_tx_hash, signatures)
+        with self.signers_cache_lock:
+            signers = self.signers_cache.get(key)
+        if signers is None:
+            signers = tuple(self._recover_signer(safe_tx_hash, *signature_split(signatures, i))
+                            for i in range(len(signatures) // 65))
+            with self.signers_cache_lock:
+                self.signers_cache[key] = signers
+        return signers
+
+    @staticmethod
+    def _get_owners_redis_key(safe_address: str) -> str:
+        return f'safe-owners:{safe_address}'
+
+    def get_owners(self, safe_address: str) -> Optional[SafeOwners]:
+        value = self.redis.get(self._get_owners_redis_key(safe_address))
+        if value is None:
+            return None
+        return SafeOwners(**json.loads(value))
+
+    def set_owners(self, safe_owners: SafeOwners):
+        self.redis.set(self._get_owners_redis_key(safe_owners.address), json.dumps(safe_owners._asdict()),
+                       ex=self.owners_timeout)
+
+    def invalidate_owners(self, safe_address: str):
+        logger.debug('Invalidating owners for safe=%s', safe_address)
+        self.redis.delete(self._get_owners_redis_key(safe_address))
+
+    def invalidate_owners_from_logs(self, logs: Iterable[Dict[str, Any]]) -> int:
+        """
+        Invalidate owners for the Safes emitting events for owners or threshold changes
+        :param logs: Logs of a tx receipt
+        :return: Number of Safes invalidated
+        """
+        invalidated = 0
+        for log in logs:
+            if log['topics'] and HexBytes(log['topics'][0]) in OWNERS_CHANGED_TOPICS:
+                self.invalidate_owners(Web3.toChecksumAddress(log['address']))
+                invalidated += 1
+        return invalidated
+
+    @staticmethod
+    def is_owner_management_tx(data: Optional[bytes]) -> bool:
+        """
+        :param data: Data of a Safe tx (sent to the Safe itself)
+        :return: `True` if tx is changing the owners or the threshold of the Safe
+        """
+        return bool(data) and HexBytes(data)[:4] in OWNER_MANAGEMENT_SELECTORS
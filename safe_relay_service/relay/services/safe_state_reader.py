@@ -0,0 +1,273 @@
+from logging import getLogger
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence, Union
+
+from django.conf import settings
+
+from eth_abi import decode_single
+from hexbytes import HexBytes
+from requests import RequestException
+from web3 import Web3
+
+from gnosis.eth import EthereumClient, EthereumClientProvider
+from gnosis.eth.constants import NULL_ADDRESS
+
+from safe_relay_service.utils.json_rpc import (JsonRpcBatchClient,
+                                               JsonRpcBatchException)
+
+logger = getLogger(__name__)
+
+GET_THRESHOLD_DATA = Web3.keccak(text='getThreshold()')[:4].hex()
+GET_OWNERS_DATA = Web3.keccak(text='getOwners()')[:4].hex()
+NONCE_DATA = Web3.keccak(text='nonce()')[:4].hex()
+VERSION_DATA = Web3.keccak(text='VERSION()')[:4].hex()
+BALANCE_OF_SELECTOR = Web3.keccak(text='balanceOf(address)')[:4].hex()
+FALLBACK_HANDLER_STORAGE_SLOT = Web3.keccak(text='fallback_manager.handler.address').hex()
+
+
+class SafeStateReaderException(Exception):
+    pass
+
+
+class SafeState(NamedTuple):
+    address: str
+    block_number: int  # Block every field was read at
+    code: Optional[bytes]  # `None` if not requested
+    master_copy: Optional[str]  # `None` if not requested
+    threshold: Optional[int]  # `None` if Safe is not deployed
+    version: Optional[str]  # `None` if Safe is not deployed or not requested
+    gas_token_balance: int  # Ether balance if gas token is `NULL_ADDRESS`
+    owners: Optional[List[str]] = None  # `None` if Safe is not deployed
+
+
+class SafeInfo(NamedTuple):
+    address: str
+    nonce: int
+    threshold: int
+    owners: List[str]
+    master_copy: str
+    version: str
+    fallback_handler: str
+
+
+class SafeStateReaderProvider:
+    def __new__(cls):
+        if not hasattr(cls, 'instance'):
+            ethereum_client = EthereumClientProvider()
+            cls.instance = SafeStateReader(ethereum_client,
+                                           JsonRpcBatchClient(ethereum_client.ethereum_node_url,
+                                                              batch_size=settings.SAFE_STATE_RPC_BATCH_SIZE))
+        return cls.instance
+
+    @classmethod
+    def del_singleton(cls):
+        if hasattr(cls, "instance"):
+            del cls.instance
+
+
+class SafeStateReader:
+    """
+    Read the state of a Safe needed for validating a tx (code, master copy, threshold, owners, version and balance)
+    sending all the queries in the same JSON-RPC batch, pinned to the same block
+    """
+    def __init__(self, ethereum_client: EthereumClient, json_rpc_client: JsonRpcBatchClient):
+        self.ethereum_client = ethereum_client
+        self.json_rpc_client = json_rpc_client
+
+    @staticmethod
+    def _build_rpc_request(method: str, params: List[Any], request_id: int) -> Dict[str, Any]:
+        return {'jsonrpc': '2.0', 'method': method, 'params': params, 'id': request_id}
+
+    @staticmethod
+    def _build_call_request(to: str, data: str, block_identifier: str, request_id: int) -> Dict[str, Any]:
+        return SafeStateReader._build_rpc_request('eth_call', [{'to': to, 'data': data}, block_identifier],
+                                                  request_id)
+
+    @staticmethod
+    def _get_result(rpc_responses: Dict[int, Dict[str, Any]], request_id: int) -> Optional[HexBytes]:
+        """
+        :return: Result of the request, `None` if the request failed (e.g. contract call reverted)
+        """
+        rpc_response = rpc_responses.get(request_id)
+        if not rpc_response or rpc_response.get('result') is None:
+            return None
+        return HexBytes(rpc_response['result'])
+
+    def resolve_block_identifier(self, block_identifier: Union[int, str]) -> int:
+        if isinstance(block_identifier, int):
+            return block_identifier
+        return self.ethereum_client.current_block_number
+
+    def _build_safe_state_requests(self, safe_address: str, gas_token: str, block_hex: str,
+                                   include_metadata: bool, id_offset: int) -> List[Dict[str, Any]]:
+        """
+        Request ids go from `id_offset` to `id_offset + 5`
+        """
+        if gas_token == NULL_ADDRESS:
+            balance_request = self._build_rpc_request('eth_getBalance', [safe_address, block_hex], id_offset + 4)
+        else:
+            balance_request = self._build_call_request(gas_token,
+                                                       BALANCE_OF_SELECTOR + '{:0>64}'.format(
+                                                           safe_address.replace('0x', '').lower()),
+                                                       block_hex, id_offset + 4)
+
+        rpc_requests = [
+            self._build_call_request(safe_address, GET_THRESHOLD_DATA, block_hex, id_offset + 2),
+            balance_request,
+            self._build_call_request(safe_address, GET_OWNERS_DATA, block_hex, id_offset + 5),
+        ]
+        if include_metadata:
+            rpc_requests += [
+                self._build_rpc_request('eth_getCode', [safe_address, block_hex], id_offset),
+                self._build_rpc_request('eth_getStorageAt', [safe_address, '0x0', block_hex], id_offset + 1),
+                self._build_call_request(safe_address, VERSION_DATA, block_hex, id_offset + 3),
+            ]
+        return rpc_requests
+
+    def _parse_safe_state(self, rpc_responses: Dict[int, Dict[str, Any]], safe_address: str, block_number: int,
+                          include_metadata: bool, id_offset: int) -> Optional[SafeState]:
+        """
+        :return: SafeState, `None` if node returned an error for a request that cannot fail or if threshold, owners
+        or balance are missing for a deployed Safe. If metadata is not requested, Safe is expected to be deployed
+        """
+        code = self._get_result(rpc_responses, id_offset)
+        master_copy_storage = self._get_result(rpc_responses, id_offset + 1)
+        if include_metadata and (code is None or master_copy_storage is None):
+            return None
+        threshold_data = self._get_result(rpc_responses, id_offset + 2)
+        version_data = self._get_result(rpc_responses, id_offset + 3)
+        balance_data = self._get_result(rpc_responses, id_offset + 4)
+        owners_data = self._get_result(rpc_responses, id_offset + 5)
+        deployed = not include_metadata or bool(code)
+        if deployed and not (threshold_data and owners_data and balance_data):
+            logger.warning('Missing fields on state for safe=%s on block=%d', safe_address, block_number)
+            return None
+        master_copy = (Web3.toChecksumAddress(master_copy_storage.rjust(32, b'\0')[-20:])
+                       if master_copy_storage is not None else None)
+        return SafeState(
+            safe_address,
+            block_number,
+            bytes(code) if code is not None else None,
+            master_copy,
+            decode_single('uint256', threshold_data) if threshold_data else None,
+            decode_single('string', version_data) if version_data else None,
+            int.from_bytes(balance_data, 'big') if balance_data else 0,
+            [Web3.toChecksumAddress(owner) for owner in decode_single('address[]', owners_data)]
+            if owners_data else None,
+        )
+
+    def get_safe_states(self, safe_addresses: Sequence[str], gas_tokens: Sequence[Optional[str]],
+                        block_identifier: Union[int, str] = 'latest',
+                        include_metadata: Union[bool, Sequence[bool]] = True) -> List[Optional[SafeState]]:
+        """
+        Same as `get_safe_state`, but for many Safes. Every query is sent in the same JSON-RPC batch (split by
+        the batch size of the client) and pinned to the same block
+        :param safe_addresses:
+        :param gas_tokens: Gas token for every Safe
+        :param block_identifier:
+        :param include_metadata: Same value for every Safe, or one value for every Safe
+        :return: SafeState for every Safe, `None` if state could not be retrieved
+        :raises: SafeStateReaderException: If the batch could not be sent
+        """
+        assert len(safe_addresses) == len(gas_tokens), 'One gas token for every Safe is required'
+        if isinstance(include_metadata, bool):
+            include_metadata = [include_metadata] * len(safe_addresses)
+
+        block_number = self.resolve_block_identifier(block_identifier)
+        block_hex = hex(block_number)
+        rpc_requests = []
+        for i, (safe_address, gas_token, safe_include_metadata) in enumerate(zip(safe_addresses, gas_tokens,
+                                                                                  include_metadata)):
+            rpc_requests.extend(self._build_safe_state_requests(safe_address, gas_token or NULL_ADDRESS,
+                                                                block_hex, safe_include_metadata, i * 6))
+        try:
+            rpc_responses = {rpc_response['id']: rpc_response
+                             for rpc_response in self.json_rpc_client.request(rpc_requests)}
+        except (JsonRpcBatchException, RequestException, ValueError) as exc:
+            raise SafeStateReaderException('Cannot retrieve state for %d safes' % len(safe_addresses)) from exc
+        return [self._parse_safe_state(rpc_responses, safe_address, block_number, safe_include_metadata, i * 6)
+                for i, (safe_address, safe_include_metadata) in enumerate(zip(safe_addresses, include_metadata))]
+
+    def _build_safe_info_requests(self, safe_address: str, block_hex: str,
+                                  id_offset: int) -> List[Dict[str, Any]]:
+        """
+        Request ids go from `id_offset` to `id_offset + 6`
+        """
+        return [
+            self._build_rpc_request('eth_getCode', [safe_address, block_hex], id_offset),
+            self._build_rpc_request('eth_getStorageAt', [safe_address, '0x0', block_hex], id_offset + 1),
+            self._build_rpc_request('eth_getStorageAt', [safe_address, FALLBACK_HANDLER_STORAGE_SLOT, block_hex],
+                                    id_offset + 2),
+            self._build_call_request(safe_address, NONCE_DATA, block_hex, id_offset + 3),
+            self._build_call_request(safe_address, GET_THRESHOLD_DATA, block_hex, id_offset + 4),
+            self._build_call_request(safe_address, GET_OWNERS_DATA, block_hex, id_offset + 5),
+            self._build_call_request(safe_address, VERSION_DATA, block_hex, id_offset + 6),
+        ]
+
+    def _parse_safe_info(self, rpc_responses: Dict[int, Dict[str, Any]], safe_address: str,
+                         id_offset: int) -> Optional[SafeInfo]:
+        """
+        :return: SafeInfo, `None` if there's no Safe deployed on `safe_address`
+        :raises: SafeStateReaderException: If node returned an error for a request that cannot fail
+        """
+        code = self._get_result(rpc_responses, id_offset)
+        master_copy_storage = self._get_result(rpc_responses, id_offset + 1)
+        fallback_handler_storage = self._get_result(rpc_responses, id_offset + 2)
+        if code is None or master_copy_storage is None or fallback_handler_storage is None:
+            raise SafeStateReaderException('Cannot retrieve info for safe=%s' % safe_address)
+        nonce_data = self._get_result(rpc_responses, id_offset + 3)
+        threshold_data = self._get_result(rpc_responses, id_offset + 4)
+        owners_data = self._get_result(rpc_responses, id_offset + 5)
+        version_data = self._get_result(rpc_responses, id_offset + 6)
+        if not code or not nonce_data or not threshold_data or not owners_data:  # Not a contract or not a Safe
+            return None
+        return SafeInfo(
+            safe_address,
+            decode_single('uint256', nonce_data),
+            decode_single('uint256', threshold_data),
+            [Web3.toChecksumAddress(owner) for owner in decode_single('address[]', owners_data)],
+            Web3.toChecksumAddress(master_copy_storage.rjust(32, b'\0')[-20:]),
+            decode_single('string', version_data) if version_data else None,
+            Web3.toChecksumAddress(fallback_handler_storage.rjust(32, b'\0')[-20:]),
+        )
+
+    def get_safe_infos(self, safe_addresses: Sequence[str],
+                       block_identifier: Union[int, str] = 'latest') -> List[Optional[SafeInfo]]:
+        """
+        Read nonce, threshold, owners, master copy, version and fallback handler for many Safes. Every query
+        is sent in the same JSON-RPC batch (split by the batch size of the client) and pinned to the same block,
+        so it takes one round-trip to the node instead of one call for every field of every Safe
+        :param safe_addresses:
+        :param block_identifier: Block to read the info at. If not a block number, current block number is used
+        :return: SafeInfo for every Safe, `None` if there's no Safe deployed on the address
+        :raises: SafeStateReaderException: If info for any of the Safes could not be retrieved
+        """
+        block_hex = hex(self.resolve_block_identifier(block_identifier))
+        rpc_requests = []
+        for i, safe_address in enumerate(safe_addresses):
+            rpc_requests.extend(self._build_safe_info_requests(safe_address, block_hex, i * 7))
+        try:
+            rpc_responses = {rpc_response['id']: rpc_response
+                             for rpc_response in self.json_rpc_client.request(rpc_requests)}
+        except (JsonRpcBatchException, RequestException, ValueError) as exc:
+            raise SafeStateReaderException('Cannot retrieve info for %d safes' % len(safe_addresses)) from exc
+        return [self._parse_safe_info(rpc_responses, safe_address, i * 7)
+                for i, safe_address in enumerate(safe_addresses)]
+
+    def get_safe_state(self, safe_address: str, gas_token: Optional[str] = None,
+                       block_identifier: Union[int, str] = 'latest', include_metadata: bool = True) -> SafeState:
+        """
+        :param safe_address:
+        :param gas_token: Token used for paying the tx. Its balance is returned. If `None` or `NULL_ADDRESS`
+        ether balance is returned
+        :param block_identifier: Block to read the state at. If not a block number, current block number is used
+        :param include_metadata: If `False`, data that only changes on Safe upgrades (code, master copy
+        and version) is not requested
+        :return: SafeState
+        :raises: SafeStateReaderException: If node returned an error for a request that cannot fail or a required
+        field is missing
+        """
+        safe_state = self.get_safe_states([safe_address], [gas_token], block_identifier=block_identifier,
+                                          include_metadata=include_metadata)[0]
+        if safe_state is None:
+            raise SafeStateReaderException('Cannot retrieve state for safe=%s' % safe_address)
+        return safe_state
@@ -0,0 +1,91 @@
+from enum import Enum
+from logging import getLogger
+from typing import Dict, List, Optional, Sequence
+
+from django.db.models import Count
+
+from eth_account import Account
+from eth_account.signers.local import LocalAccount
+from web3 import Web3
+
+from ..models import EthereumTx, SafeMultisigTx
+
+logger = getLogger(__name__)
+
+
+class SenderAccountAssignment(Enum):
+    DETERMINISTIC = 'deterministic'  # Same Safe always uses the same account
+    LEAST_PENDING = 'least-pending'  # Account with less txs not mined
+
+
+class SenderAccountPool:
+    """
+    Pool of accounts used for sending the relayed txs, so txs can be sent in parallel (every account has its
+    own nonce). Txs of a Safe with txs not mined are always assigned to the same account, so they are mined
+    in the same order they were relayed
+    """
+    def __init__(self, private_keys: Sequence[str],
+                 assignment: SenderAccountAssignment = SenderAccountAssignment.DETERMINISTIC):
+        """
+        :param private_keys: Private keys of the accounts of the pool, at least one is required
+        :param assignment: Policy to assign an account to a Safe tx
+        """
+        assert private_keys, 'At least one sender account is required'
+        self.accounts: List[LocalAccount] = [Account.from_key(private_key) for private_key in private_keys]
+        self.accounts_by_address: Dict[str, LocalAccount] = {account.address: account
+                                                             for account in self.accounts}
+        self.assignment = assignment
+
+    def __len__(self):
+        return len(self.accounts)
+
+    @property
+    def addresses(self) -> List[str]:
+        return [account.address for account in self.accounts]
+
+    def get(self, address: str) -> Optional[LocalAccount]:
+        """
+        :return: Account of the pool for `address`, `None` if address is not on the pool
+        """
+        return self.accounts_by_address.get(address)
+
+    def get_deterministic_account(self, safe_address: str) -> LocalAccount:
+        index = int.from_bytes(Web3.keccak(hexstr=safe_address)[-8:], 'big') % len(self.accounts)
+        return self.accounts[index]
+
+    def get_pending_txs_count(self) -> Dict[str, int]:
+        """
+        :return: Dictionary with every address of the pool and the number of txs sent and not mined
+        """
+        pending_txs_count = {address: 0 for address in self.addresses}
+        for result in EthereumTx.objects.filter(
+                block=None, replaced_by=None, _from__in=self.addresses
+        ).values('_from').annotate(count=Count('tx_hash')):
+            pending_txs_count[result['_from']] = result['count']
+        return pending_txs_count
+
+    def _get_account_with_pending_txs(self, safe_address: str) -> Optional[LocalAccount]:
+        sender_address = SafeMultisigTx.objects.exclude(ethereum_tx=None).filter(
+            safe=safe_address, ethereum_tx__block=None
+        ).order_by('-nonce').values_list('ethereum_tx___from', flat=True).first()
+        return self.get(sender_address) if sender_address else None
+
+    def assign(self, safe_address: str) -> LocalAccount:
+        """
+        :param safe_address: Safe the tx will be sent to
+        :return: Account of the pool to send the tx
+        """
+        if len(self.accounts) == 1:
+            return self.accounts[0]
+
+        if self.assignment == SenderAccountAssignment.DETERMINISTIC:
+            return self.get_deterministic_account(safe_address)
+
+        account = self._get_account_with_pending_txs(safe_address)
+        if account:
+            return account
+        pending_txs_count = self.get_pending_txs_count()
+        deterministic_account = self.get_deterministic_account(safe_address)
+        # On a tie, deterministic account is preferred
+        return min(self.accounts, key=lambda account: (pending_txs_count[account.address],
+                                                       account != deterministic_account))
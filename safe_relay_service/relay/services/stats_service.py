@@ -1,7 +1,8 @@
 import datetime
 from logging import getLogger
-from typing import Any, Dict, List, Union
+from typing import Any, Dict, List, Optional, Sequence, Union
 
+from django.conf import settings
 from django.db.models import Count
 from django.db.models.functions import TruncDate
 from django.utils import timezone
@@ -14,6 +15,7 @@ from gnosis.eth import EthereumClient, EthereumClientProvider
 
 from safe_relay_service.gas_station.gas_station import (GasStation,
                                                         GasStationProvider)
+from safe_relay_service.utils.json_rpc import JsonRpcBatchClient
 
 from ..models import EthereumEvent, SafeContract, SafeMultisigTx
 
@@ -33,34 +35,84 @@ class StatsServiceProvider:
 
 
 class StatsService:
-    def __init__(self, ethereum_client: EthereumClient, gas_station: GasStation):
+    def __init__(self, ethereum_client: EthereumClient, gas_station: GasStation,
+                 json_rpc_client: Optional[JsonRpcBatchClient] = None):
         self.ethereum_client = ethereum_client
         self.gas_station = gas_station
+        self.json_rpc_client = json_rpc_client or JsonRpcBatchClient(ethereum_client.ethereum_node_url,
+                                                                     batch_size=settings.SAFE_STATE_RPC_BATCH_SIZE)
 
-    def get_balances(self, safe_address: str) -> List[Dict[str, Union[str, int]]]:
+    def get_balances(self, safe_address: str,
+                     block_identifier: Union[int, str] = 'latest') -> List[Dict[str, Union[str, int]]]:
         """
         :param safe_address:
+        :param block_identifier: Block number or tag to read the balances at
         :return: `{'token_address': str, 'balance': int}`. For ether, `token_address` is `None`
         """
         assert Web3.isChecksumAddress(safe_address), f'Not valid address {safe_address} for getting balances'
 
+        tokens_used = list(EthereumEvent.objects.erc20_tokens_used_by_address(safe_address))
+        queries = self._build_balance_queries(safe_address, tokens_used, block_identifier, 0)
+        response = requests.post(self.ethereum_client.ethereum_node_url, json=queries)
+        return self._parse_balances(tokens_used, [data['result'] for data in response.json()])
+
+    def get_balances_for_safes(self, safe_addresses: Sequence[str],
+                               block_identifier: Union[int, str] = 'latest') -> List[Optional[List[Dict[str, Any]]]]:
+        """
+        Same as `get_balances`, but for many Safes. Every query is sent in the same JSON-RPC batch (split by the
+        batch size of the client)
+        :param safe_addresses:
+        :param block_identifier: Block number or tag to read the balances at
+        :return: Balances for every Safe, `None` if balances for a Safe could not be retrieved
+        :raises: JsonRpcBatchException, requests.RequestException, ValueError: If every batch failed
+        """
+        tokens_used_by_safe = [list(EthereumEvent.objects.erc20_tokens_used_by_address(safe_address))
+                               for safe_address in safe_addresses]
+        queries = []
+        for safe_address, tokens_used in zip(safe_addresses, tokens_used_by_safe):
+            queries.extend(self._build_balance_queries(safe_address, tokens_used, block_identifier, len(queries)))
+        rpc_responses = {rpc_response['id']: rpc_response for rpc_response in self.json_rpc_client.request(queries)}
+
+        balances_by_safe = []
+        id_offset = 0
+        for tokens_used in tokens_used_by_safe:
+            results = [rpc_responses.get(request_id, {}).get('result')
+                       for request_id in range(id_offset, id_offset + len(tokens_used) + 1)]
+            balances_by_safe.append(self._parse_balances(tokens_used, results) if None not in results else None)
+            id_offset += len(tokens_used) + 1
+        return balances_by_safe
+
+    @staticmethod
+    def _build_balance_queries(safe_address: str, tokens_used: List[str], block_identifier: Union[int, str],
+                               id_offset: int) -> List[Dict[str, Any]]:
+        """
+        Query ids go from `id_offset` (ether balance) to `id_offset + len(tokens_used)`
+        """
+        if isinstance(block_identifier, int):
+            block_identifier = hex(block_identifier)
         balance_query = {"jsonrpc": "2.0",
                          "method": "eth_getBalance",
-                         "params": [safe_address, "latest"],
-                         "id": 0}
+                         "params": [safe_address, block_identifier],
+                         "id": id_offset}
         queries = [balance_query]
-        tokens_used = list(EthereumEvent.objects.erc20_tokens_used_by_address(safe_address))
         for i, token_used in enumerate(tokens_used):
             queries.append({"jsonrpc": "2.0",
                             "method": "eth_call",
                             "params": [{"to": token_used,  # Balance of
                                         "data": "0x70a08231" + '{:0>64}'.format(safe_address.replace('0x', '').lower())
-                                        }, "latest"],
-                            "id": i + 1})
-        response = requests.post(self.ethereum_client.ethereum_node_url, json=queries)
+                                        }, block_identifier],
+                            "id": id_offset + i + 1})
+        return queries
+
+    @staticmethod
+    def _parse_balances(tokens_used: List[str], results: List[str]) -> List[Dict[str, Union[str, int]]]:
+        """
+        :param tokens_used:
+        :param results: Results of the queries, ether balance first
+        """
         balances = []
-        for token_address, data in zip([None] + tokens_used, response.json()):
-            value = 0 if data['result'] == '0x' else int(data['result'], 16)
+        for token_address, result in zip([None] + tokens_used, results):
+            value = 0 if result == '0x' else int(result, 16)
             if value or not token_address:  # If value 0, ignore unless ether
                 balances.append({
                     'token_address': token_address,
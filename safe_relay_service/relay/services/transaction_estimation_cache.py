@@ -0,0 +1,102 @@
+import json
+from logging import getLogger
+from typing import Callable, NamedTuple, Optional, Union
+
+from django.conf import settings
+
+from hexbytes import HexBytes
+from redis import Redis
+from redis.exceptions import LockError
+from web3 import Web3
+
+from gnosis.eth.constants import NULL_ADDRESS
+
+from ..repositories.redis_repository import RedisRepository
+
+logger = getLogger(__name__)
+
+
+class SafeTxGasEstimation(NamedTuple):
+    """
+    Part of a tx estimation that requires calls to the node. It only changes when a new block is mined
+    """
+    safe_tx_gas: int
+    base_gas: int
+    operational_gas: int  # DEPRECATED
+
+
+class TransactionEstimationCacheProvider:
+    def __new__(cls):
+        if not hasattr(cls, 'instance'):
+            cls.instance = TransactionEstimationCache(RedisRepository().redis,
+                                                      timeout=settings.SAFE_TX_ESTIMATION_CACHE_TIMEOUT)
+        return cls.instance
+
+    @classmethod
+    def del_singleton(cls):
+        if hasattr(cls, "instance"):
+            del cls.instance
+
+
+class TransactionEstimationCache:
+    """
+    Memoize `SafeTxGasEstimation` for the block it was calculated on, so wallets repeating the same estimation
+    while the user is signing do not hit the node. Concurrent identical estimations (on any process) are
+    coalesced using a Redis lock: only the first one is calculated, the rest wait for its result
+    """
+    def __init__(self, redis: Redis, timeout: int = 60, lock_timeout: int = 10):
+        """
+        :param redis:
+        :param timeout: Seconds an estimation is kept in Redis. It should be higher than the block time, as keys
+        are only valid for one block anyway
+        :param lock_timeout: Max seconds to wait for an identical estimation being calculated
+        """
+        self.redis = redis
+        self.timeout = timeout
+        self.lock_timeout = lock_timeout
+
+    @staticmethod
+    def get_key(safe_address: str, to: str, value: int, data: Optional[Union[bytes, str]], operation: int,
+                gas_token: Optional[str], block_number: int) -> str:
+        data_hash = Web3.keccak(HexBytes(data or b'')).hex()
+        return (f'safe-tx-estimation:{safe_address}:{to}:{value}:{data_hash}:{operation}:'
+                f'{gas_token or NULL_ADDRESS}:{block_number}')
+
+    def _get(self, key: str) -> Optional[SafeTxGasEstimation]:
+        value = self.redis.get(key)
+        if value is None:
+            return None
+        return SafeTxGasEstimation(*json.loads(value))
+
+    def _set(self, key: str, safe_tx_gas_estimation: SafeTxGasEstimation):
+        self.redis.set(key, json.dumps(safe_tx_gas_estimation), ex=self.timeout)
+
+    def get_or_calculate(self, key: str,
+                         calculate: Callable[[], SafeTxGasEstimation]) -> SafeTxGasEstimation:
+        """
+        :param key: Key built using `get_key`
+        :param calculate: Function calculating the estimation if not cached. Exceptions raised are propagated
+        and nothing is cached
+        :return: SafeTxGasEstimation
+        """
+        safe_tx_gas_estimation = self._get(key)
+        if safe_tx_gas_estimation is not None:
+            return safe_tx_gas_estimation
+
+        lock = self.redis.lock(f'{key}:lock', timeout=self.lock_timeout)
+        if not lock.acquire(blocking_timeout=self.lock_timeout):
+            logger.warning('Timeout waiting for estimation with key=%s, calculating it', key)
+            return calculate()
+
+        try:
+            # Estimation could be calculated by other request while waiting for the lock
+            safe_tx_gas_estimation = self._get(key)
+            if safe_tx_gas_estimation is None:
+                safe_tx_gas_estimation = calculate()
+                self._set(key, safe_tx_gas_estimation)
+            return safe_tx_gas_estimation
+        finally:
+            try:
+                lock.release()
+            except LockError:  # Lock expired, calculation took longer than `lock_timeout`
+                pass
@@ -1,29 +1,49 @@
+import math
 from datetime import timedelta
 from logging import getLogger
-from typing import Any, Dict, List, NamedTuple, Optional, Set, Tuple
+from typing import (Any, Dict, List, NamedTuple, Optional, Sequence, Set,
+                    Tuple, Union)
 
-from django.db import IntegrityError
+from django.db import IntegrityError, transaction
 from django.db.models import Q
 from django.utils import timezone
 
-from eth_account import Account
+from eth_account.signers.local import LocalAccount
+from hexbytes import HexBytes
 from packaging.version import Version
 from redis import Redis
+from requests import RequestException
 from web3.exceptions import BadFunctionCallOutput
 
 from gnosis.eth import EthereumClient, EthereumClientProvider
 from gnosis.eth.constants import NULL_ADDRESS
-from gnosis.safe import ProxyFactory, Safe
+from gnosis.safe import ProxyFactory, Safe, SafeOperation, SafeTx
 from gnosis.safe.exceptions import SafeServiceException
 from gnosis.safe.signatures import signatures_to_bytes
 
 from safe_relay_service.gas_station.gas_station import (GasStation,
                                                         GasStationProvider)
-from safe_relay_service.tokens.models import Token
-from safe_relay_service.tokens.price_oracles import CannotGetTokenPriceFromApi
+from safe_relay_service.tokens.gas_token_registry import \
+    GasTokenRegistryProvider
+from safe_relay_service.utils.json_rpc import (JsonRpcBatchClient,
+                                               JsonRpcBatchException)
 
 from ..models import EthereumBlock, EthereumTx, SafeContract, SafeMultisigTx
-from ..repositories.redis_repository import EthereumNonceLock, RedisRepository
+from ..repositories.redis_repository import (EthereumNonceAllocator,
+                                             RedisRepository)
+from .estimation_ticket import EstimationTicket, EstimationTicketSigner
+from .safe_metadata_cache import (SafeMetadata, SafeMetadataCache,
+                                  SafeMetadataCacheProvider)
+from .safe_signature_validator import (InvalidSignature, SafeOwners,
+                                       SafeSignatureValidator,
+                                       SafeSignatureValidatorProvider)
+from .safe_state_reader import (SafeState, SafeStateReader,
+                                SafeStateReaderException,
+                                SafeStateReaderProvider)
+from .sender_account_pool import SenderAccountAssignment, SenderAccountPool
+from .transaction_estimation_cache import (SafeTxGasEstimation,
+                                           TransactionEstimationCache,
+                                           TransactionEstimationCacheProvider)
 
 logger = getLogger(__name__)
 
@@ -80,6 +100,14 @@ class GasPriceTooLow(TransactionServiceException):
     pass
 
 
+class InvalidSignatures(TransactionServiceException):
+    pass
+
+
+class SignerIsNotOwner(TransactionServiceException):
+    pass
+
+
 class TransactionEstimationWithNonce(NamedTuple):
     safe_tx_gas: int
     base_gas: int  # For old versions it will equal to `data_gas`
@@ -88,12 +116,14 @@ class TransactionEstimationWithNonce(NamedTuple):
     gas_price: int
     gas_token: str
     last_used_nonce: int
+    estimation_ticket: Optional[str] = None  # Signed `EstimationTicket`
 
 
 class TransactionGasTokenEstimation(NamedTuple):
     base_gas: int  # For old versions it will equal to `data_gas`
     gas_price: int
     gas_token: str
+    estimation_ticket: Optional[str] = None  # Signed `EstimationTicket`
 
 
 class TransactionEstimationWithNonceAndGasTokens(NamedTuple):
@@ -103,6 +133,30 @@ class TransactionEstimationWithNonceAndGasTokens(NamedTuple):
     estimations: List[TransactionGasTokenEstimation]
 
 
+class SafeMultisigTxRequest(NamedTuple):
+    safe_address: str
+    to: str
+    value: int
+    data: bytes
+    operation: int
+    safe_tx_gas: int
+    base_gas: int
+    gas_price: int
+    gas_token: Optional[str]
+    refund_receiver: Optional[str]
+    nonce: int
+    signatures: List[Dict[str, int]]
+    estimation_ticket: Optional[str] = None
+
+
+class SafeMultisigTxBulkResult(NamedTuple):
+    safe_address: str
+    nonce: int
+    safe_multisig_tx: Optional[SafeMultisigTx]  # If tx was sent
+    error: Optional[str]  # If tx was not sent
+    status: Optional[str] = None  # `SafeMultisigTxStatus` value if tx was stored, `unknown` if broadcast is not known
+
+
 class TransactionServiceProvider:
     def __new__(cls):
         if not hasattr(cls, 'instance'):
@@ -112,7 +166,18 @@ class TransactionServiceProvider:
                                               RedisRepository().redis,
                                               settings.SAFE_VALID_CONTRACT_ADDRESSES,
                                               settings.SAFE_PROXY_FACTORY_ADDRESS,
-                                              settings.SAFE_TX_SENDER_PRIVATE_KEY)
+                                              settings.SAFE_TX_SENDER_PRIVATE_KEY,
+                                              SafeStateReaderProvider(),
+                                              SafeMetadataCacheProvider(),
+                                              TransactionEstimationCacheProvider(),
+                                              EstimationTicketSigner(
+                                                  max_age=settings.SAFE_TX_ESTIMATION_TICKET_MAX_AGE,
+                                                  max_blocks=settings.SAFE_TX_ESTIMATION_TICKET_MAX_BLOCKS),
+                                              SenderAccountPool(
+                                                  settings.SAFE_TX_SENDER_PRIVATE_KEYS
+                                                  or [settings.SAFE_TX_SENDER_PRIVATE_KEY],
+                                                  assignment=SenderAccountAssignment(
+                                                      settings.SAFE_TX_SENDER_ASSIGNMENT)))
         return cls.instance
 
     @classmethod
@@ -123,13 +188,29 @@ class TransactionServiceProvider:
 
 class TransactionService:
     def __init__(self, gas_station: GasStation, ethereum_client: EthereumClient, redis: Redis,
-                 safe_valid_contract_addresses: Set[str], proxy_factory_address: str, tx_sender_private_key: str):
+                 safe_valid_contract_addresses: Set[str], proxy_factory_address: str, tx_sender_private_key: str,
+                 safe_state_reader: Optional[SafeStateReader] = None,
+                 safe_metadata_cache: Optional[SafeMetadataCache] = None,
+                 transaction_estimation_cache: Optional[TransactionEstimationCache] = None,
+                 estimation_ticket_signer: Optional[EstimationTicketSigner] = None,
+                 sender_account_pool: Optional[SenderAccountPool] = None,
+                 json_rpc_client: Optional[JsonRpcBatchClient] = None,
+                 safe_signature_validator: Optional[SafeSignatureValidator] = None):
         self.gas_station = gas_station
         self.ethereum_client = ethereum_client
         self.redis = redis
         self.safe_valid_contract_addresses = safe_valid_contract_addresses
         self.proxy_factory = ProxyFactory(proxy_factory_address, self.ethereum_client)
-        self.tx_sender_account = Account.from_key(tx_sender_private_key)
+        # Txs are sent using the accounts of the pool. If no pool is provided, only `tx_sender_private_key` is used
+        self.sender_account_pool = sender_account_pool or SenderAccountPool([tx_sender_private_key])
+        self.tx_sender_account = self.sender_account_pool.accounts[0]
+        self.safe_state_reader = safe_state_reader or SafeStateReaderProvider()
+        self.safe_metadata_cache = safe_metadata_cache or SafeMetadataCacheProvider()
+        self.transaction_estimation_cache = transaction_estimation_cache or TransactionEstimationCacheProvider()
+        self.estimation_ticket_signer = estimation_ticket_signer or EstimationTicketSigner()
+        self.json_rpc_client = json_rpc_client or JsonRpcBatchClient(self.ethereum_client.ethereum_node_url)
+        self.safe_signature_validator = safe_signature_validator or SafeSignatureValidatorProvider()
+        self.valid_proxy_codes: Set[bytes] = set()  # Proxy codes already validated by the proxy factory
 
     @staticmethod
     def _check_refund_receiver(refund_receiver: str) -> bool:
@@ -149,12 +230,116 @@ class TransactionService:
         address = address or NULL_ADDRESS
         if address == NULL_ADDRESS:
             return True
-        try:
-            Token.objects.get(address=address, gas=True)
+        if GasTokenRegistryProvider().is_gas_token(address):
             return True
-        except Token.DoesNotExist:
-            logger.warning('Cannot retrieve gas token from db: Gas token %s not valid', address)
-            return False
+        logger.warning('Cannot retrieve gas token from db: Gas token %s not valid', address)
+        return False
+
+    def _check_proxy_code(self, safe_address: str, code: bytes) -> bool:
+        """
+        Proxy code is the same for every Safe deployed with the same factory, so the proxy factory is only
+        queried for codes not seen before
+        :param safe_address:
+        :param code: Deployed code of `safe_address`
+        :return: `True` if proxy contract is valid, `False` otherwise
+        """
+        if code in self.valid_proxy_codes:
+            return True
+        if self.proxy_factory.check_proxy_code(safe_address):
+            self.valid_proxy_codes.add(code)
+            return True
+        return False
+
+    def _get_safe_metadata_and_state(self, safe_address: str, gas_token: str,
+                                     block_identifier='latest') -> Tuple[SafeMetadata, SafeState]:
+        """
+        Retrieve Safe state. Metadata (master copy and version) is only requested to the node if not cached.
+        Metadata is cached only if proxy and master copy are valid
+        :return: Tuple(SafeMetadata, SafeState)
+        :raises: InvalidProxyContract
+        :raises: InvalidMasterCopyAddress
+        :raises: TransactionServiceException: If state cannot be retrieved
+        """
+        try:
+            block_number = self.safe_state_reader.resolve_block_identifier(block_identifier)
+            safe_metadata = self.safe_metadata_cache.get(safe_address, current_block_number=block_number)
+            safe_state = self.safe_state_reader.get_safe_state(safe_address, gas_token,
+                                                               block_identifier=block_number,
+                                                               include_metadata=safe_metadata is None)
+        except SafeStateReaderException as exc:
+            raise TransactionServiceException(str(exc)) from exc
+
+        return self._validate_safe_metadata(safe_address, safe_metadata, safe_state), safe_state
+
+    def _validate_safe_metadata(self, safe_address: str, safe_metadata: Optional[SafeMetadata],
+                                safe_state: SafeState) -> SafeMetadata:
+        """
+        :param safe_metadata: Cached metadata. If `None`, it's built from `safe_state` after validating it
+        :return: SafeMetadata
+        :raises: InvalidProxyContract
+        :raises: InvalidMasterCopyAddress
+        """
+        if safe_metadata is None:
+            # Make sure proxy contract is ours
+            if not self._check_proxy_code(safe_address, safe_state.code):
+                raise InvalidProxyContract(safe_address)
+
+            # Make sure master copy is valid
+            if safe_state.master_copy not in self.safe_valid_contract_addresses:
+                raise InvalidMasterCopyAddress(safe_state.master_copy)
+
+            safe_metadata = SafeMetadata(safe_address, safe_state.master_copy, safe_state.version,
+                                         safe_state.block_number)
+            self.safe_metadata_cache.set(safe_metadata)
+        return safe_metadata
+
+    def _pre_validate_signatures(self, safe_address: str, to: str, value: int, data: bytes, operation: int,
+                                 safe_tx_gas: int, base_gas: int, gas_price: int, gas_token: str,
+                                 refund_receiver: str, safe_nonce: int, signatures: bytes):
+        """
+        Validate signatures without using the node, so not valid txs are rejected before using node capacity.
+        Safe tx hash is calculated locally if Safe version is cached, and signers are checked against the
+        owners and threshold if cached. Signatures must still be validated by simulating the tx
+        :raises: InvalidSignatures: If a signature is not valid
+        :raises: SignaturesNotSorted: If signers are not sorted or repeated
+        :raises: SignaturesNotFound: If there are less signatures than the threshold
+        :raises: SignerIsNotOwner: If one of the signers needed for the threshold is not an owner
+        """
+        safe_metadata = self.safe_metadata_cache.get(safe_address)
+        if not safe_metadata:  # Version is needed to calculate the safe tx hash
+            return
+
+        safe_tx_hash = SafeTx(None, safe_address, to, value, data, operation, safe_tx_gas, base_gas, gas_price,
+                              gas_token, refund_receiver, safe_nonce=safe_nonce,
+                              safe_version=safe_metadata.version).safe_tx_hash
+        try:
+            signers = self.safe_signature_validator.recover_signers(safe_tx_hash, signatures)
+        except InvalidSignature as exc:
+            raise InvalidSignatures('Safe-tx-hash=%s - %s' % (safe_tx_hash.hex(), exc)) from exc
+
+        sorted_signers = sorted(set(signers), key=lambda signer: signer.lower())
+        if list(signers) != sorted_signers:
+            raise SignaturesNotSorted('Safe-tx-hash=%s - Signatures are not sorted by owner or are repeated: %s' %
+                                      (safe_tx_hash.hex(), signers))
+
+        safe_owners = self.safe_signature_validator.get_owners(safe_address)
+        if safe_owners:
+            if len(signers) < safe_owners.threshold:
+                raise SignaturesNotFound('Need at least %d signatures' % safe_owners.threshold)
+            # Only signatures needed for the threshold are checked by the Safe
+            for signer in signers[:safe_owners.threshold]:
+                if signer not in safe_owners.owners:
+                    raise SignerIsNotOwner('Safe-tx-hash=%s - Signer=%s is not an owner' % (safe_tx_hash.hex(),
+                                                                                          signer))
+
+    def _get_safe_version(self, safe: Safe) -> str:
+        """
+        :return: Safe version, using metadata cache if available
+        """
+        safe_metadata = self.safe_metadata_cache.get(safe.address)
+        if safe_metadata and safe_metadata.version:
+            return safe_metadata.version
+        return safe.retrieve_version()
 
     def _check_safe_gas_price(self, gas_token: Optional[str], safe_gas_price: int) -> bool:
         """
@@ -172,16 +357,15 @@ class TransactionService:
 
         minimum_accepted_gas_price = self._get_minimum_gas_price()
         if gas_token and gas_token != NULL_ADDRESS:
-            try:
-                gas_token_model = Token.objects.get(address=gas_token, gas=True)
-                estimated_gas_price = gas_token_model.calculate_gas_price(minimum_accepted_gas_price)
-                if safe_gas_price < estimated_gas_price:
-                    raise GasPriceTooLow('Required gas-price>=%d to use gas-token' % estimated_gas_price)
-                # We use gas station tx gas price. We cannot use internal tx's because is calculated
-                # based on the gas token
-            except Token.DoesNotExist:
+            gas_token_model = GasTokenRegistryProvider().get(gas_token)
+            if not gas_token_model:
                 logger.warning('Cannot retrieve gas token from db: Gas token %s not valid', gas_token)
                 raise InvalidGasToken('Gas token %s not valid' % gas_token)
+            estimated_gas_price = gas_token_model.calculate_gas_price(minimum_accepted_gas_price)
+            if safe_gas_price < estimated_gas_price:
+                raise GasPriceTooLow('Required gas-price>=%d to use gas-token' % estimated_gas_price)
+            # We use gas station tx gas price. We cannot use internal tx's because is calculated
+            # based on the gas token
         else:
             if safe_gas_price < minimum_accepted_gas_price:
                 raise GasPriceTooLow('Required gas-price>=%d' % minimum_accepted_gas_price)
@@ -190,11 +374,10 @@ class TransactionService:
     def _estimate_tx_gas_price(self, gas_token: Optional[str] = None):
         gas_price_fast = self._get_configured_gas_price()
         if gas_token and gas_token != NULL_ADDRESS:
-            try:
-                gas_token_model = Token.objects.get(address=gas_token, gas=True)
-                return gas_token_model.calculate_gas_price(gas_price_fast)
-            except Token.DoesNotExist:
+            gas_token_model = GasTokenRegistryProvider().get(gas_token)
+            if not gas_token_model:
                 raise InvalidGasToken('Gas token %s not found' % gas_token)
+            return gas_token_model.calculate_gas_price(gas_price_fast)
         else:
             return gas_price_fast
 
@@ -223,6 +406,30 @@ class TransactionService:
         except BadFunctionCallOutput:  # If Safe does not exist
             raise SafeDoesNotExist(f'Safe={safe_address} does not exist')
 
+    def _estimate_safe_tx_gas(self, safe_address: str, to: str, value: int, data: str, operation: int,
+                              gas_token: Optional[str], block_number: int) -> SafeTxGasEstimation:
+        """
+        Estimate gas for a Safe tx. Estimations are cached until a new block is mined
+        :param block_number: Current block number
+        :return: SafeTxGasEstimation
+        """
+        def calculate() -> SafeTxGasEstimation:
+            safe = Safe(safe_address, self.ethereum_client)
+            safe_tx_gas = safe.estimate_tx_gas(to, value, data, operation)
+            safe_tx_base_gas = safe.estimate_tx_base_gas(to, value, data, operation, gas_token, safe_tx_gas)
+
+            # For Safe contracts v1.0.0 operational gas is not used (`base_gas` has all the related costs already)
+            safe_version = self._get_safe_version(safe)
+            if Version(safe_version) >= Version('1.0.0'):
+                safe_tx_operational_gas = 0
+            else:
+                safe_tx_operational_gas = safe.estimate_tx_operational_gas(len(data) if data else 0)
+            return SafeTxGasEstimation(safe_tx_gas, safe_tx_base_gas, safe_tx_operational_gas)
+
+        key = self.transaction_estimation_cache.get_key(safe_address, to, value, data, operation, gas_token,
+                                                        block_number)
+        return self.transaction_estimation_cache.get_or_calculate(key, calculate)
+
     def estimate_tx(self, safe_address: str, to: str, value: int, data: str, operation: int,
                     gas_token: Optional[str]) -> TransactionEstimationWithNonce:
         """
@@ -232,49 +439,58 @@ class TransactionService:
         if not self._is_valid_gas_token(gas_token):
             raise InvalidGasToken(gas_token)
 
+        # Nonce is not cached, it changes as soon as a tx is relayed
         last_used_nonce = self.get_last_used_nonce(safe_address)
-        safe = Safe(safe_address, self.ethereum_client)
-        safe_tx_gas = safe.estimate_tx_gas(to, value, data, operation)
-        safe_tx_base_gas = safe.estimate_tx_base_gas(to, value, data, operation, gas_token, safe_tx_gas)
-
-        # For Safe contracts v1.0.0 operational gas is not used (`base_gas` has all the related costs already)
-        safe_version = safe.retrieve_version()
-        if Version(safe_version) >= Version('1.0.0'):
-            safe_tx_operational_gas = 0
-        else:
-            safe_tx_operational_gas = safe.estimate_tx_operational_gas(len(data) if data else 0)
+        block_number = self.ethereum_client.current_block_number
+        safe_tx_gas_estimation = self._estimate_safe_tx_gas(safe_address, to, value, data, operation,
+                                                            gas_token or NULL_ADDRESS, block_number)
+        estimation_ticket = self.estimation_ticket_signer.sign(
+            EstimationTicket.build(safe_address, to, value, data, operation, gas_token, block_number,
+                                   safe_tx_gas_estimation.safe_tx_gas, safe_tx_gas_estimation.base_gas)
+        )
 
         # Can throw RelayServiceException
         gas_price = self._estimate_tx_gas_price(gas_token)
-        return TransactionEstimationWithNonce(safe_tx_gas, safe_tx_base_gas, safe_tx_base_gas, safe_tx_operational_gas,
-                                              gas_price, gas_token or NULL_ADDRESS, last_used_nonce)
+        return TransactionEstimationWithNonce(safe_tx_gas_estimation.safe_tx_gas, safe_tx_gas_estimation.base_gas,
+                                              safe_tx_gas_estimation.base_gas,
+                                              safe_tx_gas_estimation.operational_gas,
+                                              gas_price, gas_token or NULL_ADDRESS, last_used_nonce,
+                                              estimation_ticket)
 
     def estimate_tx_for_all_tokens(self, safe_address: str, to: str, value: int, data: str,
                                    operation: int) -> TransactionEstimationWithNonceAndGasTokens:
-        safe = Safe(safe_address, self.ethereum_client)
         last_used_nonce = self.get_last_used_nonce(safe_address)
-        safe_tx_gas = safe.estimate_tx_gas(to, value, data, operation)
-
-        safe_version = safe.retrieve_version()
-        if Version(safe_version) >= Version('1.0.0'):
-            safe_tx_operational_gas = 0
-        else:
-            safe_tx_operational_gas = safe.estimate_tx_operational_gas(len(data) if data else 0)
 
         # Calculate `base_gas` for ether and calculate for tokens using the ether token price
-        ether_safe_tx_base_gas = safe.estimate_tx_base_gas(to, value, data, operation, NULL_ADDRESS, safe_tx_gas)
+        block_number = self.ethereum_client.current_block_number
+        safe_tx_gas_estimation = self._estimate_safe_tx_gas(safe_address, to, value, data, operation,
+                                                            NULL_ADDRESS, block_number)
+        safe_tx_gas = safe_tx_gas_estimation.safe_tx_gas
+        safe_tx_operational_gas = safe_tx_gas_estimation.operational_gas
+        ether_safe_tx_base_gas = safe_tx_gas_estimation.base_gas
+
+        def sign_estimation_ticket(gas_token: str, base_gas: int) -> str:
+            return self.estimation_ticket_signer.sign(
+                EstimationTicket.build(safe_address, to, value, data, operation, gas_token, block_number,
+                                       safe_tx_gas, base_gas)
+            )
+
         gas_price = self._estimate_tx_gas_price(NULL_ADDRESS)
-        gas_token_estimations = [TransactionGasTokenEstimation(ether_safe_tx_base_gas, gas_price, NULL_ADDRESS)]
+        gas_token_estimations = [TransactionGasTokenEstimation(ether_safe_tx_base_gas, gas_price, NULL_ADDRESS,
+                                                               sign_estimation_ticket(NULL_ADDRESS,
+                                                                                      ether_safe_tx_base_gas))]
         token_gas_difference = 50000  # 50K gas more expensive than ether
-        for token in Token.objects.gas_tokens():
-            try:
-                gas_price = self._estimate_tx_gas_price(token.address)
-                gas_token_estimations.append(
-                    TransactionGasTokenEstimation(ether_safe_tx_base_gas + token_gas_difference,
-                                                  gas_price, token.address)
-                )
-            except CannotGetTokenPriceFromApi:
-                logger.error('Cannot get price for token=%s', token.address)
+        # Prices are resolved concurrently, tokens without price (or too slow) are not returned
+        gas_token_registry = GasTokenRegistryProvider()
+        for token_address, eth_value in gas_token_registry.get_eth_values().items():
+            token = gas_token_registry.get(token_address)
+            token_base_gas = ether_safe_tx_base_gas + token_gas_difference
+            gas_token_estimations.append(
+                TransactionGasTokenEstimation(token_base_gas,
+                                              token.calculate_gas_price(gas_price, eth_value=eth_value),
+                                              token_address,
+                                              sign_estimation_ticket(token_address, token_base_gas))
+            )
 
         return TransactionEstimationWithNonceAndGasTokens(last_used_nonce, safe_tx_gas, safe_tx_operational_gas,
                                                           gas_token_estimations)
@@ -291,8 +507,10 @@ class TransactionService:
                            gas_token: str,
                            refund_receiver: str,
                            nonce: int,
-                           signatures: List[Dict[str, int]]) -> SafeMultisigTx:
+                           signatures: List[Dict[str, int]],
+                           estimation_ticket: Optional[str] = None) -> SafeMultisigTx:
         """
+        :param estimation_ticket: Ticket returned by the estimation endpoints. If valid, gas is not estimated again
         :return: Database model of SafeMultisigTx
         :raises: SafeMultisigTxExists: If Safe Multisig Tx with nonce already exists
         :raises: InvalidGasToken: If Gas Token is not valid
@@ -322,7 +540,8 @@ class TransactionService:
                 gas_token,
                 refund_receiver,
                 nonce,
-                signatures_packed
+                signatures_packed,
+                estimation_ticket=estimation_ticket
             )
         except SafeServiceException as exc:
             raise TransactionServiceException(str(exc)) from exc
@@ -351,6 +570,331 @@ class TransactionService:
         except IntegrityError as exc:
             raise SafeMultisigTxExists(f'Tx with nonce={nonce} for safe={safe_address} already exists in DB') from exc
 
+    def create_multisig_txs(self,
+                            multisig_tx_requests: Sequence[SafeMultisigTxRequest]) -> List[SafeMultisigTxBulkResult]:
+        """
+        Relay many Safe Multisig Txs at once. Txs are validated against the same block, so only one tx per Safe
+        is accepted. Safe states are read in the same JSON-RPC batch, nonces for every sender account are
+        reserved in one allocation and signed txs are broadcast in the same JSON-RPC batch
+        :param multisig_tx_requests:
+        :return: Result for every request, in the same order. A tx failing does not affect the others. If the node
+        did not answer when broadcasting a tx, the signed tx is stored anyway with status `unknown`, so it's tracked
+        (and bumped if it's not found) as any other pending tx
+        """
+        results: List[Optional[SafeMultisigTxBulkResult]] = [None] * len(multisig_tx_requests)
+
+        def set_error(index: int, exc: Exception):
+            multisig_tx_request = multisig_tx_requests[index]
+            logger.info('Cannot relay tx with nonce=%d for safe=%s: %s', multisig_tx_request.nonce,
+                        multisig_tx_request.safe_address, exc)
+            results[index] = SafeMultisigTxBulkResult(multisig_tx_request.safe_address, multisig_tx_request.nonce,
+                                                      None, '%s: %s' % (exc.__class__.__name__, exc))
+
+        # Checks not requiring the node
+        safe_contracts: Dict[int, SafeContract] = {}
+        for i, multisig_tx_request in enumerate(multisig_tx_requests):
+            safe_address = multisig_tx_request.safe_address
+            try:
+                if any(safe_contract.address == safe_address for safe_contract in safe_contracts.values()):
+                    raise TransactionServiceException(f'Only one tx per Safe is allowed, safe={safe_address} is '
+                                                      f'repeated')
+                if not self._check_refund_receiver(multisig_tx_request.refund_receiver or NULL_ADDRESS):
+                    raise InvalidRefundReceiver(multisig_tx_request.refund_receiver)
+                self._pre_validate_signatures(safe_address, multisig_tx_request.to or NULL_ADDRESS,
+                                              multisig_tx_request.value, multisig_tx_request.data or b'',
+                                              multisig_tx_request.operation, multisig_tx_request.safe_tx_gas,
+                                              multisig_tx_request.base_gas, multisig_tx_request.gas_price,
+                                              multisig_tx_request.gas_token or NULL_ADDRESS, NULL_ADDRESS,
+                                              multisig_tx_request.nonce,
+                                              signatures_to_bytes([(s['v'], s['r'], s['s'])
+                                                                   for s in multisig_tx_request.signatures]))
+                self._check_safe_gas_price(multisig_tx_request.gas_token or NULL_ADDRESS,
+                                           multisig_tx_request.gas_price)
+                safe_contract, _ = SafeContract.objects.get_or_create(address=safe_address,
+                                                                      defaults={'master_copy': NULL_ADDRESS})
+                if SafeMultisigTx.objects.filter(safe=safe_contract, nonce=multisig_tx_request.nonce).exists():
+                    raise SafeMultisigTxExists(f'Tx with nonce={multisig_tx_request.nonce} for safe={safe_address} '
+                                               f'already exists in DB')
+                safe_contracts[i] = safe_contract
+            except TransactionServiceException as exc:
+                set_error(i, exc)
+
+        # Safe states for every tx are read in the same batch, pinned to the same block
+        indexes = list(safe_contracts)
+        try:
+            block_number = self.ethereum_client.current_block_number
+            safe_metadatas = [self.safe_metadata_cache.get(multisig_tx_requests[i].safe_address,
+                                                           current_block_number=block_number) for i in indexes]
+            safe_states = self.safe_state_reader.get_safe_states(
+                [multisig_tx_requests[i].safe_address for i in indexes],
+                [multisig_tx_requests[i].gas_token for i in indexes],
+                block_identifier=block_number,
+                include_metadata=[safe_metadata is None for safe_metadata in safe_metadatas]
+            )
+        except (SafeStateReaderException, JsonRpcBatchException, RequestException, ValueError) as exc:
+            logger.warning('Cannot retrieve state for %d safes', len(indexes), exc_info=True)
+            for i in indexes:
+                set_error(i, TransactionServiceException(f'Cannot retrieve state for '
+                                                         f'safe={multisig_tx_requests[i].safe_address}: {exc}'))
+            indexes, safe_metadatas, safe_states = [], [], []
+
+        # Txs are simulated and grouped by sender account
+        safe_txs_by_sender: Dict[str, List[Tuple[int, SafeTx]]] = {}
+        for i, safe_metadata, safe_state in zip(indexes, safe_metadatas, safe_states):
+            multisig_tx_request = multisig_tx_requests[i]
+            try:
+                if safe_state is None:
+                    raise TransactionServiceException('Cannot retrieve state for safe=%s'
+                                                      % multisig_tx_request.safe_address)
+                safe_metadata = self._validate_safe_metadata(multisig_tx_request.safe_address, safe_metadata,
+                                                             safe_state)
+                tx_sender_account = self.sender_account_pool.assign(multisig_tx_request.safe_address)
+                signatures_packed = signatures_to_bytes([(s['v'], s['r'], s['s'])
+                                                         for s in multisig_tx_request.signatures])
+                safe_tx = self._build_and_simulate_multisig_tx(
+                    safe_metadata, safe_state, multisig_tx_request.to or NULL_ADDRESS, multisig_tx_request.value,
+                    multisig_tx_request.data or b'', multisig_tx_request.operation, multisig_tx_request.safe_tx_gas,
+                    multisig_tx_request.base_gas, multisig_tx_request.gas_price,
+                    multisig_tx_request.gas_token or NULL_ADDRESS,
+                    multisig_tx_request.refund_receiver or NULL_ADDRESS, multisig_tx_request.nonce,
+                    signatures_packed, tx_sender_account.address, block_identifier=block_number,
+                    estimation_ticket=multisig_tx_request.estimation_ticket
+                )
+                safe_txs_by_sender.setdefault(tx_sender_account.address, []).append((i, safe_tx))
+            except (SafeServiceException, TransactionServiceException) as exc:
+                set_error(i, exc)
+
+        if safe_txs_by_sender:
+            broadcast_results = self._broadcast_multisig_txs(safe_txs_by_sender)
+            for i, (tx_hash, tx, safe_tx, broadcast_unknown) in broadcast_results.items():
+                multisig_tx_request = multisig_tx_requests[i]
+                if tx_hash is None:
+                    set_error(i, TransactionServiceException('Tx could not be broadcast'))
+                    continue
+
+                try:
+                    with transaction.atomic():  # Don't break the outer transaction if a tx fails
+                        safe_multisig_tx = SafeMultisigTx.objects.create(
+                            safe=safe_contracts[i],
+                            ethereum_tx=EthereumTx.objects.create_from_tx(tx, tx_hash),
+                            to=multisig_tx_request.to,
+                            value=multisig_tx_request.value,
+                            data=multisig_tx_request.data,
+                            operation=multisig_tx_request.operation,
+                            safe_tx_gas=multisig_tx_request.safe_tx_gas,
+                            data_gas=multisig_tx_request.base_gas,
+                            gas_price=multisig_tx_request.gas_price,
+                            gas_token=safe_tx.gas_token if safe_tx.gas_token != NULL_ADDRESS else None,
+                            refund_receiver=safe_tx.refund_receiver,
+                            nonce=multisig_tx_request.nonce,
+                            signatures=safe_tx.signatures,
+                            safe_tx_hash=safe_tx.safe_tx_hash,
+                        )
+                    status = 'unknown' if broadcast_unknown else safe_multisig_tx.status.value
+                    results[i] = SafeMultisigTxBulkResult(multisig_tx_request.safe_address,
+                                                          multisig_tx_request.nonce, safe_multisig_tx, None, status)
+                except IntegrityError:
+                    set_error(i, SafeMultisigTxExists(f'Tx with nonce={multisig_tx_request.nonce} for '
+                                                      f'safe={multisig_tx_request.safe_address} already exists in DB'))
+        return results
+
+    @staticmethod
+    def _get_tx_gas(safe_tx: SafeTx) -> int:
+        """
+        :return: Gas limit for the ethereum tx, so it does not need to be estimated by the node. Same margin
+        `SafeTx.execute` uses
+        """
+        return (safe_tx.safe_tx_gas + safe_tx.base_gas) * 2 + 25000
+
+    @staticmethod
+    def _is_tx_already_imported_error(message: str) -> bool:
+        message = message.lower()
+        return 'already known' in message or 'known transaction' in message or 'already imported' in message
+
+    def _broadcast_multisig_txs(self, safe_txs_by_sender: Dict[str, List[Tuple[int, SafeTx]]]
+                                ) -> Dict[int, Tuple[Optional[bytes], Dict[str, Any], SafeTx, bool]]:
+        """
+        Sign the txs reserving the nonces for every sender in one allocation and broadcast every tx in the same
+        JSON-RPC batch. Nonces of txs not broadcast are released. If the node did not answer for a tx, it could
+        have been broadcast, so its nonce is confirmed and the tx must be stored. If it was not, the tx will be
+        bumped using the same nonce
+        :param safe_txs_by_sender: Sender address -> List(request index, SafeTx)
+        :return: Dictionary of request index -> Tuple(tx_hash, tx, SafeTx, broadcast_unknown). `tx_hash` is `None`
+        if tx was not broadcast
+        """
+        tx_gas_price = self._get_configured_gas_price()
+        chain_id = self.ethereum_client.w3.eth.chainId
+        signed_txs: Dict[int, Tuple[LocalAccount, int, bytes, Dict[str, Any], SafeTx]] = {}
+        rpc_requests = []
+        for tx_sender_address, safe_txs in safe_txs_by_sender.items():
+            tx_sender_account = self.sender_account_pool.get(tx_sender_address)
+            nonce_allocator = EthereumNonceAllocator(self.redis, self.ethereum_client, tx_sender_address)
+            for (i, safe_tx), tx_nonce in zip(safe_txs, nonce_allocator.reserve_nonces(len(safe_txs))):
+                tx = safe_tx.w3_tx.buildTransaction({
+                    'from': tx_sender_address,
+                    'gas': self._get_tx_gas(safe_tx),
+                    'gasPrice': tx_gas_price,
+                    'nonce': tx_nonce,
+                    'chainId': chain_id,
+                })
+                signed_tx = tx_sender_account.sign_transaction(tx)
+                signed_txs[i] = (tx_sender_account, tx_nonce, signed_tx.hash, tx, safe_tx)
+                rpc_requests.append({'jsonrpc': '2.0', 'method': 'eth_sendRawTransaction',
+                                     'params': [signed_tx.rawTransaction.hex()], 'id': i})
+
+        try:
+            rpc_responses = {rpc_response['id']: rpc_response
+                             for rpc_response in self.json_rpc_client.request(rpc_requests)}
+        except (JsonRpcBatchException, RequestException, ValueError):
+            logger.error('Cannot broadcast %d txs', len(rpc_requests), exc_info=True)
+            rpc_responses = {}
+
+        results = {}
+        senders_to_sync = set()
+        for i, (tx_sender_account, tx_nonce, tx_hash, tx, safe_tx) in signed_txs.items():
+            nonce_allocator = EthereumNonceAllocator(self.redis, self.ethereum_client, tx_sender_account.address)
+            rpc_response = rpc_responses.get(i)
+            if rpc_response is None:
+                logger.error('Unknown result broadcasting tx with tx-hash=%s', tx_hash.hex())
+                nonce_allocator.confirm_nonce(tx_nonce)
+                results[i] = (tx_hash, tx, safe_tx, True)
+            elif 'error' in rpc_response and not self._is_tx_already_imported_error(
+                    str(rpc_response['error'].get('message'))):
+                logger.warning('Cannot broadcast tx with tx-hash=%s: %s', tx_hash.hex(), rpc_response['error'])
+                nonce_allocator.release_nonce(tx_nonce)
+                if 'nonce' in str(rpc_response['error'].get('message')).lower():
+                    senders_to_sync.add(tx_sender_account.address)
+                results[i] = (None, tx, safe_tx, False)
+            else:
+                nonce_allocator.confirm_nonce(tx_nonce)
+                results[i] = (tx_hash, tx, safe_tx, False)
+
+        for tx_sender_address in senders_to_sync:
+            EthereumNonceAllocator(self.redis, self.ethereum_client, tx_sender_address).sync()
+        return results
+
+    def queue_multisig_tx(self,
+                          safe_address: str,
+                          to: str,
+                          value: int,
+                          data: bytes,
+                          operation: int,
+                          safe_tx_gas: int,
+                          base_gas: int,
+                          gas_price: int,
+                          gas_token: str,
+                          refund_receiver: str,
+                          nonce: int,
+                          signatures: List[Dict[str, int]]) -> SafeMultisigTx:
+        """
+        Store a Safe Multisig Tx without sending it. Only validations not requiring the node are done (Safe version
+        is retrieved if not cached). Queued txs are sent using `send_queued_multisig_txs`
+        :return: Database model of SafeMultisigTx, without `ethereum_tx`
+        :raises: SafeMultisigTxExists: If Safe Multisig Tx with nonce already exists
+        :raises: InvalidGasToken: If Gas Token is not valid
+        :raises: TransactionServiceException: If Safe Tx is not valid (not sorted owners, gas price too low...)
+        """
+        gas_token = gas_token or NULL_ADDRESS
+        refund_receiver = refund_receiver or NULL_ADDRESS
+        if not self._check_refund_receiver(refund_receiver):
+            raise InvalidRefundReceiver(refund_receiver)
+        if not self._is_valid_gas_token(gas_token):
+            raise InvalidGasToken(gas_token)
+        signatures_packed = signatures_to_bytes([(s['v'], s['r'], s['s']) for s in signatures])
+        self._pre_validate_signatures(safe_address, to or NULL_ADDRESS, value, data or b'', operation, safe_tx_gas,
+                                      base_gas, gas_price, gas_token, refund_receiver, nonce, signatures_packed)
+        self._check_safe_gas_price(gas_token, gas_price)
+
+        safe_contract, _ = SafeContract.objects.get_or_create(address=safe_address,
+                                                              defaults={'master_copy': NULL_ADDRESS})
+        if SafeMultisigTx.objects.filter(safe=safe_contract, nonce=nonce).exists():
+            raise SafeMultisigTxExists(f'Tx with nonce={nonce} for safe={safe_address} already exists in DB')
+
+        try:
+            safe_version = self._get_safe_version(Safe(safe_address, self.ethereum_client))
+        except BadFunctionCallOutput:  # If Safe does not exist
+            raise SafeDoesNotExist(f'Safe={safe_address} does not exist')
+
+        safe_tx = SafeTx(self.ethereum_client, safe_address, to, value, data or b'', operation, safe_tx_gas,
+                         base_gas, gas_price, gas_token, refund_receiver, signatures=signatures_packed,
+                         safe_nonce=nonce, safe_version=safe_version)
+        if safe_tx.signers != safe_tx.sorted_signers:
+            raise SignaturesNotSorted('Safe-tx-hash=%s - Signatures are not sorted by owner: %s' %
+                                      (safe_tx.safe_tx_hash.hex(), safe_tx.signers))
+
+        try:
+            return SafeMultisigTx.objects.create(
+                safe=safe_contract,
+                ethereum_tx=None,
+                to=to,
+                value=value,
+                data=data,
+                operation=operation,
+                safe_tx_gas=safe_tx_gas,
+                data_gas=base_gas,
+                gas_price=gas_price,
+                gas_token=None if gas_token == NULL_ADDRESS else gas_token,
+                refund_receiver=refund_receiver,
+                nonce=nonce,
+                signatures=signatures_packed,
+                safe_tx_hash=safe_tx.safe_tx_hash,
+            )
+        except IntegrityError as exc:
+            raise SafeMultisigTxExists(f'Tx with nonce={nonce} for safe={safe_address} already exists in DB') from exc
+
+    @staticmethod
+    def _get_queued_multisig_tx_error_key(safe_tx_hash: Union[bytes, str]) -> str:
+        return f'safe-multisig-tx-error:{HexBytes(safe_tx_hash).hex()}'
+
+    def get_queued_multisig_tx_error(self, safe_tx_hash: Union[bytes, str]) -> Optional[str]:
+        """
+        :param safe_tx_hash:
+        :return: Error if queued tx could not be sent (it's removed from database), `None` otherwise
+        """
+        error = self.redis.get(self._get_queued_multisig_tx_error_key(safe_tx_hash))
+        return error.decode() if error is not None else None
+
+    def send_queued_multisig_txs(self, safe_address: str) -> int:
+        """
+        Send queued txs for a Safe, ordered by nonce. Txs that cannot be sent are removed from database and
+        the error is stored for one day, so it can be retrieved using `get_queued_multisig_tx_error`.
+        Only one process must send queued txs for the same Safe at the same time
+        :param safe_address:
+        :return: Number of txs sent
+        """
+        number_sent = 0
+        while True:
+            safe_multisig_tx = SafeMultisigTx.objects.queued().filter(safe=safe_address).order_by('nonce').first()
+            if not safe_multisig_tx:
+                return number_sent
+
+            try:
+                tx_hash, _, tx = self._send_multisig_tx(
+                    safe_address,
+                    safe_multisig_tx.to,
+                    safe_multisig_tx.value,
+                    safe_multisig_tx.data.tobytes() if safe_multisig_tx.data else b'',
+                    safe_multisig_tx.operation,
+                    safe_multisig_tx.safe_tx_gas,
+                    safe_multisig_tx.data_gas,
+                    safe_multisig_tx.gas_price,
+                    safe_multisig_tx.gas_token,
+                    safe_multisig_tx.refund_receiver,
+                    safe_multisig_tx.nonce,
+                    safe_multisig_tx.signatures.tobytes()
+                )
+            except (SafeServiceException, TransactionServiceException) as exc:
+                logger.warning('Cannot send queued tx with safe-tx-hash=%s for safe=%s: %s',
+                               safe_multisig_tx.safe_tx_hash, safe_address, exc)
+                self.redis.set(self._get_queued_multisig_tx_error_key(safe_multisig_tx.safe_tx_hash),
+                               '%s: %s' % (exc.__class__.__name__, exc), ex=60 * 60 * 24)
+                safe_multisig_tx.delete()
+                continue
+
+            safe_multisig_tx.ethereum_tx = EthereumTx.objects.create_from_tx(tx, tx_hash)
+            safe_multisig_tx.save(update_fields=['ethereum_tx'])
+            number_sent += 1
+
     def _send_multisig_tx(self,
                           safe_address: str,
                           to: str,
@@ -365,15 +909,17 @@ class TransactionService:
                           safe_nonce: int,
                           signatures: bytes,
                           tx_gas: Optional[int] = None,
-                          block_identifier='latest') -> Tuple[bytes, bytes, Dict[str, Any]]:
+                          block_identifier='latest',
+                          estimation_ticket: Optional[str] = None) -> Tuple[bytes, bytes, Dict[str, Any]]:
         """
         This function calls the `send_multisig_tx` of the Safe, but has some limitations to prevent abusing
         the relay
+        :param estimation_ticket: If valid, `safe_tx_gas` and `base_gas` are not estimated again. Tx is still
+        simulated before sending it
         :return: Tuple(tx_hash, safe_tx_hash, tx)
         :raises: InvalidMultisigTx: If user tx cannot go through the Safe
         """
 
-        safe = Safe(safe_address, self.ethereum_client)
         data = data or b''
         gas_token = gas_token or NULL_ADDRESS
         refund_receiver = refund_receiver or NULL_ADDRESS
@@ -383,38 +929,84 @@ class TransactionService:
         if not self._check_refund_receiver(refund_receiver):
             raise InvalidRefundReceiver(refund_receiver)
 
+        self._pre_validate_signatures(safe_address, to, value, data, operation, safe_tx_gas, base_gas, gas_price,
+                                      gas_token, refund_receiver, safe_nonce, signatures)
         self._check_safe_gas_price(gas_token, gas_price)
 
-        # Make sure proxy contract is ours
-        if not self.proxy_factory.check_proxy_code(safe_address):
-            raise InvalidProxyContract(safe_address)
+        # Every Safe state needed for validation is read in the same batch. Proxy and master copy are validated
+        safe_metadata, safe_state = self._get_safe_metadata_and_state(safe_address, gas_token,
+                                                                      block_identifier=block_identifier)
 
-        # Make sure master copy is valid
-        safe_master_copy_address = safe.retrieve_master_copy_address()
-        if safe_master_copy_address not in self.safe_valid_contract_addresses:
-            raise InvalidMasterCopyAddress(safe_master_copy_address)
+        # We use fast tx gas price, if not txs could be stuck
+        tx_gas_price = self._get_configured_gas_price()
+        tx_sender_account = self.sender_account_pool.assign(safe_address)
+        tx_sender_private_key = tx_sender_account.key
+        tx_sender_address = tx_sender_account.address
+
+        safe_tx = self._build_and_simulate_multisig_tx(safe_metadata, safe_state, to, value, data, operation,
+                                                       safe_tx_gas, base_gas, gas_price, gas_token,
+                                                       refund_receiver, safe_nonce, signatures, tx_sender_address,
+                                                       block_identifier=block_identifier,
+                                                       estimation_ticket=estimation_ticket)
+
+        with EthereumNonceAllocator(self.redis, self.ethereum_client,
+                                    tx_sender_address).reserve() as tx_nonce:
+            tx_hash, tx = safe_tx.execute(tx_sender_private_key, tx_gas=tx_gas, tx_gas_price=tx_gas_price,
+                                          tx_nonce=tx_nonce, block_identifier=block_identifier)
+            return tx_hash, safe_tx.safe_tx_hash, tx
+
+    def _build_and_simulate_multisig_tx(self,
+                                        safe_metadata: SafeMetadata,
+                                        safe_state: SafeState,
+                                        to: str,
+                                        value: int,
+                                        data: bytes,
+                                        operation: int,
+                                        safe_tx_gas: int,
+                                        base_gas: int,
+                                        gas_price: int,
+                                        gas_token: str,
+                                        refund_receiver: str,
+                                        safe_nonce: int,
+                                        signatures: bytes,
+                                        tx_sender_address: str,
+                                        block_identifier='latest',
+                                        estimation_ticket: Optional[str] = None) -> SafeTx:
+        """
+        Validate a Safe tx against the Safe state and simulate it. Gas price and refund receiver must be
+        already validated
+        :return: SafeTx ready to be executed
+        :raises: InvalidMultisigTx: If user tx cannot go through the Safe
+        :raises: TransactionServiceException: If Safe tx is not valid for the relay
+        """
+        safe_address = safe_state.address
+        safe = Safe(safe_address, self.ethereum_client)
+        if safe_state.owners is None or safe_state.threshold is None:
+            raise SafeDoesNotExist(f'Safe={safe_address} does not exist')
+        self.safe_signature_validator.set_owners(SafeOwners(safe_address, safe_state.owners,
+                                                            safe_state.threshold, safe_state.block_number))
 
         # Check enough funds to pay for the gas
-        if not safe.check_funds_for_tx_gas(safe_tx_gas, base_gas, gas_price, gas_token):
+        if safe_state.gas_token_balance < (safe_tx_gas + base_gas) * gas_price:
             raise NotEnoughFundsForMultisigTx
 
-        threshold = safe.retrieve_threshold()
+        threshold = safe_state.threshold
         number_signatures = len(signatures) // 65  # One signature = 65 bytes
         if number_signatures < threshold:
             raise SignaturesNotFound('Need at least %d signatures' % threshold)
 
-        safe_tx_gas_estimation = safe.estimate_tx_gas(to, value, data, operation)
-        safe_base_gas_estimation = safe.estimate_tx_base_gas(to, value, data, operation, gas_token,
-                                                             safe_tx_gas_estimation)
-        if safe_tx_gas < safe_tx_gas_estimation or base_gas < safe_base_gas_estimation:
-            raise InvalidGasEstimation("Gas should be at least equal to safe-tx-gas=%d and base-gas=%d. Current is "
-                                       "safe-tx-gas=%d and base-gas=%d" %
-                                       (safe_tx_gas_estimation, safe_base_gas_estimation, safe_tx_gas, base_gas))
-
-        # We use fast tx gas price, if not txs could be stuck
-        tx_gas_price = self._get_configured_gas_price()
-        tx_sender_private_key = self.tx_sender_account.key
-        tx_sender_address = Account.from_key(tx_sender_private_key).address
+        if self.estimation_ticket_signer.is_valid(estimation_ticket, safe_address, to, value, data, operation,
+                                                  gas_token, safe_state.block_number, safe_tx_gas, base_gas):
+            logger.debug('Using estimation ticket for safe=%s', safe_address)
+        else:
+            safe_tx_gas_estimation = safe.estimate_tx_gas(to, value, data, operation)
+            safe_base_gas_estimation = safe.estimate_tx_base_gas(to, value, data, operation, gas_token,
+                                                                 safe_tx_gas_estimation)
+            if safe_tx_gas < safe_tx_gas_estimation or base_gas < safe_base_gas_estimation:
+                raise InvalidGasEstimation("Gas should be at least equal to safe-tx-gas=%d and base-gas=%d. "
+                                           "Current is safe-tx-gas=%d and base-gas=%d" %
+                                           (safe_tx_gas_estimation, safe_base_gas_estimation, safe_tx_gas,
+                                            base_gas))
 
         safe_tx = safe.build_multisig_tx(
             to,
@@ -428,7 +1020,7 @@ class TransactionService:
             refund_receiver,
             signatures,
             safe_nonce=safe_nonce,
-            safe_version=safe.retrieve_version()
+            safe_version=safe_metadata.version
         )
 
         if safe_tx.signers != safe_tx.sorted_signers:
@@ -437,11 +1029,14 @@ class TransactionService:
 
         safe_tx.call(tx_sender_address=tx_sender_address, block_identifier=block_identifier)
 
-        with EthereumNonceLock(self.redis, self.ethereum_client, self.tx_sender_account.address,
-                               timeout=60 * 2) as tx_nonce:
-            tx_hash, tx = safe_tx.execute(tx_sender_private_key, tx_gas=tx_gas, tx_gas_price=tx_gas_price,
-                                          tx_nonce=tx_nonce, block_identifier=block_identifier)
-            return tx_hash, safe_tx.safe_tx_hash, tx
+        if to == safe_address and self.safe_metadata_cache.is_master_copy_change(data):
+            self.safe_metadata_cache.invalidate(safe_address)
+        # Owners can be changed by a delegate call (e.g. using MultiSend)
+        if (operation == SafeOperation.DELEGATE_CALL.value
+                or (to == safe_address and self.safe_signature_validator.is_owner_management_tx(data))):
+            self.safe_signature_validator.invalidate_owners(safe_address)
+
+        return safe_tx
 
     def get_pending_multisig_transactions(self, older_than: int) -> List[SafeMultisigTx]:
         """
@@ -456,6 +1051,172 @@ class TransactionService:
             'ethereum_tx'
         )
 
+    def get_bumped_gas_price(self, gas_price: int, bump_percentage: float = 12.5) -> Optional[int]:
+        """
+        :param gas_price: Gas price of the tx to replace
+        :param bump_percentage: Percentage to increase the gas price
+        :return: Gas price increased by `bump_percentage`, capped at the gas station `fastest` gas price. `None` if
+        capped gas price is not high enough for the node to accept the replacement
+        """
+        assert bump_percentage >= 10, 'Nodes require gas price to be increased at least 10% to replace a tx'
+        fastest_gas_price = self.gas_station.get_gas_prices().fastest
+        bumped_gas_price = min(math.ceil(gas_price * (100 + bump_percentage) / 100), fastest_gas_price)
+        if bumped_gas_price < math.ceil(gas_price * 1.1):
+            return None
+        return bumped_gas_price
+
+    def replace_multisig_tx(self, safe_multisig_tx: SafeMultisigTx, gas_price: int) -> EthereumTx:
+        """
+        Send again a tx not mined, using the same sender, nonce and gas limit and a higher gas price. Replaced tx
+        is linked to the new one, and the multisig tx is updated to point to the new one
+        :param safe_multisig_tx: Multisig tx already sent
+        :param gas_price: Gas price for the new tx
+        :return: EthereumTx for the new tx
+        :raises: TransactionServiceException: If sender is not on the sender account pool anymore
+        :raises: ValueError: If node rejects the tx
+        """
+        ethereum_tx = safe_multisig_tx.ethereum_tx
+        tx_sender_account = self.sender_account_pool.get(ethereum_tx._from)
+        if not tx_sender_account:
+            raise TransactionServiceException(f'Sender={ethereum_tx._from} of tx with tx-hash={ethereum_tx.tx_hash} '
+                                              f'is not on the sender account pool')
+        safe_tx = safe_multisig_tx.get_safe_tx(self.ethereum_client)
+        tx_hash, tx = safe_tx.execute(tx_sender_account.key, tx_gas=ethereum_tx.gas, tx_gas_price=gas_price,
+                                      tx_nonce=ethereum_tx.nonce)
+        with transaction.atomic():
+            replacement_ethereum_tx = EthereumTx.objects.create_from_tx(tx, tx_hash)
+            ethereum_tx.replaced_by = replacement_ethereum_tx
+            ethereum_tx.save(update_fields=['replaced_by'])
+            safe_multisig_tx.ethereum_tx = replacement_ethereum_tx
+            safe_multisig_tx.save(update_fields=['ethereum_tx'])
+        return replacement_ethereum_tx
+
+    def _find_mined_replaced_tx(self, safe_multisig_tx: SafeMultisigTx) -> Optional[EthereumTx]:
+        """
+        Nonce of the tx was used, so the tx or one of the txs it replaced was mined. Multisig tx is linked to
+        the mined one
+        :return: Mined EthereumTx, `None` if none of them was mined
+        """
+        ethereum_tx = safe_multisig_tx.ethereum_tx
+        for candidate_ethereum_tx in [ethereum_tx] + ethereum_tx.get_replaced_txs():
+            mined_ethereum_tx = self.create_or_update_ethereum_tx(candidate_ethereum_tx.tx_hash)
+            if mined_ethereum_tx.block_id is not None:
+                if mined_ethereum_tx != ethereum_tx:
+                    safe_multisig_tx.ethereum_tx = mined_ethereum_tx
+                    safe_multisig_tx.save(update_fields=['ethereum_tx'])
+                return mined_ethereum_tx
+        return None
+
+    def bump_stuck_multisig_txs(self, older_than: int, bump_percentage: float = 12.5) -> List[EthereumTx]:
+        """
+        Replace txs not mined `older_than` seconds after being sent, using the same nonce and a higher gas price
+        (see `get_bumped_gas_price`), so they don't block the next nonces of the sender. If a replaced tx was
+        mined instead of the last one, the multisig tx is linked to the mined one
+        :param older_than: Time in seconds since the last tx was sent for a tx to be considered stuck
+        :param bump_percentage: Percentage to increase the gas price every time the tx is replaced
+        :return: Replacement txs sent
+        """
+        replacement_ethereum_txs = []
+        sender_nonces: Dict[str, int] = {}  # Nonce of the sender on the last block
+        stuck_multisig_txs = SafeMultisigTx.objects.filter(
+            ethereum_tx__block=None,
+            ethereum_tx__created__lte=timezone.now() - timedelta(seconds=older_than),
+        ).select_related('ethereum_tx').order_by('ethereum_tx__nonce')
+        for safe_multisig_tx in stuck_multisig_txs:
+            ethereum_tx = safe_multisig_tx.ethereum_tx
+            tx_sender_address = ethereum_tx._from
+            if tx_sender_address not in sender_nonces:
+                sender_nonces[tx_sender_address] = self.ethereum_client.get_nonce_for_account(
+                    tx_sender_address, block_identifier='latest'
+                )
+
+            if ethereum_tx.nonce < sender_nonces[tx_sender_address]:
+                if not self._find_mined_replaced_tx(safe_multisig_tx):
+                    logger.error('Nonce=%d of tx with tx-hash=%s was used by a tx not sent by the relay',
+                                 ethereum_tx.nonce, ethereum_tx.tx_hash)
+                continue
+
+            bumped_gas_price = self.get_bumped_gas_price(ethereum_tx.gas_price, bump_percentage=bump_percentage)
+            if bumped_gas_price is None:
+                logger.warning('Tx with tx-hash=%s is stuck, but gas-price=%d cannot be increased anymore',
+                               ethereum_tx.tx_hash, ethereum_tx.gas_price)
+                continue
+
+            try:
+                replacement_ethereum_tx = self.replace_multisig_tx(safe_multisig_tx, bumped_gas_price)
+                logger.info('Tx with tx-hash=%s was replaced by tx-hash=%s with gas-price=%d', ethereum_tx.tx_hash,
+                            replacement_ethereum_tx.tx_hash, bumped_gas_price)
+                replacement_ethereum_txs.append(replacement_ethereum_tx)
+            except (TransactionServiceException, ValueError) as exc:  # Node errors are `ValueError`
+                logger.warning('Cannot replace tx with tx-hash=%s: %s', ethereum_tx.tx_hash, exc)
+        return replacement_ethereum_txs
+
+    def update_pending_ethereum_txs(self, ethereum_txs: Sequence[EthereumTx]) -> List[EthereumTx]:
+        """
+        Check if txs were mined and update them. Receipts are requested in the same JSON-RPC batch, blocks not in
+        database in a second one, and database is updated using `bulk_create` and `bulk_update`
+        :param ethereum_txs: Txs not mined
+        :return: Txs mined
+        """
+        if not ethereum_txs:
+            return []
+
+        rpc_requests = [{'jsonrpc': '2.0', 'method': 'eth_getTransactionReceipt',
+                         'params': [HexBytes(ethereum_tx.tx_hash).hex()], 'id': i}
+                        for i, ethereum_tx in enumerate(ethereum_txs)]
+        rpc_responses = {rpc_response['id']: rpc_response
+                         for rpc_response in self.json_rpc_client.request(rpc_requests)}
+
+        tx_receipts: Dict[int, Dict[str, Any]] = {}  # Index of the tx -> receipt
+        for i in range(len(ethereum_txs)):
+            tx_receipt = rpc_responses.get(i, {}).get('result')
+            if tx_receipt and tx_receipt.get('blockNumber'):  # Pending txs can return receipts without block
+                tx_receipts[i] = tx_receipt
+                # Safes could be upgraded or their owners changed
+                self.safe_metadata_cache.invalidate_from_logs(tx_receipt.get('logs', []))
+                self.safe_signature_validator.invalidate_owners_from_logs(tx_receipt.get('logs', []))
+        if not tx_receipts:
+            return []
+
+        block_numbers = {int(tx_receipt['blockNumber'], 16) for tx_receipt in tx_receipts.values()}
+        missing_block_numbers = sorted(block_numbers - set(EthereumBlock.objects.filter(
+            number__in=block_numbers
+        ).values_list('number', flat=True)))
+        if missing_block_numbers:
+            rpc_requests = [{'jsonrpc': '2.0', 'method': 'eth_getBlockByNumber',
+                             'params': [hex(block_number), False], 'id': block_number}
+                            for block_number in missing_block_numbers]
+            ethereum_blocks = []
+            for rpc_response in self.json_rpc_client.request(rpc_requests):
+                block = rpc_response.get('result')
+                if block:
+                    ethereum_blocks.append(EthereumBlock.objects.build_from_block({
+                        'number': int(block['number'], 16),
+                        'gasLimit': int(block['gasLimit'], 16),
+                        'gasUsed': int(block['gasUsed'], 16),
+                        'timestamp': int(block['timestamp'], 16),
+                        'hash': block['hash'],
+                    }))
+            # Blocks could be inserted by other process at the same time
+            EthereumBlock.objects.bulk_create(ethereum_blocks, ignore_conflicts=True)
+            block_numbers = set(EthereumBlock.objects.filter(
+                number__in=block_numbers
+            ).values_list('number', flat=True))
+
+        mined_ethereum_txs = []
+        for i, tx_receipt in tx_receipts.items():
+            block_number = int(tx_receipt['blockNumber'], 16)
+            if block_number not in block_numbers:  # Block could not be retrieved, it will be updated next time
+                continue
+            ethereum_tx = ethereum_txs[i]
+            ethereum_tx.block_id = block_number
+            ethereum_tx.gas_used = int(tx_receipt['gasUsed'], 16)
+            ethereum_tx.status = int(tx_receipt['status'], 16) if tx_receipt.get('status') else None
+            ethereum_tx.transaction_index = int(tx_receipt['transactionIndex'], 16)
+            mined_ethereum_txs.append(ethereum_tx)
+        EthereumTx.objects.bulk_update(mined_ethereum_txs, ['block', 'gas_used', 'status', 'transaction_index'])
+        return mined_ethereum_txs
+
     # TODO Refactor and test
     def create_or_update_ethereum_tx(self, tx_hash: str) -> EthereumTx:
         try:
@@ -13,13 +13,15 @@ from gnosis.eth import EthereumClientProvider, TransactionAlreadyImported
 from gnosis.eth.constants import NULL_ADDRESS
 
 from safe_relay_service.relay.models import (SafeContract, SafeCreation,
-                                             SafeCreation2, SafeFunding)
+                                             SafeCreation2, SafeFunding,
+                                             SafeMultisigTx)
 
 from .repositories.redis_repository import RedisRepository
 from .services import (Erc20EventsServiceProvider, FundingServiceProvider,
                        NotificationServiceProvider,
                        SafeCreationServiceProvider, TransactionServiceProvider)
 from .services.safe_creation_service import NotEnoughFundingForCreation
+from .services.safe_response_cache import SafeResponseCacheProvider
 
 logger = get_task_logger(__name__)
 
@@ -322,11 +324,12 @@ def send_create_notification(safe_address: str, owners: List[str]) -> None:
 @app.shared_task(soft_time_limit=300)
 def check_balance_of_accounts_task() -> bool:
     """
-    Checks if balance of relayer accounts (tx sender, safe funder) are less than the configured threshold
+    Checks if balance of relayer accounts (tx senders, safe funder) are less than the configured threshold
     :return: True if every account have enough ether, False otherwise
     """
     balance_warning_wei = settings.SAFE_ACCOUNTS_BALANCE_WARNING
-    addresses = FundingServiceProvider().funder_account.address, TransactionServiceProvider().tx_sender_account.address
+    funder_address = FundingServiceProvider().funder_account.address
+    addresses = [funder_address] + TransactionServiceProvider().sender_account_pool.addresses
 
     ethereum_client = EthereumClientProvider()
     result = True
@@ -339,6 +342,71 @@ def check_balance_of_accounts_task() -> bool:
     return result
 
 
+@app.shared_task(soft_time_limit=LOCK_TIMEOUT)
+def send_queued_multisig_txs_task(safe_address: str) -> int:
+    """
+    Send txs queued for a Safe. Routed to a dedicated queue (`CELERY_ROUTES`), so relaying is not delayed by
+    other tasks
+    :param safe_address:
+    :return: Number of txs sent
+    """
+    try:
+        redis = RedisRepository().redis
+        # Txs for the same Safe must be sent in order
+        with redis.lock(f'tasks:send_queued_multisig_txs_task:{safe_address}', blocking_timeout=LOCK_TIMEOUT,
+                        timeout=LOCK_TIMEOUT):
+            number_sent = TransactionServiceProvider().send_queued_multisig_txs(safe_address)
+            logger.info('Sent %d queued txs for safe=%s', number_sent, safe_address)
+            return number_sent
+    except LockError:
+        logger.warning('Cannot get lock for sending queued txs for safe=%s', safe_address)
+        return 0
+
+
+@app.shared_task(soft_time_limit=60)
+def check_queued_multisig_txs_task() -> int:
+    """
+    Send txs queued for more than one minute, in case the task sending them was lost (e.g. worker was killed)
+    :return: Number of Safes with queued txs
+    """
+    safe_addresses = SafeMultisigTx.objects.queued().filter(
+        created__lte=timezone.now() - timedelta(minutes=1)
+    ).values_list('safe_id', flat=True).distinct()
+    for safe_address in safe_addresses:
+        logger.warning('Found queued txs not sent for safe=%s', safe_address)
+        send_queued_multisig_txs_task.delay(safe_address)
+    return len(safe_addresses)
+
+
+@app.shared_task(soft_time_limit=60)
+def check_nonce_gaps_task() -> int:
+    """
+    Sync nonce allocators of relayer accounts (tx senders, safe funder) with the node, so nonces used outside of
+    the allocator are not reserved again and stale reservations are recovered
+    :return: Number of nonce gaps found (nonces released but not used yet, txs with higher nonces are stuck)
+    """
+    number_gaps = 0
+    try:
+        redis_repository = RedisRepository()
+        with redis_repository.redis.lock('tasks:check_nonce_gaps_task', blocking_timeout=1, timeout=60):
+            ethereum_client = EthereumClientProvider()
+            addresses = {FundingServiceProvider().funder_account.address,
+                         *TransactionServiceProvider().sender_account_pool.addresses}
+            for address in addresses:
+                sync_result = redis_repository.nonce_allocator(ethereum_client, address).sync()
+                if sync_result.recovered_nonces:
+                    logger.warning('Recovered stale nonce reservations=%s for account=%s',
+                                   sync_result.recovered_nonces, address)
+                if sync_result.released_nonces and sync_result.next_nonce > sync_result.pending_nonce:
+                    logger.warning('Found nonce gaps=%s for account=%s with pending-nonce=%d and next-nonce=%d',
+                                   sync_result.released_nonces, address, sync_result.pending_nonce,
+                                   sync_result.next_nonce)
+                    number_gaps += len(sync_result.released_nonces)
+    except LockError:
+        pass
+    return number_gaps
+
+
 @app.shared_task(soft_time_limit=60 * 30)
 def find_erc_20_721_transfers_task() -> int:
     """
@@ -388,17 +456,50 @@ def check_and_update_pending_transactions() -> int:
         redis = RedisRepository().redis
         with redis.lock('tasks:check_and_update_pending_transactions', blocking_timeout=1, timeout=60):
             transaction_service = TransactionServiceProvider()
-            txs = transaction_service.get_pending_multisig_transactions(older_than=15)
-            for tx in txs:
-                ethereum_tx = transaction_service.create_or_update_ethereum_tx(tx.ethereum_tx_id)
-                if ethereum_tx and ethereum_tx.block_id:
-                    if ethereum_tx.success:
-                        logger.info('Tx with tx-hash=%s was mined on block=%d ', ethereum_tx.tx_hash,
-                                    ethereum_tx.block_id)
-                    else:
-                        logger.error('Tx with tx-hash=%s was mined on block=%d and failed', ethereum_tx.tx_hash,
-                                     ethereum_tx.block_id)
-                    number_txs += 1
+            txs = transaction_service.get_pending_multisig_transactions(older_than=15).exclude(ethereum_tx=None)
+            for ethereum_tx in transaction_service.update_pending_ethereum_txs([tx.ethereum_tx for tx in txs]):
+                if ethereum_tx.success:
+                    logger.info('Tx with tx-hash=%s was mined on block=%d ', ethereum_tx.tx_hash,
+                                ethereum_tx.block_id)
+                else:
+                    logger.error('Tx with tx-hash=%s was mined on block=%d and failed', ethereum_tx.tx_hash,
+                                 ethereum_tx.block_id)
+                number_txs += 1
     except LockError:
         pass
     return number_txs
+
+
+@app.shared_task(soft_time_limit=LOCK_TIMEOUT)
+def bump_stuck_transactions_task() -> int:
+    """
+    Replace txs not mined after a while using a higher gas price
+    :return: Number of txs replaced
+    """
+    try:
+        redis = RedisRepository().redis
+        with redis.lock('tasks:bump_stuck_transactions_task', blocking_timeout=1, timeout=LOCK_TIMEOUT):
+            replacement_txs = TransactionServiceProvider().bump_stuck_multisig_txs(
+                settings.SAFE_TX_GAS_BUMP_STUCK_SECONDS,
+                bump_percentage=settings.SAFE_TX_GAS_BUMP_PERCENTAGE
+            )
+            if replacement_txs:
+                logger.info('%d stuck txs were replaced', len(replacement_txs))
+            return len(replacement_txs)
+    except LockError:
+        return 0
+
+
+@app.shared_task(soft_time_limit=60)
+def update_safe_response_cache_task() -> int:
+    """
+    Watch for new blocks, so Safe responses cached for previous blocks are not used anymore, and cache
+    responses for the Safes requested recently
+    :return: Number of responses cached
+    """
+    try:
+        redis = RedisRepository().redis
+        with redis.lock('tasks:update_safe_response_cache_task', blocking_timeout=1, timeout=60):
+            return SafeResponseCacheProvider().update_latest_block_number()
+    except LockError:
+        return 0
@@ -0,0 +1,40 @@
+from unittest import mock
+
+from django.test import TestCase
+
+from eth_account import Account
+
+from gnosis.eth.constants import NULL_ADDRESS
+
+from ..services.estimation_ticket import (EstimationTicket,
+                                          EstimationTicketSigner,
+                                          InvalidEstimationTicket)
+
+
+class TestEstimationTicket(TestCase):
+    def test_estimation_ticket_signer(self):
+        estimation_ticket_signer = EstimationTicketSigner(max_age=120, max_blocks=10)
+        safe_address, to = Account.create().address, Account.create().address
+        estimation_ticket = EstimationTicket.build(safe_address, to, 5, b'\x12', 0, None, 100, 50000, 30000)
+        self.assertEqual(estimation_ticket.gas_token, NULL_ADDRESS)
+        ticket = estimation_ticket_signer.sign(estimation_ticket)
+        self.assertEqual(estimation_ticket_signer.load(ticket), estimation_ticket)
+
+        with self.assertRaises(InvalidEstimationTicket):
+            estimation_ticket_signer.load(ticket + 'a')
+
+        def is_valid(ticket=ticket, to=to, value=5, block_number=105, safe_tx_gas=50000, base_gas=30000):
+            return estimation_ticket_signer.is_valid(ticket, safe_address, to, value, b'\x12', 0, NULL_ADDRESS,
+                                                     block_number, safe_tx_gas, base_gas)
+
+        self.assertTrue(is_valid())
+        self.assertTrue(is_valid(safe_tx_gas=60000, base_gas=40000))
+        self.assertFalse(is_valid(ticket=None))
+        self.assertFalse(is_valid(to=Account.create().address))
+        self.assertFalse(is_valid(value=6))
+        self.assertFalse(is_valid(block_number=111))
+        self.assertFalse(is_valid(safe_tx_gas=49999))
+        self.assertFalse(is_valid(base_gas=29999))
+
+        with mock.patch('time.time', return_value=10**11):  # Expired
+            self.assertFalse(is_valid())
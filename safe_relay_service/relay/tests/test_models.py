@@ -111,3 +111,11 @@ class TestSafeMultisigTxModel(TestCase):
         safe_multisig_tx_2.ethereum_tx.block.timestamp = safe_multisig_tx_2.created + interval_2
         safe_multisig_tx_2.ethereum_tx.block.save()
         self.assertEqual(SafeMultisigTx.objects.get_average_execution_time(from_date, to_date), (interval + interval_2) / 2)
+
+    def test_pending_and_queued(self):
+        mined_multisig_tx = SafeMultisigTxFactory()
+        pending_multisig_tx = SafeMultisigTxFactory(ethereum_tx__block=None)
+        queued_multisig_tx = SafeMultisigTxFactory(ethereum_tx=None)
+        self.assertEqual(list(SafeMultisigTx.objects.pending()), [pending_multisig_tx])
+        self.assertEqual(list(SafeMultisigTx.objects.queued()), [queued_multisig_tx])
+        self.assertNotIn(mined_multisig_tx, SafeMultisigTx.objects.pending())
@@ -0,0 +1,114 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from django.test import TestCase
+
+from eth_account import Account
+from requests import RequestException
+
+from ..repositories.redis_repository import (EthereumNonceAllocator,
+                                             RedisRepository)
+from .relay_test_case import RelayTestCaseMixin
+
+
+class TestRedisRepository(RelayTestCaseMixin, TestCase):
+    def test_ethereum_nonce_allocator(self):
+        address = Account.create().address
+        nonce_allocator = RedisRepository().nonce_allocator(self.ethereum_client, address)
+        self.assertIsInstance(nonce_allocator, EthereumNonceAllocator)
+
+        # Nonces reserved concurrently are never repeated
+        with ThreadPoolExecutor(max_workers=10) as executor:
+            nonces = list(executor.map(lambda _: nonce_allocator.reserve_nonce(), range(20)))
+        self.assertEqual(sorted(nonces), list(range(20)))
+
+        # Released nonces are reserved again, lowest first
+        self.assertTrue(nonce_allocator.release_nonce(5))
+        self.assertTrue(nonce_allocator.release_nonce(3))
+        self.assertFalse(nonce_allocator.release_nonce(3))  # Already released
+        self.assertEqual(nonce_allocator.reserve_nonce(), 3)
+        self.assertEqual(nonce_allocator.reserve_nonce(), 5)
+        self.assertEqual(nonce_allocator.reserve_nonce(), 20)
+
+        # Releasing the last nonces rolls back the counter
+        self.assertTrue(nonce_allocator.release_nonce(19))
+        self.assertTrue(nonce_allocator.release_nonce(20))
+        self.assertEqual(nonce_allocator.reserve_nonce(), 19)
+
+        # Nonce is confirmed if no exception is raised, released otherwise
+        with nonce_allocator.reserve() as nonce:
+            self.assertEqual(nonce, 20)
+        self.assertFalse(nonce_allocator.release_nonce(20))
+        with self.assertRaises(ValueError):
+            with nonce_allocator.reserve() as nonce:
+                self.assertEqual(nonce, 21)
+                raise ValueError
+        self.assertEqual(nonce_allocator.reserve_nonce(), 21)
+        nonce_allocator.release_nonce(21)
+
+        # Tx could have reached the node, nonce is kept reserved
+        with self.assertRaises(RequestException):
+            with nonce_allocator.reserve() as nonce:
+                self.assertEqual(nonce, 21)
+                raise RequestException
+        self.assertEqual(nonce_allocator.reserve_nonce(), 22)
+        nonce_allocator.release_nonce(22)
+
+        # Nothing was sent, so node pending nonce is 0. Stale reservations are recovered
+        nonce_allocator.release_nonce(10)
+        sync_result = nonce_allocator.sync()
+        self.assertEqual(sync_result.pending_nonce, 0)
+        self.assertEqual(sync_result.next_nonce, 22)
+        self.assertEqual(sync_result.released_nonces, [10])
+        self.assertEqual(sync_result.recovered_nonces, [])
+
+        nonce_allocator.reservation_timeout = -10
+        sync_result = nonce_allocator.sync()
+        self.assertEqual(len(sync_result.recovered_nonces), 20)  # 0-19 except 10, and 21
+        self.assertEqual(sync_result.released_nonces, list(range(20)) + [21])  # 20 was confirmed
+
+    def test_ethereum_nonce_allocator_legacy_nonce(self):
+        # Old nonce lock stored the last nonce used on `ethereum:nonce:{address}`
+        redis = RedisRepository().redis
+        address = Account.create().address
+        redis.set(f'ethereum:nonce:{address}', 7)
+        nonce_allocator = RedisRepository().nonce_allocator(self.ethereum_client, address)
+        self.assertEqual(nonce_allocator.reserve_nonce(), 8)
+        self.assertEqual(nonce_allocator.reserve_nonces(2), [9, 10])
+
+        address = Account.create().address
+        redis.set(f'ethereum:nonce:{address}', 3)
+        nonce_allocator = RedisRepository().nonce_allocator(self.ethereum_client, address)
+        self.assertEqual(nonce_allocator.sync().next_nonce, 4)
+        self.assertEqual(nonce_allocator.reserve_nonce(), 4)
+
+    def test_ethereum_nonce_allocator_reserve_nonces(self):
+        nonce_allocator = RedisRepository().nonce_allocator(self.ethereum_client, Account.create().address)
+        self.assertEqual(nonce_allocator.reserve_nonces(3), [0, 1, 2])
+        self.assertEqual(nonce_allocator.reserve_nonce(), 3)
+
+        # Released nonces are reserved first
+        nonce_allocator.release_nonce(1)
+        self.assertEqual(nonce_allocator.reserve_nonces(3), [1, 4, 5])
+
+        # Releasing every nonce rolls back the counter
+        for nonce in (1, 4, 5):
+            self.assertTrue(nonce_allocator.release_nonce(nonce))
+        self.assertEqual(nonce_allocator.reserve_nonces(2), [1, 4])
+        self.assertEqual(nonce_allocator.reserve_nonce(), 5)
+
+    def test_ethereum_nonce_allocator_sync(self):
+        account = self.create_account(initial_ether=0.01)
+        nonce_allocator = RedisRepository().nonce_allocator(self.ethereum_client, account.address)
+        self.assertEqual(nonce_allocator.reserve_nonce(), 0)
+        nonce_allocator.release_nonce(0)
+        self.assertEqual(nonce_allocator.reserve_nonce(), 0)
+
+        # Tx sent without using the allocator
+        self.ethereum_client.send_eth_to(account.key, Account.create().address, self.w3.eth.gasPrice, 1,
+                                         nonce=0)
+        nonce_allocator.release_nonce(0)
+        sync_result = nonce_allocator.sync()
+        self.assertEqual(sync_result.pending_nonce, 1)
+        self.assertEqual(sync_result.next_nonce, 1)
+        self.assertEqual(sync_result.released_nonces, [])
+        self.assertEqual(nonce_allocator.reserve_nonce(), 1)
@@ -95,6 +95,7 @@ class TestResendTxsCommand(RelayTestCaseMixin, TestCase):
         multisig_tx: SafeMultisigTx = SafeMultisigTx.objects.all().first()
         self.assertNotEqual(multisig_tx.ethereum_tx_id, old_multisig_tx.ethereum_tx_id)
         self.assertEqual(multisig_tx.ethereum_tx.gas_price, new_gas_price)
+        self.assertEqual(multisig_tx.ethereum_tx.get_replaced_txs(), [old_multisig_tx.ethereum_tx])
         self.assertEqual(w3.eth.getBalance(to),  value)  # Tx is executed again
         self.assertEqual(multisig_tx.get_safe_tx().__dict__,
                          old_multisig_tx.get_safe_tx().__dict__)
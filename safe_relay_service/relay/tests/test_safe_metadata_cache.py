@@ -0,0 +1,40 @@
+from django.test import TestCase
+
+from eth_account import Account
+from hexbytes import HexBytes
+
+from ..repositories.redis_repository import RedisRepository
+from ..services.safe_metadata_cache import (CHANGE_MASTER_COPY_SELECTOR,
+                                            CHANGED_MASTER_COPY_TOPIC,
+                                            SafeMetadata, SafeMetadataCache)
+
+
+class TestSafeMetadataCache(TestCase):
+    def test_safe_metadata_cache(self):
+        redis = RedisRepository().redis
+        safe_metadata_cache = SafeMetadataCache(redis, max_age_blocks=100)
+        safe_address = Account.create().address
+        self.assertIsNone(safe_metadata_cache.get(safe_address))
+
+        safe_metadata = SafeMetadata(safe_address, Account.create().address, '1.1.1', 50)
+        safe_metadata_cache.set(safe_metadata)
+        self.assertEqual(safe_metadata_cache.get(safe_address), safe_metadata)
+        self.assertEqual(safe_metadata_cache.get(safe_address, current_block_number=150), safe_metadata)
+
+        # Other process, metadata is retrieved from redis
+        other_safe_metadata_cache = SafeMetadataCache(redis, max_age_blocks=100)
+        self.assertEqual(other_safe_metadata_cache.get(safe_address), safe_metadata)
+
+        # Too old
+        self.assertIsNone(safe_metadata_cache.get(safe_address, current_block_number=151))
+        self.assertIsNone(SafeMetadataCache(redis).get(safe_address))  # Removed from redis
+
+        safe_metadata_cache.set(safe_metadata)
+        logs = [{'address': Account.create().address, 'topics': [HexBytes('0x' + '1' * 64)]},
+                {'address': safe_address, 'topics': [CHANGED_MASTER_COPY_TOPIC]}]
+        self.assertEqual(safe_metadata_cache.invalidate_from_logs(logs), 1)
+        self.assertIsNone(safe_metadata_cache.get(safe_address))
+
+        self.assertTrue(SafeMetadataCache.is_master_copy_change(CHANGE_MASTER_COPY_SELECTOR + b'\0' * 32))
+        self.assertFalse(SafeMetadataCache.is_master_copy_change(b''))
+        self.assertFalse(SafeMetadataCache.is_master_copy_change(HexBytes('0xa9059cbb')))
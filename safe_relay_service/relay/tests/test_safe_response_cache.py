@@ -0,0 +1,69 @@
+from unittest import mock
+
+from django.test import TestCase
+
+from eth_account import Account
+
+from ..services.safe_creation_service import SafeNotDeployed
+from ..services.safe_response_cache import (LATEST_BLOCK_NUMBER_KEY,
+                                            SAFE_BALANCES_ENDPOINT,
+                                            SAFE_INFO_ENDPOINT,
+                                            SafeResponseCacheProvider)
+from ..services.safe_state_reader import SafeStateReader
+from .relay_test_case import RelayTestCaseMixin
+
+
+class TestSafeResponseCache(RelayTestCaseMixin, TestCase):
+    def setUp(self):
+        self.safe_response_cache = SafeResponseCacheProvider()
+        self._clean_redis()
+
+    def tearDown(self):
+        self._clean_redis()
+
+    def _clean_redis(self):
+        self.safe_response_cache.redis.delete(LATEST_BLOCK_NUMBER_KEY,
+                                              self.safe_response_cache._get_requested_key(SAFE_INFO_ENDPOINT),
+                                              self.safe_response_cache._get_requested_key(SAFE_BALANCES_ENDPOINT))
+
+    def test_get_safe_info(self):
+        safe_address = self.deploy_test_safe(threshold=1).safe_address
+        with self.assertRaises(SafeNotDeployed):
+            self.safe_response_cache.get_safe_info(Account.create().address)
+
+        # Watcher is not running, nothing is cached
+        cached_response = self.safe_response_cache.get_safe_info(safe_address)
+        self.assertEqual(cached_response.data['threshold'], 1)
+        self.assertEqual(cached_response.data['address'], safe_address)
+        block_number = self.ethereum_client.current_block_number
+        self.assertIsNone(self.safe_response_cache.get(SAFE_INFO_ENDPOINT, safe_address, block_number))
+
+        self.assertEqual(self.safe_response_cache.update_latest_block_number(), 0)  # Nothing requested
+        self.assertEqual(self.safe_response_cache.get_latest_block_number(), block_number)
+        self.assertEqual(self.safe_response_cache.get_safe_info(safe_address), cached_response)
+        self.assertEqual(self.safe_response_cache.get(SAFE_INFO_ENDPOINT, safe_address, block_number),
+                         cached_response)
+        with mock.patch.object(SafeStateReader, 'get_safe_infos', side_effect=AssertionError):  # Node not used
+            self.assertEqual(self.safe_response_cache.get_safe_info(safe_address), cached_response)
+
+        # Same block, nothing is recalculated
+        self.assertEqual(self.safe_response_cache.update_latest_block_number(), 0)
+
+        self.send_ether(safe_address, 1)  # Mine a new block
+        self.assertEqual(self.safe_response_cache.update_latest_block_number(), 1)
+        self.assertEqual(self.safe_response_cache.get(SAFE_INFO_ENDPOINT, safe_address, block_number + 1),
+                         cached_response)  # Safe info didn't change
+
+    def test_get_balances(self):
+        safe_address = self.deploy_test_safe().safe_address
+        self.send_ether(safe_address, 5)
+        self.safe_response_cache.update_latest_block_number()
+        cached_response = self.safe_response_cache.get_balances(safe_address)
+        self.assertEqual(cached_response.data, [{'token_address': None, 'balance': 5}])
+
+        self.send_ether(safe_address, 2)
+        self.assertEqual(self.safe_response_cache.get_balances(safe_address), cached_response)  # Same block
+        self.assertEqual(self.safe_response_cache.update_latest_block_number(), 1)
+        new_cached_response = self.safe_response_cache.get_balances(safe_address)
+        self.assertEqual(new_cached_response.data, [{'token_address': None, 'balance': 7}])
+        self.assertNotEqual(new_cached_response.etag, cached_response.etag)
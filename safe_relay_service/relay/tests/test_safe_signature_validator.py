@@ -0,0 +1,64 @@
+from django.test import TestCase
+
+from eth_account import Account
+from hexbytes import HexBytes
+from web3 import Web3
+
+from gnosis.safe.signatures import signatures_to_bytes
+
+from ..repositories.redis_repository import RedisRepository
+from ..services.safe_signature_validator import (OWNERS_CHANGED_TOPICS,
+                                                 InvalidSignature, SafeOwners,
+                                                 SafeSignatureValidator)
+
+
+class TestSafeSignatureValidator(TestCase):
+    def setUp(self):
+        self.safe_signature_validator = SafeSignatureValidator(RedisRepository().redis, max_size=2)
+
+    def test_recover_signers(self):
+        safe_tx_hash = Web3.keccak(text='safe-tx')
+        eip712_account, eth_sign_account, contract_account = [Account.create() for _ in range(3)]
+
+        eip712_signature = eip712_account.signHash(safe_tx_hash)
+        eth_sign_signature = eth_sign_account.signHash(Web3.keccak(b'\x19Ethereum Signed Message:\n32' +
+                                                                   safe_tx_hash))
+        signatures = signatures_to_bytes([
+            (eip712_signature['v'], eip712_signature['r'], eip712_signature['s']),
+            (eth_sign_signature['v'] + 4, eth_sign_signature['r'], eth_sign_signature['s']),
+            (0, int(contract_account.address, 16), 0),
+        ])
+        expected_signers = (eip712_account.address, eth_sign_account.address, contract_account.address)
+        self.assertEqual(self.safe_signature_validator.recover_signers(safe_tx_hash, signatures), expected_signers)
+        self.assertEqual(len(self.safe_signature_validator.signers_cache), 1)
+        # Cached
+        self.assertEqual(self.safe_signature_validator.recover_signers(safe_tx_hash, signatures), expected_signers)
+        self.assertEqual(len(self.safe_signature_validator.signers_cache), 1)
+
+        self.assertEqual(self.safe_signature_validator.recover_signers(safe_tx_hash, b''), ())
+
+        with self.assertRaises(InvalidSignature):
+            self.safe_signature_validator.recover_signers(safe_tx_hash, signatures_to_bytes([(5, 1, 1)]))
+
+    def test_owners(self):
+        safe_address = Account.create().address
+        self.assertIsNone(self.safe_signature_validator.get_owners(safe_address))
+
+        safe_owners = SafeOwners(safe_address, [Account.create().address for _ in range(2)], 2, 10)
+        self.safe_signature_validator.set_owners(safe_owners)
+        self.assertEqual(self.safe_signature_validator.get_owners(safe_address), safe_owners)
+
+        self.safe_signature_validator.invalidate_owners(safe_address)
+        self.assertIsNone(self.safe_signature_validator.get_owners(safe_address))
+
+        self.safe_signature_validator.set_owners(safe_owners)
+        logs = [{'address': Account.create().address, 'topics': [HexBytes('0x' + '1' * 64)]},
+                {'address': safe_address.lower(), 'topics': [next(iter(OWNERS_CHANGED_TOPICS))]}]
+        self.assertEqual(self.safe_signature_validator.invalidate_owners_from_logs(logs), 1)
+        self.assertIsNone(self.safe_signature_validator.get_owners(safe_address))
+
+    def test_is_owner_management_tx(self):
+        change_threshold_data = Web3.keccak(text='changeThreshold(uint256)')[:4] + b'\0' * 31 + b'\x02'
+        self.assertTrue(SafeSignatureValidator.is_owner_management_tx(change_threshold_data))
+        self.assertFalse(SafeSignatureValidator.is_owner_management_tx(None))
+        self.assertFalse(SafeSignatureValidator.is_owner_management_tx(HexBytes('0xa9059cbb')))
@@ -0,0 +1,103 @@
+from unittest import mock
+
+from django.test import TestCase
+
+from eth_account import Account
+from requests import RequestException
+
+from gnosis.eth.constants import NULL_ADDRESS
+from gnosis.safe import Safe
+
+from ..services.safe_state_reader import (SafeStateReaderException,
+                                          SafeStateReaderProvider)
+from .relay_test_case import RelayTestCaseMixin
+
+
+class TestSafeStateReader(RelayTestCaseMixin, TestCase):
+    def test_get_safe_state(self):
+        safe_state_reader = SafeStateReaderProvider()
+        owners = [Account.create().address for _ in range(2)]
+        safe_address = self.deploy_test_safe(owners=owners, threshold=2).safe_address
+        safe_balance = self.w3.toWei(0.01, 'ether')
+        self.send_ether(safe_address, safe_balance)
+        safe = Safe(safe_address, self.ethereum_client)
+
+        safe_state = safe_state_reader.get_safe_state(safe_address)
+        self.assertEqual(safe_state.address, safe_address)
+        self.assertEqual(safe_state.block_number, self.ethereum_client.current_block_number)
+        self.assertEqual(safe_state.code, bytes(self.w3.eth.getCode(safe_address)))
+        self.assertEqual(safe_state.master_copy, safe.retrieve_master_copy_address())
+        self.assertEqual(safe_state.threshold, 2)
+        self.assertEqual(safe_state.owners, safe.retrieve_owners())
+        self.assertEqual(safe_state.version, safe.retrieve_version())
+        self.assertEqual(safe_state.gas_token_balance, safe_balance)
+
+        # Pinned to a block before funding the Safe
+        safe_state = safe_state_reader.get_safe_state(safe_address, NULL_ADDRESS,
+                                                      block_identifier=safe_state.block_number - 1)
+        self.assertEqual(safe_state.gas_token_balance, 0)
+
+        # Token without `balanceOf` and not deployed Safe
+        safe_state = safe_state_reader.get_safe_state(Account.create().address, Account.create().address)
+        self.assertEqual(safe_state.code, b'')
+        self.assertEqual(safe_state.master_copy, NULL_ADDRESS)
+        self.assertIsNone(safe_state.threshold)
+        self.assertIsNone(safe_state.owners)
+        self.assertIsNone(safe_state.version)
+        self.assertEqual(safe_state.gas_token_balance, 0)
+
+        # Balance of a gas token without `balanceOf` is missing for a deployed Safe
+        with self.assertRaises(SafeStateReaderException):
+            safe_state_reader.get_safe_state(safe_address, Account.create().address)
+
+        # Transport errors are wrapped
+        with mock.patch.object(safe_state_reader.json_rpc_client, 'request', side_effect=RequestException):
+            with self.assertRaises(SafeStateReaderException):
+                safe_state_reader.get_safe_state(safe_address)
+
+    def test_get_safe_states(self):
+        safe_state_reader = SafeStateReaderProvider()
+        safe_addresses = [self.deploy_test_safe(threshold=1).safe_address for _ in range(3)]
+        not_deployed_address = Account.create().address
+        self.send_ether(safe_addresses[1], 10)
+
+        safe_states = safe_state_reader.get_safe_states(safe_addresses + [not_deployed_address],
+                                                        [None, NULL_ADDRESS, None, None],
+                                                        include_metadata=[True, False, True, True])
+        self.assertEqual(len(safe_states), 4)
+        self.assertEqual([safe_state.address for safe_state in safe_states],
+                         safe_addresses + [not_deployed_address])
+        self.assertEqual(len({safe_state.block_number for safe_state in safe_states}), 1)
+        self.assertEqual(safe_states[0].threshold, 1)
+        self.assertEqual(safe_states[1].gas_token_balance, 10)
+        self.assertIsNone(safe_states[1].master_copy)  # Metadata was not requested
+        self.assertIsNotNone(safe_states[2].master_copy)
+        self.assertIsNone(safe_states[3].threshold)
+
+        # Missing fields only affect the Safe they belong to
+        safe_states = safe_state_reader.get_safe_states(safe_addresses[:2], [Account.create().address, None])
+        self.assertIsNone(safe_states[0])
+        self.assertEqual(safe_states[1].gas_token_balance, 10)
+
+    def test_get_safe_infos(self):
+        safe_state_reader = SafeStateReaderProvider()
+        fallback_handler = Account.create().address
+        safe_addresses = [self.deploy_test_safe(threshold=1).safe_address,
+                          self.deploy_test_safe(threshold=2, fallback_handler=fallback_handler).safe_address]
+        not_deployed_address = Account.create().address
+
+        safe_infos = safe_state_reader.get_safe_infos(safe_addresses + [not_deployed_address])
+        self.assertEqual(len(safe_infos), 3)
+        self.assertIsNone(safe_infos[2])
+        for safe_address, safe_info in zip(safe_addresses, safe_infos):
+            safe = Safe(safe_address, self.ethereum_client)
+            self.assertEqual(safe_info.address, safe_address)
+            self.assertEqual(safe_info.nonce, safe.retrieve_nonce())
+            self.assertEqual(safe_info.threshold, safe.retrieve_threshold())
+            self.assertEqual(safe_info.owners, safe.retrieve_owners())
+            self.assertEqual(safe_info.master_copy, safe.retrieve_master_copy_address())
+            self.assertEqual(safe_info.version, safe.retrieve_version())
+            self.assertEqual(safe_info.fallback_handler, safe.retrieve_fallback_handler())
+        self.assertEqual(safe_infos[1].fallback_handler, fallback_handler)
+
+        self.assertEqual(safe_state_reader.get_safe_infos([]), [])
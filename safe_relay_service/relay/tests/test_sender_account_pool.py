@@ -0,0 +1,47 @@
+from django.test import TestCase
+
+from eth_account import Account
+
+from ..services.sender_account_pool import (SenderAccountAssignment,
+                                            SenderAccountPool)
+from .factories import (EthereumTxFactory, SafeContractFactory,
+                        SafeMultisigTxFactory)
+
+
+class TestSenderAccountPool(TestCase):
+    def test_sender_account_pool(self):
+        accounts = [Account.create() for _ in range(3)]
+        sender_account_pool = SenderAccountPool([account.key for account in accounts])
+        self.assertEqual(len(sender_account_pool), 3)
+        self.assertEqual(sender_account_pool.addresses, [account.address for account in accounts])
+        self.assertEqual(sender_account_pool.get(accounts[1].address).key, accounts[1].key)
+        self.assertIsNone(sender_account_pool.get(Account.create().address))
+
+        # Same Safe is always assigned to the same account
+        safe_addresses = [Account.create().address for _ in range(30)]
+        assigned_addresses = [sender_account_pool.assign(safe_address).address for safe_address in safe_addresses]
+        self.assertEqual(assigned_addresses, [sender_account_pool.assign(safe_address).address
+                                              for safe_address in safe_addresses])
+        self.assertEqual(set(assigned_addresses), set(sender_account_pool.addresses))
+
+        account = Account.create()
+        self.assertEqual(SenderAccountPool([account.key]).assign(safe_addresses[0]).address, account.address)
+
+    def test_sender_account_pool_least_pending(self):
+        accounts = [Account.create() for _ in range(2)]
+        sender_account_pool = SenderAccountPool([account.key for account in accounts],
+                                                assignment=SenderAccountAssignment.LEAST_PENDING)
+        self.assertEqual(sender_account_pool.get_pending_txs_count(), {accounts[0].address: 0,
+                                                                       accounts[1].address: 0})
+
+        EthereumTxFactory(_from=accounts[0].address, block=None)
+        EthereumTxFactory(_from=accounts[0].address)  # Mined
+        self.assertEqual(sender_account_pool.get_pending_txs_count(), {accounts[0].address: 1,
+                                                                       accounts[1].address: 0})
+        safe_contract = SafeContractFactory()
+        self.assertEqual(sender_account_pool.assign(safe_contract.address).address, accounts[1].address)
+
+        # Safe with txs not mined keeps the same account
+        SafeMultisigTxFactory(safe=safe_contract,
+                              ethereum_tx=EthereumTxFactory(_from=accounts[0].address, block=None))
+        self.assertEqual(sender_account_pool.assign(safe_contract.address).address, accounts[0].address)
@@ -29,6 +29,29 @@ class TestStatsService(RelayTestCaseMixin, TestCase):
                               [{'token_address': None, 'balance': value},
                                {'token_address': erc20.address, 'balance': tokens_value}])
 
+    def test_get_balances_for_safes(self):
+        stats_service = StatsServiceProvider()
+        safe_addresses = [Account.create().address for _ in range(3)]
+        self.assertEqual(stats_service.get_balances_for_safes([]), [])
+
+        value = 7
+        self.send_ether(safe_addresses[1], value)
+        tokens_value = 12
+        erc20 = self.deploy_example_erc20(tokens_value, safe_addresses[2])
+        EthereumEventFactory(token_address=erc20.address, to=safe_addresses[2])
+        balances_by_safe = stats_service.get_balances_for_safes(safe_addresses)
+        self.assertEqual(balances_by_safe, [stats_service.get_balances(safe_address)
+                                            for safe_address in safe_addresses])
+        self.assertEqual(balances_by_safe[1], [{'token_address': None, 'balance': value}])
+        self.assertCountEqual(balances_by_safe[2], [{'token_address': None, 'balance': 0},
+                                                    {'token_address': erc20.address, 'balance': tokens_value}])
+
+        # Pinned to a block before sending ether
+        block_number = self.ethereum_client.current_block_number
+        self.send_ether(safe_addresses[0], value)
+        self.assertEqual(stats_service.get_balances_for_safes(safe_addresses[:1], block_identifier=block_number),
+                         [[{'token_address': None, 'balance': 0}]])
+
     def test_get_relay_history_stats(self):
         stats_service = StatsServiceProvider()
         self.assertIsNotNone(stats_service.get_relay_history_stats())
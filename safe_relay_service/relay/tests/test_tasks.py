@@ -10,7 +10,7 @@ from eth_account import Account
 from ..models import EthereumTx
 from ..services import Erc20EventsServiceProvider
 from ..tasks import (check_and_update_pending_transactions,
-                     check_balance_of_accounts_task,
+                     check_balance_of_accounts_task, check_nonce_gaps_task,
                      check_pending_transactions, deploy_create2_safe_task,
                      find_erc_20_721_transfers_task)
 from .factories import (SafeCreation2Factory, SafeMultisigTxFactory,
@@ -39,6 +39,9 @@ class TestTasks(RelayTestCaseMixin, TestCase):
     def test_check_balance_of_accounts_task(self):
         self.assertTrue(check_balance_of_accounts_task.delay().get())
 
+    def test_check_nonce_gaps_task(self):
+        self.assertEqual(check_nonce_gaps_task.delay().get(), 0)
+
     def test_find_erc_20_721_transfers_task(self):
         erc20_events_service = Erc20EventsServiceProvider()
         erc20_events_service.confirmations = 0
@@ -0,0 +1,49 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
+from django.test import TestCase
+
+from eth_account import Account
+
+from gnosis.eth.constants import NULL_ADDRESS
+
+from ..repositories.redis_repository import RedisRepository
+from ..services.transaction_estimation_cache import (
+    SafeTxGasEstimation, TransactionEstimationCache)
+
+
+class TestTransactionEstimationCache(TestCase):
+    def test_get_key(self):
+        safe_address, to = Account.create().address, Account.create().address
+        key = TransactionEstimationCache.get_key(safe_address, to, 0, b'', 0, None, 10)
+        self.assertEqual(key, TransactionEstimationCache.get_key(safe_address, to, 0, None, 0, NULL_ADDRESS, 10))
+        self.assertNotEqual(key, TransactionEstimationCache.get_key(safe_address, to, 0, b'', 0, None, 11))
+        self.assertNotEqual(key, TransactionEstimationCache.get_key(safe_address, to, 0, b'\x01', 0, None, 10))
+        self.assertNotEqual(key, TransactionEstimationCache.get_key(safe_address, to, 1, b'', 0, None, 10))
+
+    def test_get_or_calculate(self):
+        transaction_estimation_cache = TransactionEstimationCache(RedisRepository().redis)
+        key = TransactionEstimationCache.get_key(Account.create().address, Account.create().address, 0, b'', 0,
+                                                 None, 10)
+        safe_tx_gas_estimation = SafeTxGasEstimation(50000, 30000, 0)
+
+        # Exceptions are propagated and nothing is cached
+        calculate = mock.MagicMock(side_effect=ValueError)
+        with self.assertRaises(ValueError):
+            transaction_estimation_cache.get_or_calculate(key, calculate)
+
+        def slow_calculate():
+            time.sleep(0.5)
+            return safe_tx_gas_estimation
+
+        # Concurrent identical estimations are only calculated once
+        calculate = mock.MagicMock(side_effect=slow_calculate)
+        with ThreadPoolExecutor(max_workers=5) as executor:
+            results = list(executor.map(lambda _: transaction_estimation_cache.get_or_calculate(key, calculate),
+                                        range(5)))
+        self.assertEqual(results, [safe_tx_gas_estimation] * 5)
+        self.assertEqual(calculate.call_count, 1)
+
+        self.assertEqual(transaction_estimation_cache.get_or_calculate(key, calculate), safe_tx_gas_estimation)
+        self.assertEqual(calculate.call_count, 1)
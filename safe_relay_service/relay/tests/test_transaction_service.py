@@ -1,4 +1,5 @@
 from datetime import timedelta
+from unittest import mock
 
 from django.test import TestCase
 from django.utils import timezone
@@ -9,10 +10,15 @@ from hexbytes import HexBytes
 from gnosis.eth.constants import NULL_ADDRESS
 from gnosis.eth.contracts import get_paying_proxy_contract, get_safe_contract
 from gnosis.eth.utils import get_eth_address_with_key
-from gnosis.safe import Safe, SafeOperation
+from gnosis.safe import Safe, SafeOperation, SafeTx
+from gnosis.safe.signatures import signatures_to_bytes
 
+from safe_relay_service.gas_station.models import GasPrice
 from safe_relay_service.tokens.tests.factories import TokenFactory
 
+from ..models import SafeMultisigTx, SafeMultisigTxStatus
+from ..services.safe_metadata_cache import SafeMetadata
+from ..services.safe_signature_validator import SafeOwners
 from ..services.transaction_service import (GasPriceTooLow, InvalidGasToken,
                                             InvalidMasterCopyAddress,
                                             InvalidProxyContract,
@@ -20,8 +26,11 @@ from ..services.transaction_service import (GasPriceTooLow, InvalidGasToken,
                                             NotEnoughFundsForMultisigTx,
                                             RefundMustBeEnabled,
                                             SafeDoesNotExist,
-                                            SignaturesNotSorted)
-from .factories import SafeContractFactory, SafeMultisigTxFactory
+                                            SignaturesNotFound,
+                                            SignaturesNotSorted,
+                                            SignerIsNotOwner)
+from .factories import (EthereumBlockFactory, EthereumTxFactory,
+                        SafeContractFactory, SafeMultisigTxFactory)
 from .relay_test_case import RelayTestCaseMixin
 
 
@@ -150,6 +159,12 @@ class TestTransactionService(RelayTestCaseMixin, TestCase):
                 signatures,
             )
 
+        # Metadata of a valid Safe is cached, even if tx is not valid
+        safe_metadata = self.transaction_service.safe_metadata_cache.get(my_safe_address)
+        self.assertEqual(safe_metadata.master_copy, safe.retrieve_master_copy_address())
+        self.assertEqual(safe_metadata.version, safe.retrieve_version())
+        self.assertIsNone(self.transaction_service.safe_metadata_cache.get(proxy_address))
+
         # Send something to the safe
         self.send_tx({
             'to': my_safe_address,
@@ -307,6 +322,143 @@ class TestTransactionService(RelayTestCaseMixin, TestCase):
         tx_receipt = w3.eth.waitForTransactionReceipt(safe_multisig_tx.ethereum_tx.tx_hash)
         self.assertTrue(tx_receipt['status'])
 
+    def test_queue_multisig_tx(self):
+        owner_account = self.create_account()
+        safe_address = self.deploy_test_safe(owners=[owner_account.address], threshold=1,
+                                             initial_funding_wei=self.w3.toWei(0.01, 'ether')).safe_address
+        to = Account.create().address
+        value = 1
+        data = b''
+        operation = SafeOperation.CALL.value
+        safe_tx_gas = 100000
+        data_gas = 300000
+        gas_price = self.transaction_service._get_minimum_gas_price()
+        safe = Safe(safe_address, self.ethereum_client)
+        not_owner_account = Account.create()
+        signatures = []
+        for nonce, account in enumerate((owner_account, not_owner_account)):
+            safe_tx_hash = safe.build_multisig_tx(to, value, data, operation, safe_tx_gas, data_gas, gas_price,
+                                                  NULL_ADDRESS, NULL_ADDRESS, safe_nonce=nonce).safe_tx_hash
+            signatures.append(account.signHash(safe_tx_hash))
+            self.transaction_service.queue_multisig_tx(safe_address, to, value, data, operation, safe_tx_gas,
+                                                       data_gas, gas_price, NULL_ADDRESS, NULL_ADDRESS, nonce,
+                                                       [signatures[-1]])
+
+        with self.assertRaises(SafeDoesNotExist):
+            self.transaction_service.queue_multisig_tx(Account.create().address, to, value, data, operation,
+                                                       safe_tx_gas, data_gas, gas_price, NULL_ADDRESS,
+                                                       NULL_ADDRESS, 0, [signatures[0]])
+
+        queued_multisig_txs = list(SafeMultisigTx.objects.queued().order_by('nonce'))
+        self.assertEqual(len(queued_multisig_txs), 2)
+        self.assertEqual(queued_multisig_txs[0].status, SafeMultisigTxStatus.QUEUED)
+
+        # Second tx is signed by an account not owner of the Safe
+        self.assertEqual(self.transaction_service.send_queued_multisig_txs(safe_address), 1)
+        self.assertFalse(SafeMultisigTx.objects.queued().exists())
+        safe_multisig_tx = SafeMultisigTx.objects.get()
+        self.assertEqual(safe_multisig_tx.nonce, 0)
+        self.assertIsNotNone(safe_multisig_tx.ethereum_tx)
+        self.assertIsNone(self.transaction_service.get_queued_multisig_tx_error(safe_multisig_tx.safe_tx_hash))
+        self.assertTrue(self.transaction_service.get_queued_multisig_tx_error(queued_multisig_txs[1].safe_tx_hash))
+
+    def test_pre_validate_signatures(self):
+        owner_accounts = sorted([Account.create() for _ in range(2)], key=lambda account: account.address.lower())
+        safe_address = Account.create().address
+        to = Account.create().address
+        gas_price = 1
+        safe_tx_args = (safe_address, to, 1, b'', SafeOperation.CALL.value, 100000, 50000, gas_price,
+                        NULL_ADDRESS, NULL_ADDRESS, 0)
+
+        def get_signatures(accounts):
+            safe_tx_hash = SafeTx(None, *safe_tx_args[:-1], safe_nonce=0, safe_version='1.1.1').safe_tx_hash
+            return signatures_to_bytes([(s['v'], s['r'], s['s'])
+                                        for s in [account.signHash(safe_tx_hash) for account in accounts]])
+
+        not_sorted_signatures = get_signatures(reversed(owner_accounts))
+        # Nothing cached, nothing is validated
+        self.transaction_service._pre_validate_signatures(*safe_tx_args, not_sorted_signatures)
+
+        self.transaction_service.safe_metadata_cache.set(SafeMetadata(safe_address, Account.create().address,
+                                                                      '1.1.1', 1))
+        with self.assertRaises(SignaturesNotSorted):
+            self.transaction_service._pre_validate_signatures(*safe_tx_args, not_sorted_signatures)
+        self.transaction_service._pre_validate_signatures(*safe_tx_args, get_signatures(owner_accounts))
+
+        self.transaction_service.safe_signature_validator.set_owners(
+            SafeOwners(safe_address, [account.address for account in owner_accounts], 2, 1))
+        self.transaction_service._pre_validate_signatures(*safe_tx_args, get_signatures(owner_accounts))
+        with self.assertRaises(SignaturesNotFound):
+            self.transaction_service._pre_validate_signatures(*safe_tx_args, get_signatures(owner_accounts[:1]))
+        not_owner_accounts = sorted(owner_accounts[:1] + [Account.create()],
+                                    key=lambda account: account.address.lower())
+        with self.assertRaises(SignerIsNotOwner):
+            self.transaction_service._pre_validate_signatures(*safe_tx_args, get_signatures(not_owner_accounts))
+
+    def test_get_bumped_gas_price(self):
+        gas_price = GasPrice(lowest=1, safe_low=1, standard=1, fast=1, fastest=1000)
+        with mock.patch.object(self.transaction_service.gas_station, 'get_gas_prices', return_value=gas_price):
+            self.assertEqual(self.transaction_service.get_bumped_gas_price(100), 113)
+            self.assertEqual(self.transaction_service.get_bumped_gas_price(100, bump_percentage=20), 120)
+            self.assertEqual(self.transaction_service.get_bumped_gas_price(900), 1000)  # Capped
+            self.assertIsNone(self.transaction_service.get_bumped_gas_price(950))  # Less than 10% increase
+            self.assertIsNone(self.transaction_service.get_bumped_gas_price(1000))
+
+    def test_bump_stuck_multisig_txs(self):
+        self.assertEqual(self.transaction_service.bump_stuck_multisig_txs(0), [])
+
+        owner_account = self.create_account()
+        safe_balance = self.w3.toWei(0.01, 'ether')
+        safe_address = self.deploy_test_safe(owners=[owner_account.address], threshold=1,
+                                             initial_funding_wei=safe_balance).safe_address
+        to = Account.create().address
+        value = safe_balance // 2
+        safe_tx_gas = 100000
+        data_gas = 300000
+        gas_price = self.transaction_service._get_minimum_gas_price()
+        safe_tx_hash = Safe(safe_address, self.ethereum_client).build_multisig_tx(
+            to, value, b'', SafeOperation.CALL.value, safe_tx_gas, data_gas, gas_price, NULL_ADDRESS, NULL_ADDRESS,
+            safe_nonce=0
+        ).safe_tx_hash
+
+        # Tx is sent but never mined (reverted on ganache)
+        snapshot_id = self.w3.testing.snapshot()
+        safe_multisig_tx = self.transaction_service.create_multisig_tx(
+            safe_address, to, value, b'', SafeOperation.CALL.value, safe_tx_gas, data_gas, gas_price,
+            NULL_ADDRESS, NULL_ADDRESS, 0, [owner_account.signHash(safe_tx_hash)]
+        )
+        self.w3.testing.revert(snapshot_id)
+        self.assertEqual(self.ethereum_client.get_balance(to), 0)
+        stuck_ethereum_tx = safe_multisig_tx.ethereum_tx
+
+        # Tx was not sent a while ago
+        self.assertEqual(self.transaction_service.bump_stuck_multisig_txs(60), [])
+
+        stuck_ethereum_tx.created = timezone.now() - timedelta(minutes=5)
+        stuck_ethereum_tx.save(update_fields=['created'])
+        fastest_gas_price = stuck_ethereum_tx.gas_price * 2
+        gas_prices = GasPrice(lowest=1, safe_low=1, standard=1, fast=1, fastest=fastest_gas_price)
+        with mock.patch.object(self.transaction_service.gas_station, 'get_gas_prices', return_value=gas_prices):
+            replacement_ethereum_txs = self.transaction_service.bump_stuck_multisig_txs(60)
+        self.assertEqual(len(replacement_ethereum_txs), 1)
+        replacement_ethereum_tx = replacement_ethereum_txs[0]
+        self.assertEqual(replacement_ethereum_tx.nonce, stuck_ethereum_tx.nonce)
+        self.assertEqual(replacement_ethereum_tx._from, stuck_ethereum_tx._from)
+        self.assertGreater(replacement_ethereum_tx.gas_price, stuck_ethereum_tx.gas_price)
+        self.assertEqual(replacement_ethereum_tx.get_replaced_txs(), [stuck_ethereum_tx])
+        stuck_ethereum_tx.refresh_from_db()
+        self.assertEqual(stuck_ethereum_tx.replaced_by, replacement_ethereum_tx)
+        safe_multisig_tx.refresh_from_db()
+        self.assertEqual(safe_multisig_tx.ethereum_tx, replacement_ethereum_tx)
+        self.assertEqual(self.ethereum_client.get_balance(to), value)
+
+        # Replacement was mined, so it's not replaced again
+        replacement_ethereum_tx.created = timezone.now() - timedelta(minutes=5)
+        replacement_ethereum_tx.save(update_fields=['created'])
+        self.assertEqual(self.transaction_service.bump_stuck_multisig_txs(60), [])
+        safe_multisig_tx.refresh_from_db()
+        self.assertIsNotNone(safe_multisig_tx.ethereum_tx.block_id)
+
     def test_estimate_tx(self):
         safe_address = Account.create().address
         to = Account.create().address
@@ -390,6 +542,30 @@ class TestTransactionService(RelayTestCaseMixin, TestCase):
         SafeMultisigTxFactory(created=timezone.now() - timedelta(minutes=60), ethereum_tx__block=None)
         self.assertEqual(self.transaction_service.get_pending_multisig_transactions(30).count(), 2)
 
+    def test_update_pending_ethereum_txs(self):
+        self.assertEqual(self.transaction_service.update_pending_ethereum_txs([]), [])
+        not_mined_ethereum_tx = EthereumTxFactory(block=None)
+        self.assertEqual(self.transaction_service.update_pending_ethereum_txs([not_mined_ethereum_tx]), [])
+
+        ethereum_txs = [EthereumTxFactory(tx_hash=self.send_ether(Account.create().address, 1), block=None)
+                        for _ in range(3)]
+        # One of the blocks is already on database
+        EthereumBlockFactory(number=self.w3.eth.getTransactionReceipt(ethereum_txs[0].tx_hash)['blockNumber'])
+        mined_ethereum_txs = self.transaction_service.update_pending_ethereum_txs(ethereum_txs
+                                                                                 + [not_mined_ethereum_tx])
+        self.assertEqual(len(mined_ethereum_txs), 3)
+        for ethereum_tx in ethereum_txs:
+            ethereum_tx.refresh_from_db()
+            tx_receipt = self.w3.eth.getTransactionReceipt(ethereum_tx.tx_hash)
+            self.assertEqual(ethereum_tx.block_id, tx_receipt['blockNumber'])
+            self.assertEqual(ethereum_tx.gas_used, tx_receipt['gasUsed'])
+            self.assertEqual(ethereum_tx.status, 1)
+            self.assertEqual(ethereum_tx.transaction_index, tx_receipt['transactionIndex'])
+        for ethereum_tx in ethereum_txs[1:]:  # Blocks were retrieved from the node
+            self.assertEqual(ethereum_tx.block.block_hash, self.w3.eth.getBlock(ethereum_tx.block_id)['hash'])
+        not_mined_ethereum_tx.refresh_from_db()
+        self.assertIsNone(not_mined_ethereum_tx.block_id)
+
     def test_get_last_nonce(self):
         safe_address = self.deploy_test_safe().safe_address
         safe_contract = SafeContractFactory(address=safe_address)
@@ -1,5 +1,7 @@
 import datetime
+import json
 import logging
+from unittest import mock
 
 from django.contrib.auth.models import User
 from django.urls import reverse
@@ -9,6 +11,7 @@ from eth_account import Account
 from faker import Faker
 from rest_framework import status
 from rest_framework.test import APITestCase
+from web3 import Web3
 
 from gnosis.eth.constants import NULL_ADDRESS
 from gnosis.eth.utils import (get_eth_address_with_invalid_checksum,
@@ -16,10 +19,14 @@ from gnosis.eth.utils import (get_eth_address_with_invalid_checksum,
 from gnosis.safe import SafeOperation, SafeTx
 from gnosis.safe.signatures import signatures_to_bytes
 
+from safe_relay_service.gas_station.models import GasPriceRollup
 from safe_relay_service.gas_station.tests.factories import GasPriceFactory
 from safe_relay_service.tokens.tests.factories import TokenFactory
 
-from ..models import SafeContract, SafeMultisigTx
+from ..models import SafeContract, SafeMultisigTx, SafeMultisigTxStatus
+from ..services.safe_state_reader import SafeStateReaderException
+from ..services.transaction_service import TransactionServiceProvider
+from ..tasks import send_queued_multisig_txs_task
 from .factories import (EthereumEventFactory, EthereumTxFactory,
                         SafeContractFactory, SafeCreation2Factory,
                         SafeMultisigTxFactory)
@@ -73,6 +80,20 @@ class TestViews(RelayTestCaseMixin, APITestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(response.data['count'], 2)
 
+        response = self.client.get(reverse('v1:gas-station-history') + '?resolution=minute', format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        GasPriceRollup.objects.rebuild()
+        response = self.client.get(reverse('v1:gas-station-history') + '?resolution=hour', format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['count'], 3)
+        self.assertEqual(response.data['results'][0]['count'], 1)
+        self.assertIn('standard_avg', response.data['results'][0])
+
+        response = self.client.get(reverse('v1:gas-station-history') + '?resolution=day', format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(sum(result['count'] for result in response.data['results']), 3)
+
     def test_safe_balances(self):
         safe_address = Account.create().address
         response = self.client.get(reverse('v1:safe-balances', args=(safe_address, )))
@@ -99,6 +120,51 @@ class TestViews(RelayTestCaseMixin, APITestCase):
         self.assertCountEqual(response.json(), [{'tokenAddress': None, 'balance': str(value)},
                                                 {'tokenAddress': erc20.address, 'balance': str(tokens_value)}])
 
+    def test_safe_etag(self):
+        safe_address = self.deploy_test_safe().safe_address
+        SafeContractFactory(address=safe_address)
+        for url in (reverse('v1:safe', args=(safe_address,)), reverse('v1:safe-balances', args=(safe_address,))):
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            etag = response['ETag']
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+            self.assertEqual(response['ETag'], etag)
+            response = self.client.get(url, HTTP_IF_NONE_MATCH='W/' + etag)
+            self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+            response = self.client.get(url, HTTP_IF_NONE_MATCH='"other-etag"')
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_safes_bulk(self):
+        safe_addresses = [self.deploy_test_safe(threshold=1).safe_address for _ in range(2)]
+        self.send_ether(safe_addresses[1], 5)
+        not_deployed_address = Account.create().address
+        url = reverse('v1:safes-bulk')
+
+        response = self.client.post(url, data={'safes': []}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        with self.settings(SAFE_INFO_BULK_MAX_SIZE=2):
+            response = self.client.post(url, data={'safes': safe_addresses + [not_deployed_address]},
+                                        format='json')
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        with self.settings(SAFE_INFO_BULK_CHUNK_SIZE=2):
+            response = self.client.post(url, data={'safes': safe_addresses + [not_deployed_address]},
+                                        format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        results = [json.loads(line) for line in b''.join(response.streaming_content).decode().splitlines()]
+        self.assertEqual([result['address'] for result in results], safe_addresses + [not_deployed_address])
+        self.assertIsNone(results[0]['error'])
+        self.assertEqual(results[0]['threshold'], 1)
+        self.assertEqual(results[0]['nonce'], 0)
+        self.assertEqual(len(results[0]['owners']), 1)
+        self.assertIn('masterCopy', results[0])
+        self.assertIn('fallbackHandler', results[0])
+        self.assertEqual(results[0]['balances'], [{'tokenAddress': None, 'balance': '0'}])
+        self.assertEqual(results[1]['balances'], [{'tokenAddress': None, 'balance': '5'}])
+        self.assertIn('SafeNotDeployed', results[2]['error'])
+
     def test_safe_multisig_tx_post(self):
         # Create Safe ------------------------------------------------
         w3 = self.ethereum_client.w3
@@ -246,6 +312,186 @@ class TestViews(RelayTestCaseMixin, APITestCase):
         self.assertEqual(response.status_code, status.HTTP_422_UNPROCESSABLE_ENTITY)
         self.assertTrue('InvalidProxyContract' in response.data['exception'])
 
+    def test_safe_multisig_tx_post_async(self):
+        w3 = self.ethereum_client.w3
+        safe_balance = w3.toWei(0.01, 'ether')
+        owner_account = self.create_account()
+        safe_creation = self.deploy_test_safe(owners=[owner_account.address], threshold=1,
+                                              initial_funding_wei=safe_balance)
+        my_safe_address = safe_creation.safe_address
+        SafeContractFactory(address=my_safe_address)
+
+        to = Account.create().address
+        value = safe_balance // 2
+        response = self.client.post(reverse('v1:safe-multisig-tx-estimate', args=(my_safe_address,)),
+                                    data={'to': to, 'value': value, 'data': None,
+                                          'operation': SafeOperation.CALL.value},
+                                    format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        estimation_json = response.json()
+        safe_tx_gas = estimation_json['safeTxGas'] + estimation_json['operationalGas']
+        data_gas = estimation_json['dataGas']
+        gas_price = estimation_json['gasPrice']
+        nonce = 0
+        safe_tx_hash = SafeTx(None, my_safe_address, to, value, None, SafeOperation.CALL.value, safe_tx_gas,
+                              data_gas, gas_price, None, None, safe_nonce=nonce).safe_tx_hash
+        signature = owner_account.signHash(safe_tx_hash)
+        data = {
+            "to": to,
+            "value": value,
+            "data": None,
+            "operation": SafeOperation.CALL.value,
+            "safe_tx_gas": safe_tx_gas,
+            "data_gas": data_gas,
+            "gas_price": gas_price,
+            "gas_token": None,
+            "nonce": nonce,
+            "signatures": [{'v': signature['v'], 'r': signature['r'], 's': signature['s']}]
+        }
+
+        status_url = reverse('v1:safe-multisig-tx-status', args=(my_safe_address, safe_tx_hash.hex()))
+        response = self.client.get(status_url)
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+        response = self.client.post(reverse('v1:safe-multisig-txs', args=(my_safe_address,)),
+                                    data=data, format='json', HTTP_PREFER='respond-async')
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(response['Preference-Applied'], 'respond-async')
+        self.assertEqual(response['Location'], status_url)
+        self.assertEqual(response.json()['safeTxHash'], safe_tx_hash.hex())
+        self.assertEqual(response.json()['status'], SafeMultisigTxStatus.QUEUED.value)
+        self.assertEqual(SafeMultisigTx.objects.queued().count(), 1)
+
+        response = self.client.get(status_url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()['status'], SafeMultisigTxStatus.QUEUED.value)
+        self.assertIsNone(response.json()['txHash'])
+
+        # Same nonce cannot be queued twice
+        response = self.client.post(reverse('v1:safe-multisig-txs', args=(my_safe_address,)),
+                                    data=data, format='json', HTTP_PREFER='respond-async')
+        self.assertEqual(response.status_code, status.HTTP_422_UNPROCESSABLE_ENTITY)
+
+        # Tests are run inside a transaction, so `on_commit` hook does not trigger the task
+        self.assertEqual(send_queued_multisig_txs_task.delay(my_safe_address).get(), 1)
+        self.assertEqual(SafeMultisigTx.objects.queued().count(), 0)
+        self.assertEqual(self.ethereum_client.get_balance(to), value)
+        response = self.client.get(status_url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn(response.json()['status'], (SafeMultisigTxStatus.SENT.value, SafeMultisigTxStatus.MINED.value))
+        self.assertEqual(response.json()['txHash'],
+                         SafeMultisigTx.objects.get(safe_tx_hash=safe_tx_hash).ethereum_tx.tx_hash.hex())
+
+        # Queued tx that could not be sent
+        failed_safe_tx_hash = Web3.keccak(text='failed')
+        transaction_service = TransactionServiceProvider()
+        transaction_service.redis.set(transaction_service._get_queued_multisig_tx_error_key(failed_safe_tx_hash),
+                                      'InvalidMultisigTx: Reverted')
+        response = self.client.get(reverse('v1:safe-multisig-tx-status',
+                                           args=(my_safe_address, failed_safe_tx_hash.hex())))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()['status'], SafeMultisigTxStatus.FAILED.value)
+        self.assertEqual(response.json()['error'], 'InvalidMultisigTx: Reverted')
+
+    def _build_multisig_tx_bulk_transactions(self, to, value, number):
+        safe_balance = self.w3.toWei(0.01, 'ether')
+        transactions = []
+        for _ in range(number):
+            owner_account = self.create_account()
+            safe_address = self.deploy_test_safe(owners=[owner_account.address], threshold=1,
+                                                 initial_funding_wei=safe_balance).safe_address
+            response = self.client.post(reverse('v1:safe-multisig-tx-estimate', args=(safe_address,)),
+                                        data={'to': to, 'value': value, 'data': None,
+                                              'operation': SafeOperation.CALL.value},
+                                        format='json')
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            estimation_json = response.json()
+            safe_tx_gas = estimation_json['safeTxGas'] + estimation_json['operationalGas']
+            safe_tx_hash = SafeTx(None, safe_address, to, value, None, SafeOperation.CALL.value, safe_tx_gas,
+                                  estimation_json['dataGas'], estimation_json['gasPrice'], None, None,
+                                  safe_nonce=0).safe_tx_hash
+            signature = owner_account.signHash(safe_tx_hash)
+            transactions.append({
+                'safe': safe_address,
+                'to': to,
+                'value': value,
+                'data': None,
+                'operation': SafeOperation.CALL.value,
+                'safeTxGas': safe_tx_gas,
+                'dataGas': estimation_json['dataGas'],
+                'gasPrice': estimation_json['gasPrice'],
+                'gasToken': None,
+                'nonce': 0,
+                'signatures': [{'v': signature['v'], 'r': signature['r'], 's': signature['s']}],
+                'estimationTicket': estimation_json['estimationTicket'],
+            })
+        return transactions
+
+    def test_safe_multisig_tx_bulk_post(self):
+        to = Account.create().address
+        value = 1
+        transactions = self._build_multisig_tx_bulk_transactions(to, value, 2)
+
+        response = self.client.post(reverse('v1:safe-multisig-txs-bulk'), data={'transactions': []},
+                                    format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        # Second tx for the same Safe is not valid
+        transactions.append(dict(transactions[0], nonce=1))
+        response = self.client.post(reverse('v1:safe-multisig-txs-bulk'), data={'transactions': transactions},
+                                    format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        results = response.json()
+        self.assertEqual(len(results), 3)
+        for transaction, result in zip(transactions[:2], results[:2]):
+            self.assertEqual(result['safe'], transaction['safe'])
+            self.assertEqual(result['nonce'], 0)
+            self.assertIsNone(result['error'])
+            self.assertEqual(result['status'], SafeMultisigTxStatus.SENT.value)
+            safe_multisig_tx = SafeMultisigTx.objects.get(safe=transaction['safe'], nonce=0)
+            self.assertEqual(result['transaction']['txHash'], safe_multisig_tx.ethereum_tx_id.hex())
+            self.assertEqual(self.w3.eth.getTransactionReceipt(safe_multisig_tx.ethereum_tx_id)['status'], 1)
+        self.assertEqual(results[2]['nonce'], 1)
+        self.assertIsNone(results[2]['transaction'])
+        self.assertIn('Only one tx per Safe', results[2]['error'])
+        self.assertEqual(self.ethereum_client.get_balance(to), value * 2)
+
+        # Txs already sent
+        response = self.client.post(reverse('v1:safe-multisig-txs-bulk'),
+                                    data={'transactions': transactions[:2]}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        for result in response.json():
+            self.assertIn('SafeMultisigTxExists', result['error'])
+
+    def test_safe_multisig_tx_bulk_post_node_errors(self):
+        to = Account.create().address
+        transactions = self._build_multisig_tx_bulk_transactions(to, 1, 2)
+        transaction_service = TransactionServiceProvider()
+
+        # Safe states cannot be retrieved
+        with mock.patch.object(transaction_service.safe_state_reader, 'get_safe_states',
+                               side_effect=SafeStateReaderException('Node is down')):
+            response = self.client.post(reverse('v1:safe-multisig-txs-bulk'),
+                                        data={'transactions': transactions}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        for result in response.json():
+            self.assertIsNone(result['transaction'])
+            self.assertIn('Cannot retrieve state', result['error'])
+        self.assertFalse(SafeMultisigTx.objects.exists())
+
+        # Node does not answer when broadcasting, txs are stored anyway
+        with mock.patch.object(transaction_service.json_rpc_client, 'request', return_value=[]):
+            response = self.client.post(reverse('v1:safe-multisig-txs-bulk'),
+                                        data={'transactions': transactions}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        for transaction, result in zip(transactions, response.json()):
+            self.assertIsNone(result['error'])
+            self.assertEqual(result['status'], 'unknown')
+            safe_multisig_tx = SafeMultisigTx.objects.get(safe=transaction['safe'], nonce=0)
+            self.assertEqual(result['transaction']['txHash'], safe_multisig_tx.ethereum_tx_id.hex())
+            self.assertEqual(safe_multisig_tx.status, SafeMultisigTxStatus.SENT)
+        self.assertEqual(self.ethereum_client.get_balance(to), 0)
+
     def test_safe_multisig_tx_get(self):
         safe = SafeContractFactory()
         my_safe_address = safe.address
@@ -458,6 +704,7 @@ class TestViews(RelayTestCaseMixin, APITestCase):
         self.assertGreater(response['gasPrice'], 0)
         self.assertIsNone(response['lastUsedNonce'])
         self.assertEqual(response['gasToken'], NULL_ADDRESS)
+        self.assertTrue(response['estimationTicket'])
 
         # Add to the database and check again
         SafeContractFactory(address=my_safe_address)
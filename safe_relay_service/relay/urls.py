@@ -19,10 +19,14 @@ urlpatterns = [
     path('gas-station/history/', GasStationHistoryView.as_view(), name='gas-station-history'),
     path('tokens/', TokensView.as_view(), name='tokens'),
     path('tokens/<str:address>/', TokenView.as_view(), name='tokens'),
+    path('safes/transactions/bulk/', views.SafeMultisigTxBulkView.as_view(), name='safe-multisig-txs-bulk'),
+    path('safes/bulk/', views.SafeInfoBulkView.as_view(), name='safes-bulk'),
     path('safes/<str:address>/', views.SafeView.as_view(), name='safe'),
     path('safes/<str:address>/balances/', views.SafeBalanceView.as_view(), name='safe-balances'),
     path('safes/<str:address>/funded/', views.SafeSignalView.as_view(), name='safe-signal'),
     path('safes/<str:address>/transactions/', views.SafeMultisigTxView.as_view(), name='safe-multisig-txs'),
+    path('safes/<str:address>/transactions/<str:safe_tx_hash>/status/', views.SafeMultisigTxStatusView.as_view(),
+         name='safe-multisig-tx-status'),
     path('safes/<str:address>/erc20-transactions/', views.ERC20View.as_view(), name='erc20-txs'),
     path('safes/<str:address>/erc721-transactions/', views.ERC721View.as_view(), name='erc721-txs'),
     path('safes/<str:address>/transactions/estimate/', views.SafeMultisigTxEstimateView.as_view(),
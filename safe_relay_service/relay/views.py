@@ -1,12 +1,21 @@
+import json
 import logging
+from typing import Any, Dict, Iterator, List
 
 from django.conf import settings
+from django.db import transaction
+from django.http import StreamingHttpResponse
+from django.urls import reverse
 from django.utils.dateparse import parse_datetime
+from django.utils.http import parse_etags
 
 from django_filters.rest_framework import DjangoFilterBackend
+from djangorestframework_camel_case.util import camelize
 from drf_yasg import openapi
 from drf_yasg.utils import swagger_auto_schema
 from eth_account.account import Account
+from hexbytes import HexBytes
+from requests import RequestException
 from rest_framework import filters, status
 from rest_framework.authentication import TokenAuthentication
 from rest_framework.generics import CreateAPIView, ListAPIView
@@ -20,25 +29,33 @@ from gnosis.eth.constants import NULL_ADDRESS
 from gnosis.safe.exceptions import SafeServiceException
 from gnosis.safe.serializers import SafeMultisigEstimateTxSerializer
 
+from safe_relay_service.utils.json_rpc import JsonRpcBatchException
 from safe_relay_service.version import __version__
 
 from .filters import DefaultPagination, SafeMultisigTxFilter
 from .models import (EthereumEvent, EthereumTx, SafeContract, SafeFunding,
-                     SafeMultisigTx)
+                     SafeMultisigTx, SafeMultisigTxStatus)
 from .serializers import (
     ERC20Serializer, ERC721Serializer, SafeBalanceResponseSerializer,
     SafeContractSerializer, SafeCreationResponseSerializer,
     SafeCreationSerializer, SafeFundingResponseSerializer,
-    SafeMultisigEstimateTxResponseSerializer, SafeMultisigTxResponseSerializer,
-    SafeRelayMultisigTxSerializer, SafeResponseSerializer,
+    SafeInfoBulkResponseSerializer, SafeInfoBulkSerializer,
+    SafeMultisigEstimateTxResponseSerializer,
+    SafeMultisigTxBulkResultResponseSerializer,
+    SafeMultisigTxResponseSerializer, SafeMultisigTxStatusResponseSerializer,
+    SafeRelayMultisigTxBulkSerializer, SafeRelayMultisigTxSerializer,
+    SafeResponseSerializer,
     TransactionEstimationWithNonceAndGasTokensResponseSerializer)
-from .services import StatsServiceProvider
+from .services import SafeResponseCacheProvider, StatsServiceProvider
 from .services.funding_service import FundingServiceException
 from .services.safe_creation_service import (SafeCreationServiceException,
                                              SafeCreationServiceProvider)
-from .services.transaction_service import (TransactionServiceException,
+from .services.safe_state_reader import (SafeStateReaderException,
+                                         SafeStateReaderProvider)
+from .services.transaction_service import (SafeMultisigTxRequest,
+                                           TransactionServiceException,
                                            TransactionServiceProvider)
-from .tasks import fund_deployer_task
+from .tasks import fund_deployer_task, send_queued_multisig_txs_task
 
 logger = logging.getLogger(__name__)
 
@@ -69,6 +86,18 @@ def custom_exception_handler(exc, context):
     return response
 
 
+def is_not_modified(request, etag: str) -> bool:
+    """
+    :return: `True` if `If-None-Match` header matches `etag` (weak comparison), so a `304` can be returned
+    """
+    etags = parse_etags(request.META.get('HTTP_IF_NONE_MATCH', ''))
+    return '*' in etags or etag.strip('W/') in (e.strip('W/') for e in etags)
+
+
+def build_not_modified_response(etag: str) -> Response:
+    return Response(status=status.HTTP_304_NOT_MODIFIED, headers={'ETag': etag})
+
+
 class AboutView(APIView):
     renderer_classes = (JSONRenderer,)
 
@@ -77,6 +106,8 @@ class AboutView(APIView):
             if settings.SAFE_FUNDER_PRIVATE_KEY else None
         safe_sender_public_key = Account.from_key(settings.SAFE_TX_SENDER_PRIVATE_KEY).address \
             if settings.SAFE_TX_SENDER_PRIVATE_KEY else None
+        safe_sender_public_keys = [Account.from_key(private_key).address
+                                   for private_key in settings.SAFE_TX_SENDER_PRIVATE_KEYS]
         content = {
             'name': 'Safe Relay Service',
             'version': __version__,
@@ -101,7 +132,9 @@ class AboutView(APIView):
                 'SAFE_PROXY_FACTORY_ADDRESS': settings.SAFE_PROXY_FACTORY_ADDRESS,
                 'SAFE_PROXY_FACTORY_V1_0_0_ADDRESS': settings.SAFE_PROXY_FACTORY_V1_0_0_ADDRESS,
                 'SAFE_TX_NOT_MINED_ALERT_MINUTES': settings.SAFE_TX_NOT_MINED_ALERT_MINUTES,
+                'SAFE_TX_SENDER_ASSIGNMENT': settings.SAFE_TX_SENDER_ASSIGNMENT,
                 'SAFE_TX_SENDER_PUBLIC_KEY': safe_sender_public_key,
+                'SAFE_TX_SENDER_PUBLIC_KEYS': safe_sender_public_keys,
                 'SAFE_V0_0_1_CONTRACT_ADDRESS': settings.SAFE_V0_0_1_CONTRACT_ADDRESS,
                 'SAFE_V1_0_0_CONTRACT_ADDRESS': settings.SAFE_V1_0_0_CONTRACT_ADDRESS,
                 'SAFE_VALID_CONTRACT_ADDRESSES': settings.SAFE_VALID_CONTRACT_ADDRESSES,
@@ -161,6 +194,7 @@ class SafeView(APIView):
     serializer_class = SafeResponseSerializer
 
     @swagger_auto_schema(responses={200: SafeResponseSerializer(),
+                                    304: 'Safe not modified since `If-None-Match` ETag',
                                     404: 'Safe not found',
                                     422: 'Safe address checksum not valid'})
     def get(self, request, address, format=None):
@@ -170,9 +204,11 @@ class SafeView(APIView):
         if not Web3.isChecksumAddress(address):
             return Response(status=status.HTTP_422_UNPROCESSABLE_ENTITY)
 
-        safe_info = SafeCreationServiceProvider().retrieve_safe_info(address)
-        serializer = self.serializer_class(safe_info)
-        return Response(status=status.HTTP_200_OK, data=serializer.data)
+        cached_response = SafeResponseCacheProvider().get_safe_info(address)
+        if is_not_modified(request, cached_response.etag):
+            return build_not_modified_response(cached_response.etag)
+        serializer = self.serializer_class(cached_response.data)
+        return Response(status=status.HTTP_200_OK, data=serializer.data, headers={'ETag': cached_response.etag})
 
 
 class SafeBalanceView(APIView):
@@ -180,6 +216,7 @@ class SafeBalanceView(APIView):
     serializer_class = SafeBalanceResponseSerializer
 
     @swagger_auto_schema(responses={200: SafeBalanceResponseSerializer(many=True),
+                                    304: 'Balances not modified since `If-None-Match` ETag',
                                     404: 'Safe not found',
                                     422: 'Safe address checksum not valid'})
     def get(self, request, address, format=None):
@@ -194,11 +231,70 @@ class SafeBalanceView(APIView):
             except SafeContract.DoesNotExist:
                 return Response(status=status.HTTP_404_NOT_FOUND)
 
-            safe_balances = StatsServiceProvider().get_balances(address)
-            serializer = self.serializer_class(data=safe_balances, many=True)
+            cached_response = SafeResponseCacheProvider().get_balances(address)
+            if is_not_modified(request, cached_response.etag):
+                return build_not_modified_response(cached_response.etag)
+            serializer = self.serializer_class(data=cached_response.data, many=True)
             # assert serializer.is_valid(), 'Safe Balance result not valid'
             serializer.is_valid()
-            return Response(status=status.HTTP_200_OK, data=serializer.data)
+            return Response(status=status.HTTP_200_OK, data=serializer.data,
+                            headers={'ETag': cached_response.etag})
+
+
+class SafeInfoBulkView(APIView):
+    permission_classes = (AllowAny,)
+    serializer_class = SafeInfoBulkSerializer
+
+    @swagger_auto_schema(request_body=SafeInfoBulkSerializer(),
+                         responses={200: SafeInfoBulkResponseSerializer(many=True),
+                                    400: 'Data not valid'})
+    def post(self, request, format=None):
+        """
+        Get info and balances for many Safes at once, every Safe is read at the same block. Result is streamed as
+        newline delimited JSON, one Safe per line in the same order of the request. If a Safe cannot be retrieved
+        (e.g. it's not deployed) only `address` and `error` are returned for it
+        """
+        serializer = self.serializer_class(data=request.data)
+        if not serializer.is_valid():
+            return Response(status=status.HTTP_400_BAD_REQUEST, data=serializer.errors)
+
+        safe_addresses = serializer.validated_data['safes']
+        block_number = SafeStateReaderProvider().resolve_block_identifier('latest')
+        return StreamingHttpResponse(self._get_safe_lines(safe_addresses, block_number),
+                                     content_type='application/x-ndjson')
+
+    @staticmethod
+    def _get_safe_results(safe_addresses: List[str], block_number: int) -> List[Dict[str, Any]]:
+        try:
+            safe_infos = SafeStateReaderProvider().get_safe_infos(safe_addresses, block_identifier=block_number)
+            balances_by_safe = StatsServiceProvider().get_balances_for_safes(safe_addresses,
+                                                                             block_identifier=block_number)
+        except (SafeStateReaderException, JsonRpcBatchException, RequestException, ValueError) as exc:
+            logger.warning('Cannot retrieve info for %d safes', len(safe_addresses), exc_info=True)
+            return [{'address': safe_address, 'error': '{}: {}'.format(exc.__class__.__name__, exc)}
+                    for safe_address in safe_addresses]
+
+        results = []
+        for safe_address, safe_info, balances in zip(safe_addresses, safe_infos, balances_by_safe):
+            if not safe_info:
+                results.append({'address': safe_address,
+                                'error': 'SafeNotDeployed: Safe with address=%s not deployed' % safe_address})
+            elif balances is None:
+                results.append({'address': safe_address,
+                                'error': 'Cannot retrieve balances for safe=%s' % safe_address})
+            else:
+                results.append(SafeInfoBulkResponseSerializer(dict(safe_info._asdict(), balances=balances,
+                                                                   error=None)).data)
+        return results
+
+    def _get_safe_lines(self, safe_addresses: List[str], block_number: int) -> Iterator[str]:
+        """
+        Safes are read in chunks, so the first lines are sent before reading every Safe
+        """
+        chunk_size = settings.SAFE_INFO_BULK_CHUNK_SIZE
+        for i in range(0, len(safe_addresses), chunk_size):
+            for result in self._get_safe_results(safe_addresses[i:i + chunk_size], block_number):
+                yield json.dumps(camelize(result)) + '\n'
 
 
 class SafeSignalView(APIView):
@@ -339,13 +435,24 @@ class SafeMultisigTxView(SafeListApiView):
     def get_queryset(self):
         return SafeMultisigTx.objects.filter(safe=self.kwargs['address'])
 
+    @staticmethod
+    def _is_async_preferred(request) -> bool:
+        """
+        :return: `True` if client sent `Prefer: respond-async` header (RFC 7240)
+        """
+        return 'respond-async' in [preference.strip().lower()
+                                   for preference in request.META.get('HTTP_PREFER', '').split(',')]
+
     @swagger_auto_schema(responses={201: SafeMultisigTxResponseSerializer(),
+                                    202: SafeMultisigTxStatusResponseSerializer(),
                                     400: 'Data not valid',
                                     404: 'Safe not found',
                                     422: 'Safe address checksum not valid/Tx not valid'})
     def post(self, request, address, format=None):
         """
-        Send a Safe Multisig Transaction
+        Send a Safe Multisig Transaction. If `Prefer: respond-async` header is provided, tx is validated
+        without simulating it and queued to be sent. `202` is returned, and the status of the tx can be
+        checked on the url returned on `Location` header
         """
         if not Web3.isChecksumAddress(address):
             return Response(status=status.HTTP_422_UNPROCESSABLE_ENTITY)
@@ -355,6 +462,35 @@ class SafeMultisigTxView(SafeListApiView):
 
         if not serializer.is_valid():
             return Response(status=status.HTTP_400_BAD_REQUEST, data=serializer.errors)
+        elif self._is_async_preferred(request):
+            data = serializer.validated_data
+            safe_multisig_tx = TransactionServiceProvider().queue_multisig_tx(
+                safe_address=data['safe'],
+                to=data['to'],
+                value=data['value'],
+                data=data['data'],
+                operation=data['operation'],
+                safe_tx_gas=data['safe_tx_gas'],
+                base_gas=data['data_gas'],
+                gas_price=data['gas_price'],
+                gas_token=data['gas_token'],
+                nonce=data['nonce'],
+                refund_receiver=data['refund_receiver'],
+                signatures=data['signatures']
+            )
+            # Request is atomic, so task must be sent when tx is stored
+            transaction.on_commit(lambda: send_queued_multisig_txs_task.delay(address))
+            safe_tx_hash = HexBytes(safe_multisig_tx.safe_tx_hash).hex()
+            response_serializer = SafeMultisigTxStatusResponseSerializer({
+                'safe_tx_hash': safe_tx_hash,
+                'status': SafeMultisigTxStatus.QUEUED.value,
+                'tx_hash': None,
+                'block_number': None,
+                'error': None,
+            })
+            location = reverse('v1:safe-multisig-tx-status', args=(address, safe_tx_hash))
+            return Response(status=status.HTTP_202_ACCEPTED, data=response_serializer.data,
+                            headers={'Location': location, 'Preference-Applied': 'respond-async'})
         else:
             data = serializer.validated_data
             safe_multisig_tx = TransactionServiceProvider().create_multisig_tx(
@@ -369,12 +505,79 @@ class SafeMultisigTxView(SafeListApiView):
                 gas_token=data['gas_token'],
                 nonce=data['nonce'],
                 refund_receiver=data['refund_receiver'],
-                signatures=data['signatures']
+                signatures=data['signatures'],
+                estimation_ticket=data['estimation_ticket']
             )
             response_serializer = SafeMultisigTxResponseSerializer(safe_multisig_tx)
             return Response(status=status.HTTP_201_CREATED, data=response_serializer.data)
 
 
+class SafeMultisigTxBulkView(CreateAPIView):
+    permission_classes = (AllowAny,)
+    serializer_class = SafeRelayMultisigTxBulkSerializer
+
+    @swagger_auto_schema(responses={200: SafeMultisigTxBulkResultResponseSerializer(many=True),
+                                    400: 'Data not valid'})
+    def post(self, request, format=None):
+        """
+        Send many Safe Multisig Transactions at once, only one per Safe. Result is returned for every tx in the
+        same order, with the tx if it was sent or the error otherwise. Status is `unknown` if the node did not answer
+        when broadcasting the tx, the tx is stored anyway and will be bumped if it's not found
+        """
+        serializer = self.get_serializer_class()(data=request.data)
+        if not serializer.is_valid():
+            return Response(status=status.HTTP_400_BAD_REQUEST, data=serializer.errors)
+
+        multisig_tx_requests = [SafeMultisigTxRequest(data['safe'], data['to'], data['value'], data['data'],
+                                                      data['operation'], data['safe_tx_gas'], data['data_gas'],
+                                                      data['gas_price'], data['gas_token'], data['refund_receiver'],
+                                                      data['nonce'], data['signatures'], data['estimation_ticket'])
+                                for data in serializer.validated_data['transactions']]
+        results = TransactionServiceProvider().create_multisig_txs(multisig_tx_requests)
+        return Response(status=status.HTTP_200_OK,
+                        data=SafeMultisigTxBulkResultResponseSerializer(results, many=True).data)
+
+
+class SafeMultisigTxStatusView(APIView):
+    permission_classes = (AllowAny,)
+
+    @swagger_auto_schema(responses={200: SafeMultisigTxStatusResponseSerializer(),
+                                    404: 'Tx not found',
+                                    422: 'Safe address checksum not valid'})
+    def get(self, request, address, safe_tx_hash, format=None):
+        """
+        Get status of a Safe Multisig Transaction: `queued`, `sent`, `mined` or `failed` (if queued tx could
+        not be sent)
+        """
+        if not Web3.isChecksumAddress(address):
+            return Response(status=status.HTTP_422_UNPROCESSABLE_ENTITY)
+
+        safe_multisig_tx = SafeMultisigTx.objects.select_related(
+            'ethereum_tx'
+        ).filter(safe=address, safe_tx_hash=safe_tx_hash).first()
+        if safe_multisig_tx:
+            ethereum_tx = safe_multisig_tx.ethereum_tx
+            data = {
+                'safe_tx_hash': safe_tx_hash,
+                'status': safe_multisig_tx.status.value,
+                'tx_hash': ethereum_tx.tx_hash if ethereum_tx else None,
+                'block_number': ethereum_tx.block_id if ethereum_tx else None,
+                'error': None,
+            }
+        else:
+            error = TransactionServiceProvider().get_queued_multisig_tx_error(safe_tx_hash)
+            if not error:
+                return Response(status=status.HTTP_404_NOT_FOUND)
+            data = {
+                'safe_tx_hash': safe_tx_hash,
+                'status': SafeMultisigTxStatus.FAILED.value,
+                'tx_hash': None,
+                'block_number': None,
+                'error': error,
+            }
+        return Response(status=status.HTTP_200_OK, data=SafeMultisigTxStatusResponseSerializer(data).data)
+
+
 class ERC20View(SafeListApiView):
     ordering = ('-ethereum_tx__block__number',)
     serializer_class = ERC20Serializer
@@ -3,3 +3,6 @@ from django.apps import AppConfig
 
 class TokensConfig(AppConfig):
     name = 'safe_relay_service.tokens'
+
+    def ready(self):
+        from . import signals  # noqa
@@ -0,0 +1,128 @@
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor, wait
+from logging import getLogger
+from types import MappingProxyType
+from typing import Dict, Mapping, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .models import Token
+from .price_oracles import CannotGetTokenPriceFromApi
+
+logger = getLogger(__name__)
+
+GAS_TOKEN_REGISTRY_VERSION_KEY = 'gas-token-registry-version'
+
+
+def bump_gas_token_registry_version():
+    """
+    Make every process reload the gas tokens. Called when a token or a price oracle changes. Registry of the
+    current process is reloaded on next access
+    """
+    cache.set(GAS_TOKEN_REGISTRY_VERSION_KEY, uuid.uuid4().hex, None)
+    if hasattr(GasTokenRegistryProvider, 'instance'):
+        GasTokenRegistryProvider.instance.invalidate()
+
+
+class GasTokenRegistryProvider:
+    def __new__(cls):
+        if not hasattr(cls, 'instance'):
+            cls.instance = GasTokenRegistry(price_timeout=settings.GAS_TOKEN_PRICE_TIMEOUT,
+                                            price_max_workers=settings.GAS_TOKEN_PRICE_MAX_WORKERS)
+        return cls.instance
+
+    @classmethod
+    def del_singleton(cls):
+        if hasattr(cls, "instance"):
+            del cls.instance
+
+
+class GasTokenRegistry:
+    """
+    Process snapshot of the gas tokens with their price oracle tickers prefetched, so no database queries are
+    needed for validating gas tokens or calculating gas prices. Snapshot is reloaded when version stored on cache
+    changes (checked at most every `version_check_interval` seconds)
+    """
+    def __init__(self, version_check_interval: int = 5, price_timeout: float = 2., price_max_workers: int = 10):
+        """
+        :param version_check_interval: Seconds between checks of the version stored on cache
+        :param price_timeout: Seconds to wait for the prices of all the gas tokens
+        :param price_max_workers: Max number of gas token prices resolved at the same time
+        """
+        self.version_check_interval = version_check_interval
+        self.price_timeout = price_timeout
+        self.price_executor = ThreadPoolExecutor(max_workers=price_max_workers,
+                                                 thread_name_prefix='gas-token-price')
+        self.version: Optional[str] = None
+        self.last_version_check: float = 0.
+        self.tokens: Mapping[str, Token] = MappingProxyType({})
+
+    def invalidate(self):
+        self.version = None
+
+    def _load(self, version: Optional[str]):
+        tokens = Token.objects.gas_tokens().prefetch_related('price_oracle_tickers__price_oracle')
+        self.tokens = MappingProxyType({token.address: token for token in tokens})
+        self.version = version
+        logger.debug('Loaded %d gas tokens with version=%s', len(self.tokens), version)
+
+    def _refresh_if_needed(self):
+        now = time.monotonic()
+        if self.version is not None and now - self.last_version_check < self.version_check_interval:
+            return
+
+        self.last_version_check = now
+        version = cache.get(GAS_TOKEN_REGISTRY_VERSION_KEY)
+        if version is None:  # Cache was flushed
+            bump_gas_token_registry_version()
+            version = cache.get(GAS_TOKEN_REGISTRY_VERSION_KEY)
+        if version != self.version:
+            self._load(version)
+
+    def get_tokens(self) -> Mapping[str, Token]:
+        """
+        :return: Read only mapping with gas tokens addresses as keys and `Token` as values. Tokens must not be
+        modified
+        """
+        self._refresh_if_needed()
+        return self.tokens
+
+    def get(self, address: str) -> Optional[Token]:
+        """
+        :param address: Token address
+        :return: Gas token for the address, `None` if not found
+        """
+        return self.get_tokens().get(address)
+
+    def is_gas_token(self, address: str) -> bool:
+        return address in self.get_tokens()
+
+    def get_eth_values(self, timeout: Optional[float] = None) -> Dict[str, float]:
+        """
+        Resolve the ether value of every gas token concurrently, so time is bounded by the slowest price oracle
+        and not by the sum of all of them. Price oracles are not cancelled when `timeout` is reached, so their
+        caches will be populated for the next calls
+        :param timeout: Seconds to wait for all the prices. If not provided, `price_timeout` is used
+        :return: Dictionary with gas token addresses as keys and ether values as values, keeping the order of
+        `get_tokens`. Tokens without a working price oracle or not resolved before `timeout` are not included
+        """
+        timeout = self.price_timeout if timeout is None else timeout
+        future_to_token = {self.price_executor.submit(token.get_eth_value): token
+                           for token in self.get_tokens().values()}
+        done, not_done = wait(future_to_token, timeout=timeout)
+        for future in not_done:
+            future.cancel()
+            logger.warning('Timeout getting price for token=%s after %.2f seconds',
+                           future_to_token[future].address, timeout)
+
+        eth_values = {}
+        for future, token in future_to_token.items():
+            if future not in done:
+                continue
+            try:
+                eth_values[token.address] = future.result()
+            except CannotGetTokenPriceFromApi:
+                logger.error('Cannot get price for token=%s', token.address)
+        return eth_values
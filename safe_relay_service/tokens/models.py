@@ -80,23 +80,26 @@ class Token(models.Model):
             else:
                 raise CannotGetTokenPriceFromApi('There is no working provider for token=%s' % self.address)
 
-    def calculate_payment(self, eth_payment: int) -> int:
+    def calculate_payment(self, eth_payment: int, eth_value: Optional[float] = None) -> int:
         """
         Converts an ether payment to a token payment
         :param eth_payment: Ether payment (in wei)
+        :param eth_value: Ether value of the token already resolved. If not provided, `get_eth_value` is used
         :return: Token payment equivalent for the ether value
         """
-        return math.ceil(eth_payment / self.get_eth_value())
+        return math.ceil(eth_payment / (eth_value or self.get_eth_value()))
 
-    def calculate_gas_price(self, gas_price: int, price_margin: float = 1.0) -> int:
+    def calculate_gas_price(self, gas_price: int, price_margin: float = 1.0,
+                            eth_value: Optional[float] = None) -> int:
         """
         Converts ether gas price to token's gas price
         :param gas_price: Regular ether gas price
         :param price_margin: Threshold to estimate a little higher, so tx will
         not be rejected in a few minutes
+        :param eth_value: Ether value of the token already resolved. If not provided, `get_eth_value` is used
         :return:
         """
-        return math.ceil(gas_price / self.get_eth_value() * price_margin)
+        return math.ceil(gas_price / (eth_value or self.get_eth_value()) * price_margin)
 
     def get_full_logo_uri(self):
         if urlparse(self.logo_uri).netloc:
@@ -1,5 +1,6 @@
 import logging
 from abc import ABC, abstractmethod
+from threading import Lock
 from typing import Any, Dict
 
 import requests
@@ -35,7 +36,7 @@ class Binance(PriceOracle):
     Remember to always use USDT instead of USD
     """
 
-    @cached(cache=TTLCache(maxsize=1024, ttl=60))
+    @cached(cache=TTLCache(maxsize=1024, ttl=60), lock=Lock())
     def get_price(self, ticker) -> float:
         url = 'https://api.binance.com/api/v3/avgPrice?symbol=' + ticker
         response = requests.get(url)
@@ -55,7 +56,7 @@ class DutchX(PriceOracle):
     def reverse_ticker(self, ticker: str):
         return '-'.join(reversed(ticker.split('-')))
 
-    @cached(cache=TTLCache(maxsize=1024, ttl=1200))
+    @cached(cache=TTLCache(maxsize=1024, ttl=1200), lock=Lock())
     def get_price(self, ticker: str) -> float:
         self.validate_ticker(ticker)
         url = 'https://dutchx.d.exchange/api/v1/markets/{}/prices/custom-median?requireWhitelisted=false&' \
@@ -73,7 +74,7 @@ class Huobi(PriceOracle):
     Get valid symbols from https://api.huobi.pro/v1/common/symbols
     """
 
-    @cached(cache=TTLCache(maxsize=1024, ttl=60))
+    @cached(cache=TTLCache(maxsize=1024, ttl=60), lock=Lock())
     def get_price(self, ticker) -> float:
         url = 'https://api.huobi.pro/market/detail/merged?symbol=%s' % ticker
         response = requests.get(url)
@@ -87,7 +88,7 @@ class Huobi(PriceOracle):
 
 class Kraken(PriceOracle):
 
-    @cached(cache=TTLCache(maxsize=1024, ttl=60))
+    @cached(cache=TTLCache(maxsize=1024, ttl=60), lock=Lock())
     def get_price(self, ticker) -> float:
         url = 'https://api.kraken.com/0/public/Ticker?pair=' + ticker
         response = requests.get(url)
@@ -106,7 +107,7 @@ class Uniswap(PriceOracle):
     def __init__(self, uniswap_exchange_address: str, **kwargs):
         self.uniswap_exchange_address = uniswap_exchange_address
 
-    @cached(cache=TTLCache(maxsize=1024, ttl=60))
+    @cached(cache=TTLCache(maxsize=1024, ttl=60), lock=Lock())
     def get_price(self, ticker: str) -> float:
         """
         :param ticker: Address of the token
@@ -124,7 +125,7 @@ class Kyber(PriceOracle):
     def __init__(self, kyber_network_proxy_address: str, **kwargs):
         self.kyber_network_proxy_address = kyber_network_proxy_address
 
-    @cached(cache=TTLCache(maxsize=1024, ttl=60))
+    @cached(cache=TTLCache(maxsize=1024, ttl=60), lock=Lock())
     def get_price(self, ticker: str) -> float:
         """
         :param ticker: Address of the token
@@ -0,0 +1,21 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .gas_token_registry import (GasTokenRegistryProvider,
+                                 bump_gas_token_registry_version)
+from .models import PriceOracle, PriceOracleTicker, Token
+
+
+@receiver(post_save, sender=Token, dispatch_uid='token.bump_gas_token_registry_version')
+@receiver(post_delete, sender=Token, dispatch_uid='token.delete.bump_gas_token_registry_version')
+@receiver(post_save, sender=PriceOracleTicker, dispatch_uid='ticker.bump_gas_token_registry_version')
+@receiver(post_delete, sender=PriceOracleTicker, dispatch_uid='ticker.delete.bump_gas_token_registry_version')
+@receiver(post_save, sender=PriceOracle, dispatch_uid='oracle.bump_gas_token_registry_version')
+@receiver(post_delete, sender=PriceOracle, dispatch_uid='oracle.delete.bump_gas_token_registry_version')
+def gas_tokens_changed(sender, **kwargs):
+    # Registry of the current process is reloaded now, so changes are seen inside the transaction. Other processes
+    # are only notified once changes are committed, otherwise they could reload the old tokens with the new version
+    if hasattr(GasTokenRegistryProvider, 'instance'):
+        GasTokenRegistryProvider.instance.invalidate()
+    transaction.on_commit(bump_gas_token_registry_version)
@@ -0,0 +1,71 @@
+import time
+from unittest import mock
+
+from django.db import transaction
+from django.test import TestCase
+
+from ..gas_token_registry import (GasTokenRegistry, GasTokenRegistryProvider,
+                                  bump_gas_token_registry_version)
+from ..models import Token
+from ..price_oracles import CannotGetTokenPriceFromApi
+from .factories import PriceOracleTickerFactory, TokenFactory
+
+
+class TestGasTokenRegistry(TestCase):
+    def test_gas_token_registry(self):
+        gas_token_registry = GasTokenRegistryProvider()
+        self.assertEqual(len(gas_token_registry.get_tokens()), 0)
+
+        gas_token = TokenFactory(gas=True, fixed_eth_conversion=None)
+        not_gas_token = TokenFactory(gas=False)
+        PriceOracleTickerFactory(token=gas_token)
+        self.assertTrue(gas_token_registry.is_gas_token(gas_token.address))
+        self.assertFalse(gas_token_registry.is_gas_token(not_gas_token.address))
+        self.assertIsNone(gas_token_registry.get(not_gas_token.address))
+
+        # No queries are needed once the registry is loaded, price oracles are prefetched
+        with self.assertNumQueries(0):
+            token = gas_token_registry.get(gas_token.address)
+            self.assertEqual(token.decimals, gas_token.decimals)
+            self.assertEqual(len(token.price_oracle_tickers.all()), 1)
+            self.assertIsNotNone(token.price_oracle_tickers.all()[0].price_oracle.name)
+
+        # Changes on tokens are seen. Version for other processes is bumped when the transaction is committed
+        not_gas_token.gas = True
+        with mock.patch.object(transaction, 'on_commit') as on_commit_mock:
+            not_gas_token.save()
+            on_commit_mock.assert_called_once_with(bump_gas_token_registry_version)
+        self.assertTrue(gas_token_registry.is_gas_token(not_gas_token.address))
+        Token.objects.filter(address=gas_token.address).delete()
+        self.assertFalse(gas_token_registry.is_gas_token(gas_token.address))
+
+    def test_gas_token_registry_other_process(self):
+        gas_token_registry = GasTokenRegistry(version_check_interval=60)
+        self.assertEqual(len(gas_token_registry.get_tokens()), 0)
+        gas_token = TokenFactory(gas=True)
+        # Tests are run inside a transaction, so `on_commit` hook does not bump the version
+        bump_gas_token_registry_version()  # Version is bumped, but version is not checked again yet
+        self.assertFalse(gas_token_registry.is_gas_token(gas_token.address))
+        with mock.patch('time.monotonic', return_value=10**9):
+            self.assertTrue(gas_token_registry.is_gas_token(gas_token.address))
+
+    def test_get_eth_values(self):
+        gas_token_registry = GasTokenRegistry()
+        self.assertEqual(gas_token_registry.get_eth_values(), {})
+
+        fast_token, slow_token, broken_token = [TokenFactory(gas=True) for _ in range(3)]
+        gas_token_registry.invalidate()  # Not the registry of the process, so it's not invalidated by the signals
+
+        def get_eth_value(token: Token) -> float:
+            if token.address == slow_token.address:
+                time.sleep(1)
+            elif token.address == broken_token.address:
+                raise CannotGetTokenPriceFromApi
+            return 0.5
+
+        with mock.patch.object(Token, 'get_eth_value', autospec=True, side_effect=get_eth_value):
+            start = time.monotonic()
+            self.assertEqual(gas_token_registry.get_eth_values(timeout=0.2), {fast_token.address: 0.5})
+            self.assertLess(time.monotonic() - start, 1)
+            self.assertEqual(gas_token_registry.get_eth_values(timeout=5), {fast_token.address: 0.5,
+                                                                             slow_token.address: 0.5})
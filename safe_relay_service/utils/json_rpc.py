@@ -0,0 +1,89 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+from logging import getLogger
+from typing import Any, Dict, List
+
+import requests
+from requests.adapters import HTTPAdapter
+
+logger = getLogger(__name__)
+
+
+class JsonRpcBatchException(Exception):
+    pass
+
+
+class JsonRpcBatchClient:
+    """
+    Sends big JSON-RPC batch requests to an ethereum node split in batches of `batch_size` requests. Batches
+    are sent in parallel (up to `max_workers` in flight) using a pooled http session, and every batch is
+    retried independently, so a failing batch doesn't make the rest of the results to be lost
+    """
+    def __init__(self, node_url: str, batch_size: int = 25, max_workers: int = 4, retries: int = 2,
+                 timeout: int = 30):
+        """
+        :param node_url: Ethereum node http/s url
+        :param batch_size: Maximum number of requests sent in the same http request
+        :param max_workers: Maximum number of batches in flight at the same time
+        :param retries: Number of retries for a failed batch
+        :param timeout: Timeout in seconds for every http request
+        """
+        assert batch_size > 0, 'Batch size must be greater than 0'
+        assert max_workers > 0, 'Max workers must be greater than 0'
+        self.node_url = node_url
+        self.batch_size = batch_size
+        self.max_workers = max_workers
+        self.retries = retries
+        self.timeout = timeout
+        self.http_session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max_workers)
+        self.http_session.mount('http://', adapter)
+        self.http_session.mount('https://', adapter)
+
+    def _do_batch_request(self, rpc_requests: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        :param rpc_requests: JSON-RPC requests to send in the same batch
+        :return: JSON-RPC responses
+        :raises: JsonRpcBatchException, requests.RequestException, ValueError: If every try failed
+        """
+        for retry in range(self.retries + 1):
+            try:
+                response = self.http_session.post(self.node_url, json=rpc_requests, timeout=self.timeout)
+                response.raise_for_status()
+                rpc_responses = response.json()
+                if not isinstance(rpc_responses, list):  # Node returns a single error for the whole batch
+                    raise JsonRpcBatchException(rpc_responses)
+                return rpc_responses
+            except (JsonRpcBatchException, requests.RequestException, ValueError):
+                if retry == self.retries:
+                    raise
+                logger.warning('Error on batch of %d json-rpc requests, retrying', len(rpc_requests),
+                               exc_info=True)
+                time.sleep(0.5 * (retry + 1))
+
+    def request(self, rpc_requests: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        :param rpc_requests: JSON-RPC requests
+        :return: JSON-RPC responses for the batches that could be retrieved. Order is not guaranteed, use `id`
+        to match requests and responses
+        :raises: JsonRpcBatchException, requests.RequestException, ValueError: If every batch failed
+        """
+        batches = [rpc_requests[i:i + self.batch_size] for i in range(0, len(rpc_requests), self.batch_size)]
+        if not batches:
+            return []
+        elif len(batches) == 1:
+            return self._do_batch_request(batches[0])
+
+        rpc_responses = []
+        exceptions = []
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(batches))) as executor:
+            for batch, future in [(batch, executor.submit(self._do_batch_request, batch)) for batch in batches]:
+                try:
+                    rpc_responses.extend(future.result())
+                except (JsonRpcBatchException, requests.RequestException, ValueError) as exc:
+                    logger.error('Batch of %d json-rpc requests failed: %s', len(batch), exc)
+                    exceptions.append(exc)
+
+        if len(exceptions) == len(batches):
+            raise exceptions[0]
+        return rpc_responses
@@ -0,0 +1,50 @@
+from unittest import mock
+
+from django.test import TestCase
+
+import requests
+
+from ..json_rpc import JsonRpcBatchClient
+
+
+class FakeResponse:
+    def __init__(self, rpc_requests):
+        self.rpc_requests = rpc_requests
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return [{'jsonrpc': '2.0', 'id': rpc_request['id'], 'result': rpc_request['id']}
+                for rpc_request in self.rpc_requests]
+
+
+class TestJsonRpcBatchClient(TestCase):
+    def test_request(self):
+        json_rpc_client = JsonRpcBatchClient('http://localhost:8545', batch_size=3, max_workers=2, retries=1)
+        rpc_requests = [{'jsonrpc': '2.0', 'method': 'eth_blockNumber', 'params': [], 'id': i} for i in range(10)]
+        self.assertEqual(json_rpc_client.request([]), [])
+
+        def post(url, json=None, timeout=None):
+            return FakeResponse(json)
+
+        with mock.patch.object(requests.Session, 'post', side_effect=post) as post_mock:
+            rpc_responses = json_rpc_client.request(rpc_requests)
+            self.assertEqual(post_mock.call_count, 4)  # 10 requests in batches of 3
+        self.assertEqual(sorted(rpc_response['result'] for rpc_response in rpc_responses), list(range(10)))
+
+        # Batch with the first requests always fails, the rest of the results are kept
+        def post_with_error(url, json=None, timeout=None):
+            if json[0]['id'] == 0:
+                raise requests.ConnectionError
+            return FakeResponse(json)
+
+        with mock.patch('time.sleep'):
+            with mock.patch.object(requests.Session, 'post', side_effect=post_with_error) as post_mock:
+                rpc_responses = json_rpc_client.request(rpc_requests)
+                self.assertEqual(post_mock.call_count, 5)  # Failed batch is retried once
+            self.assertEqual(sorted(rpc_response['result'] for rpc_response in rpc_responses), list(range(3, 10)))
+
+            with mock.patch.object(requests.Session, 'post', side_effect=requests.ConnectionError):
+                with self.assertRaises(requests.ConnectionError):
+                    json_rpc_client.request(rpc_requests)